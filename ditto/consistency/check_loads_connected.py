@@ -1,6 +1,6 @@
 
 import networkx as nx
-from ditto.network.network import Network
+from ditto.consistency.network_utils import build_network, bfs_parents
 from ditto.models.power_source import PowerSource
 from ditto.models.load import Load
 
@@ -32,18 +32,16 @@ def check_loads_connected(model,verbose=True):
         print('Model does not contain any power source')
         return False
     
+    # The graph does not depend on the source used to orient it, so it is only built once
+    ditto_graph = build_network(model, all_sources[0].connecting_element)
     for source in all_sources:
-        ditto_graph = Network()
-        ditto_graph.build(model,source.connecting_element)
-        ditto_graph.set_attributes(model)
-        ditto_graph.remove_open_switches(model) # This deletes the switches inside the networkx graph only
         source_name = source.connecting_element
-        all_paths = nx.single_source_shortest_path(ditto_graph.graph,source_name)
+        reachable = bfs_parents(ditto_graph.graph,source_name)
         
         for load in all_loads:
             min_dist = float('inf')
             load_connection = load.connecting_element
-            if load_connection in all_paths:
+            if load_connection in reachable:
                 load_source_map[load.name].append(source_name)
 
 
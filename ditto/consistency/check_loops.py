@@ -1,5 +1,5 @@
 import networkx as nx
-from ditto.network.network import Network
+from ditto.consistency.network_utils import build_network, number_of_loops
 from ditto.models.power_source import PowerSource
 from ditto.models.load import Load
 
@@ -25,20 +25,17 @@ def check_loops(model, verbose=True):
     if len(all_sources) == 0:
         raise('Model does not contain any power source. Required to build networkx graph')
 
+    # The graph does not depend on the source used to orient it, so it is only built once
+    ditto_graph = build_network(model, all_sources[0].connecting_element)
     for source in all_sources:
         print('Checking loops for source '+source.name)
-        ditto_graph = Network()
-        ditto_graph.build(model,source.connecting_element)
-        ditto_graph.set_attributes(model)
-        ditto_graph.remove_open_switches(model) # This deletes the switches inside the networkx graph only
-    
-        loops = nx.cycle_basis(ditto_graph.graph)
-        number_of_loops = len(loops)
-        if number_of_loops > 0:
+
+        # Counting the loops is linear. The loops themselves are only listed when they are printed
+        if number_of_loops(ditto_graph.graph) > 0:
             if verbose:
                 print('Loops found:')
-                print(loops)
-        if number_of_loops == 0:
+                print(nx.cycle_basis(ditto_graph.graph))
+        else:
             return True
     return False
 
@@ -33,57 +33,57 @@ def check_matched_phases(model, verbose=True):
     ### Check phases around the transformer ###
     result = True
     for transformer in all_transformers:
-        # Either a three phase transformer or a single phase transformer
-        if len(transformer.windings) == 2:
-            high_phases = []
-            low_phases = []
-            for phase_windings in transformer.windings[0].phase_windings:
-                high_phases.append(phase_windings.phase)
-            for phase_windings in transformer.windings[1].phase_windings:
-                low_phases.append(phase_windings.phase)
-
-            ok = False
-            if set(high_phases) == set(low_phases):
-                ok = True
-            elif set(low_phases) in set(high_phases):
-                ok = True
-            else:
-                if verbose:
-                    print('Something is wrong with Transformer '+transformer.name)
-                result = False
-
-
-        # i.e. A center-tap transformer
-        elif len(transformer.windings) == 3:
-            high_phases = []
-            low_phases = []
-            low_phases2 = []
-            for phase_windings in transformer.windings[0].phase_windings:
-                high_phases.append(phase_windings.phase)
-            for phase_windings in transformer.windings[1].phase_windings:
-                low_phases.append(phase_windings.phase)
-            for phase_windings in transformer.windings[2].phase_windings:
-                low_phases2.append(phase_windings.phase)
-
-            if low_phases2 != low_phases:
-                if verbose:
-                    print('Center tap winding phases mismatch for transformer '+transformer.name)
-                result = False
-
-            if len(low_phases2) != 2:
-                if verbose:
-                    print('Center tap low winding misrepresented for '+transformer.name)
-                result = False
-
-            if len(high_phases) > 2:
-                if verbose:
-                    print('Center tap transformer connected to three-phase winding for transformer '+transformer.name)
-                result = False
-
-
-        else:
-            result = False
+        for message in transformer_phase_messages(transformer):
             if verbose:
-                print('Transformer '+transformer.name+' has incorrect number of windings')
+                print(message)
+            result = False
 
     return result
+
+
+def transformer_phase_messages(transformer):
+    """
+    Checks that the phases on the low and high side of transformer match.
+    Returns the list of problems found (empty if the transformer is consistent).
+    """
+    messages = []
+    # Either a three phase transformer or a single phase transformer
+    if len(transformer.windings) == 2:
+        high_phases = []
+        low_phases = []
+        for phase_windings in transformer.windings[0].phase_windings:
+            high_phases.append(phase_windings.phase)
+        for phase_windings in transformer.windings[1].phase_windings:
+            low_phases.append(phase_windings.phase)
+
+        # The low side phases must be the same as, or a subset of, the high side phases
+        if not set(low_phases).issubset(set(high_phases)):
+            messages.append('Something is wrong with Transformer '+transformer.name)
+
+
+    # i.e. A center-tap transformer
+    elif len(transformer.windings) == 3:
+        high_phases = []
+        low_phases = []
+        low_phases2 = []
+        for phase_windings in transformer.windings[0].phase_windings:
+            high_phases.append(phase_windings.phase)
+        for phase_windings in transformer.windings[1].phase_windings:
+            low_phases.append(phase_windings.phase)
+        for phase_windings in transformer.windings[2].phase_windings:
+            low_phases2.append(phase_windings.phase)
+
+        if low_phases2 != low_phases:
+            messages.append('Center tap winding phases mismatch for transformer '+transformer.name)
+
+        if len(low_phases2) != 2:
+            messages.append('Center tap low winding misrepresented for '+transformer.name)
+
+        if len(high_phases) > 2:
+            messages.append('Center tap transformer connected to three-phase winding for transformer '+transformer.name)
+
+
+    else:
+        messages.append('Transformer '+transformer.name+' has incorrect number of windings')
+
+    return messages
@@ -1,6 +1,5 @@
 import networkx as nx
-from itertools import islice
-from ditto.network.network import Network
+from ditto.consistency.network_utils import build_network, count_paths_from_source
 from ditto.models.power_source import PowerSource
 from ditto.models.load import Load
 from ditto.models.powertransformer import PowerTransformer
@@ -45,30 +44,24 @@ def check_unique_path(model, needs_transformers=False, show_all=False, verbose =
 
     for load in all_loads:
         load_transformer_map[load.name] = []
+    # The graph does not depend on the source used to orient it, so it is only built once
+    ditto_graph = build_network(model, all_sources[0].connecting_element)
     for source in all_sources:
-        ditto_graph = Network()
-        ditto_graph.build(model,source.connecting_element)
-        ditto_graph.set_attributes(model)
-        ditto_graph.remove_open_switches(model) # This deletes the switches inside the networkx graph only
         source_name = source.connecting_element
         break_load = False
+
+        ### classify the paths from all the loads to the source at once (linear time)
+        num_paths = count_paths_from_source(ditto_graph.graph, source_name, [load.name for load in all_loads])
         for load in all_loads:
-            
-            ### check there is a unique path from each load to the source
-            two_paths = nx.all_simple_paths(ditto_graph.graph, source_name, load.name) # Warning - this can take a very long time if the graph is has large numbers of loops (shouldn't hold for distribution systems)
-            num_paths = 0
             if break_load:
                 break
-            for candidate in two_paths:
-                num_paths +=1
-                if num_paths > 1:
-                    print('Multiple paths from load '+load.name+' to '+source_name)
-                    result = False
-                    if not show_all:
-                        break_load = True
-                    all_bad_loads.append((">1",load.name))
-                    break
-            if num_paths == 0:
+            if num_paths[load.name] == ">1":
+                print('Multiple paths from load '+load.name+' to '+source_name)
+                result = False
+                if not show_all:
+                    break_load = True
+                all_bad_loads.append((">1",load.name))
+            if num_paths[load.name] == "0":
                 print('No path from load '+load.name+' to ' + source_name)
                 if not show_all:
                     break_load = True
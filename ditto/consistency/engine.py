@@ -0,0 +1,248 @@
+import time
+from ditto.consistency.network_utils import build_network, bfs_tree, bridge_set, classify_paths, number_of_loops, path_from_source, transformer_labels
+from ditto.consistency.check_matched_phases import transformer_phase_messages
+from ditto.consistency.check_transformer_phase_path import transformer_phase_path_messages
+from ditto.consistency.fix_transformer_phase_path import fix_load_transformer_phase_path
+from ditto.consistency.fix_undersized_transformers import upgrade_transformers
+from ditto.models.power_source import PowerSource
+from ditto.models.load import Load
+from ditto.models.powertransformer import PowerTransformer
+
+"""
+Runs any subset of the consistency checks over a single scan of the model, a single graph
+with the open switches removed, one breadth first search per source and one bridge computation.
+The results are returned as a dictionary instead of being printed.
+"""
+
+
+class ConsistencyEngine(object):
+    """
+    Shared state for the consistency checks of a model.
+
+    Every check returns a dictionary with:
+        passed: whether the check succeeded
+        count: the number of problems found
+        elements: the names of the offending elements, in the order they were found
+        messages: the description of the problems
+        warnings: messages that do not make the check fail
+
+    run() adds the time spent in each check and returns the report of all the checks.
+    The fixes modify the model, so they are only run when asked for, after the checks.
+
+    **Usage:**
+
+        >>> engine = ConsistencyEngine(model)
+        >>> report = engine.run(["loops", "unique_path"])
+        >>> report["checks"]["unique_path"]["elements"]
+        >>> engine.run(fixes=["fix_undersized_transformers"])
+
+    .. note:: The network is oriented from the first source, like the individual checks.
+    """
+
+    CHECKS = ("loads_connected", "loops", "unique_path", "matched_phases", "transformer_phase_path")
+    FIXES = ("fix_transformer_phase_path", "fix_undersized_transformers")
+
+    def __init__(self, model, needs_transformers=False):
+        self.model = model
+        self.needs_transformers = needs_transformers
+        self.sources = []
+        self.loads = []
+        self.transformers = []
+        self.warnings = []
+
+        for i in model.models:
+            if isinstance(i,PowerSource) and i.connecting_element is not None:
+                self.sources.append(i)
+            elif isinstance(i,PowerSource):
+                self.warnings.append('Warning - a PowerSource element has a None connecting element')
+            if isinstance(i,PowerTransformer):
+                self.transformers.append(i)
+            if isinstance(i,Load):
+                self.loads.append(i)
+        self.reset()
+
+    def reset(self):
+        """Drops the graph and the traversals, to be called if the model is modified."""
+        self._network = None
+        self._bfs = {}
+        self._bridges = None
+
+    @property
+    def network(self):
+        """The Network of the model, with the open switches removed from its graph."""
+        if self._network is None:
+            self._network = build_network(self.model, self.sources[0].connecting_element)
+        return self._network
+
+    @property
+    def graph(self):
+        return self.network.graph
+
+    @property
+    def bridges(self):
+        """The bridges of the graph, in both orientations."""
+        if self._bridges is None:
+            self._bridges = bridge_set(self.graph)
+        return self._bridges
+
+    def bfs(self, source_name):
+        """Returns the breadth first order and parents of the nodes reachable from source_name."""
+        if source_name not in self._bfs:
+            self._bfs[source_name] = bfs_tree(self.graph, source_name)
+        return self._bfs[source_name]
+
+    def load_paths(self, source_name):
+        """Yields (load, path from source_name to the connecting element of the load) for the reachable loads."""
+        _, parent = self.bfs(source_name)
+        for load in self.loads:
+            if load.connecting_element in parent:
+                yield load, path_from_source(parent, load.connecting_element)
+
+    def run(self, checks=None, fixes=()):
+        """
+        Runs the given checks (all of them by default), then the given fixes.
+        Returns {"passed": ..., "time": ..., "checks": {name: result}}.
+        """
+        if checks is None:
+            checks = self.CHECKS
+        for name in list(checks) + list(fixes):
+            if name not in self.CHECKS and name not in self.FIXES:
+                raise ValueError('Unknown consistency check '+name)
+
+        report = {"passed": True, "checks": {}}
+        start = time.perf_counter()
+        for name in list(checks) + list(fixes):
+            check_start = time.perf_counter()
+            if name in self.CHECKS and not self.sources and name != "matched_phases":
+                result = self._result(["Model does not contain any power source"])
+            else:
+                result = getattr(self, name)()
+            result["time"] = time.perf_counter() - check_start
+            report["checks"][name] = result
+            report["passed"] = report["passed"] and result["passed"]
+        report["time"] = time.perf_counter() - start
+        return report
+
+    @staticmethod
+    def _result(messages, elements=None, warnings=None, count=None):
+        if count is None:
+            count = len(messages)
+        return {
+            "passed": count == 0,
+            "count": count,
+            "elements": elements if elements is not None else [],
+            "messages": messages,
+            "warnings": warnings if warnings is not None else [],
+        }
+
+    def loads_connected(self):
+        """Checks that every load is reachable from exactly one source."""
+        load_sources = {load.name: [] for load in self.loads}
+        for source in self.sources:
+            _, parent = self.bfs(source.connecting_element)
+            for load in self.loads:
+                if load.connecting_element in parent:
+                    load_sources[load.name].append(source.connecting_element)
+
+        messages, elements = [], []
+        for load in self.loads:
+            sources = load_sources[load.name]
+            if len(sources) == 0:
+                messages.append('Load '+load.name+' is missing a source')
+            elif len(sources) > 1:
+                messages.append('Load '+load.name+' has multiple sources: '+', '.join(sources))
+            else:
+                continue
+            elements.append(load.name)
+        return self._result(messages, elements, list(self.warnings))
+
+    def loops(self):
+        """Checks that the graph has no loops. The elements are the nodes lying on a loop."""
+        count = number_of_loops(self.graph)
+        elements = []
+        if count > 0:
+            seen = set()
+            for u, v in self.graph.edges():
+                if (u, v) not in self.bridges:
+                    for node in (u, v):
+                        if node not in seen:
+                            seen.add(node)
+                            elements.append(node)
+        messages = [str(count)+' loops found'] if count > 0 else []
+        return self._result(messages, elements, count=count)
+
+    def unique_path(self):
+        """Checks that there is exactly one path between every load and the source."""
+        warnings = list(self.warnings)
+        if len(self.sources) > 1:
+            warnings.append('Warning - using first source to orient the network')
+        messages, elements = [], []
+        for source in self.sources:
+            source_name = source.connecting_element
+            order, parent = self.bfs(source_name)
+            num_paths = classify_paths(order, parent, self.bridges, [load.name for load in self.loads])
+            for load in self.loads:
+                if num_paths[load.name] == ">1":
+                    messages.append('Multiple paths from load '+load.name+' to '+source_name)
+                elif num_paths[load.name] == "0":
+                    messages.append('No path from load '+load.name+' to '+source_name)
+                else:
+                    continue
+                elements.append(load.name)
+        return self._result(messages, elements, warnings)
+
+    def matched_phases(self):
+        """Checks that the phases on the low and high side of every transformer match."""
+        messages, elements = [], []
+        for transformer in self.transformers:
+            problems = transformer_phase_messages(transformer)
+            if problems:
+                messages.extend(problems)
+                elements.append(transformer.name)
+        return self._result(messages, elements, count=len(elements))
+
+    def transformer_phase_path(self):
+        """Checks the transformers and phases on the path from every load to the source."""
+        messages, elements, warnings = [], [], []
+        for source in self.sources:
+            for load, path in self.load_paths(source.connecting_element):
+                errors = False
+                for is_error, message in transformer_phase_path_messages(self.model, self.graph, path, load, self.needs_transformers):
+                    if is_error:
+                        messages.append(message)
+                        errors = True
+                    else:
+                        warnings.append(message)
+                if errors:
+                    elements.append(load.name)
+        return self._result(messages, elements, warnings, count=len(elements))
+
+    def fix_transformer_phase_path(self):
+        """Rotates backwards transformers and fixes the phases of single phase transformers. The elements are the transformers modified."""
+        messages, elements = [], []
+        for source in self.sources:
+            for load, path in self.load_paths(source.connecting_element):
+                fix_messages, fixed = fix_load_transformer_phase_path(self.model, self.graph, path, load)
+                messages.extend(fix_messages)
+                elements.extend(name for name in fixed if name not in elements)
+        self.reset()
+        result = self._result(messages, elements, count=0)
+        result["count"] = len(elements)
+        return result
+
+    def fix_undersized_transformers(self):
+        """Upgrades the transformers smaller than the loads they serve. The elements are the transformers upgraded."""
+        self.model.set_names()
+        transformer_load_map = {}
+        for source in self.sources:
+            order, parent = self.bfs(source.connecting_element)
+            labels = transformer_labels(self.graph, order, parent)
+            for load in self.loads:
+                if load.connecting_element in labels:
+                    num_transformers, transformer_name = labels[load.connecting_element]
+                    if num_transformers == 1:
+                        transformer_load_map.setdefault(transformer_name, []).append(load.name)
+        messages, upgraded = upgrade_transformers(self.model, transformer_load_map)
+        result = self._result(messages, upgraded, count=0)
+        result["count"] = len(upgraded)
+        return result
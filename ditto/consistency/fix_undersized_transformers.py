@@ -1,10 +1,11 @@
-import networkx as nx
-from itertools import islice
-from ditto.network.network import Network
+import numpy as np
+from ditto.consistency.network_utils import build_network, bfs_tree, transformer_labels
 from ditto.models.power_source import PowerSource
 from ditto.models.load import Load
 from ditto.models.powertransformer import PowerTransformer
 
+TRANSFORMER_SIZES = [15,25,50,75,100,300,500,1000,2000,3000,5000] # upgrade sizes in kva
+
 """
 DO: Increase size of transformers to support the maximum loads downstream of it
 Requires a valid path from each load to the source
@@ -22,7 +23,6 @@ def fix_undersized_transformers(model,verbose=True):
     all_loads = set()
     transformer_load_map = {} # provides a mapping of all the loads connected to a transformer if there's a path from the load to a source
     result = True
-    transformer_sizes = [15,25,50,75,100,300,500,1000,2000,3000,5000] # upgrade sizes in kva
     model.set_names()
 
     for i in model.models:
@@ -41,56 +41,62 @@ def fix_undersized_transformers(model,verbose=True):
         print('Model does not contain any power source')
         return
 
+    # The graph does not depend on the source used to orient it, so it is only built once
+    ditto_graph = build_network(model, all_sources[0].connecting_element)
     for source in all_sources:
-        ditto_graph = Network()
-        ditto_graph.build(model,source.connecting_element)
-        ditto_graph.set_attributes(model)
-        ditto_graph.remove_open_switches(model) # This deletes the switches inside the networkx graph only
         source_name = source.connecting_element
-        all_paths = nx.single_source_shortest_path(ditto_graph.graph,source_name)
-        break_load = False
+        order, parent = bfs_tree(ditto_graph.graph,source_name) # One BFS tree instead of storing the paths to every node
+        labels = transformer_labels(ditto_graph.graph,order,parent)
         for load in all_loads:
             load_connection = load.connecting_element
-            if load_connection in all_paths:
-
-                ### check that each load has a path to the substation
-                path = all_paths[load_connection]
-                num_transformers = 0
-                transformer_names = []
-
-                for i in range(len(path)-1,0,-1):
-                    element = ditto_graph.graph[path[i]][path[i-1]]
-                    if element['equipment'] == 'PowerTransformer' and not element['is_substation']: #TODO: check if the transformer is part of a regulator. Shouldn't be a problem but could be depending on how regulator defined 
-                        transformer_names.append(element['name'])
-                        num_transformers+=1
+            if load_connection in labels:
 
                 ### If the transformer is connected correctly with the load underneath it, update the transformer-load mapping dictionary
+                num_transformers, transformer_name = labels[load_connection]
                 if num_transformers ==1:
-                    if not transformer_names[0] in transformer_load_map:
-                        transformer_load_map[transformer_names[0]] = []
-                    transformer_load_map[transformer_names[0]].append(load.name)
+                    if not transformer_name in transformer_load_map:
+                        transformer_load_map[transformer_name] = []
+                    transformer_load_map[transformer_name].append(load.name)
+
+        for message in upgrade_transformers(model, transformer_load_map)[0]:
+            print(message)
 
-        for transformer in transformer_load_map:
-            transformer_size = model[transformer].windings[0].rated_power/1000
-            total_load_kw = 0 
-            for load in transformer_load_map[transformer]:
-                load_kw = 0
-                for phase_load in model[load].phase_loads:
-                    total_load_kw += phase_load.p/1000
-                    load_kw += phase_load.p/1000
-            if transformer_size <total_load_kw:
-                new_transformer_size = None
-                for sz in transformer_sizes:
-                    if sz > total_load_kw:
-                        new_transformer_size = sz
-                        break
-                if new_transformer_size is not None:
-                    print(f'Tranformer {transformer} with size {transformer_size} kVA serves {total_load_kw} kW. Upgrading to {new_transformer_size} kVA')
-                    for winding in model[transformer].windings:
-                        winding.rated_power = new_transformer_size*1000
-                else:
-                    print(f'Tranformer {transformer} with size {transformer_size} kVA serves {total_load_kw} kW. No upgrade size found (max is 5000 kVA)')
 
-    
+def upgrade_transformers(model, transformer_load_map, transformer_sizes=TRANSFORMER_SIZES):
+    """
+    Increases the size of the transformers of transformer_load_map (transformer name -> names of the loads it serves)
+    that are smaller than the total load they serve, to the next standard size.
+    Returns the messages describing what was done, and the names of the transformers that were upgraded.
+    """
+    messages = []
+    upgraded = []
+    transformers = list(transformer_load_map)
 
+    # Sum the loads of every transformer at once. bincount adds the phase loads one by one in
+    # the order given, like a running sum of the kW, so the printed totals keep the same digits
+    load_kw = []
+    load_transformer = []
+    for index, transformer in enumerate(transformers):
+        for load in transformer_load_map[transformer]:
+            for phase_load in model[load].phase_loads:
+                load_kw.append(phase_load.p/1000)
+                load_transformer.append(index)
+    total_load_kws = np.bincount(np.array(load_transformer, dtype=np.int64), weights=np.array(load_kw, dtype=np.float64), minlength=len(transformers))
+    transformer_kvas = np.array([model[transformer].windings[0].rated_power/1000 for transformer in transformers], dtype=np.float64)
+    sizes = np.array(transformer_sizes, dtype=np.float64)
+    # Index of the first size strictly larger than the load
+    new_size_indices = np.searchsorted(sizes, total_load_kws, side='right')
 
+    for index in np.flatnonzero(transformer_kvas < total_load_kws):
+        transformer = transformers[index]
+        transformer_size = float(transformer_kvas[index])
+        total_load_kw = float(total_load_kws[index])
+        if new_size_indices[index] < len(sizes):
+            new_transformer_size = transformer_sizes[new_size_indices[index]]
+            messages.append(f'Tranformer {transformer} with size {transformer_size} kVA serves {total_load_kw} kW. Upgrading to {new_transformer_size} kVA')
+            for winding in model[transformer].windings:
+                winding.rated_power = new_transformer_size*1000
+            upgraded.append(transformer)
+        else:
+            messages.append(f'Tranformer {transformer} with size {transformer_size} kVA serves {total_load_kw} kW. No upgrade size found (max is 5000 kVA)')
+    return messages, upgraded
@@ -0,0 +1,128 @@
+import networkx as nx
+from ditto.network.network import Network
+from ditto.metrics import topology
+
+"""
+Helpers shared by the consistency checks.
+
+The graph used by the checks does not depend on the source: it is built once with the open
+switches removed, and all the path questions are answered from one breadth first search
+parent tree and the bridges of the graph, in linear time.
+"""
+
+
+def build_network(model, source_name):
+    """
+    Builds the Network of the model oriented from source_name, with the open switches removed
+    from the networkx graph.
+    """
+    ditto_graph = Network()
+    ditto_graph.build(model, source_name)
+    ditto_graph.set_attributes(model)
+    ditto_graph.remove_open_switches(model)  # This deletes the switches inside the networkx graph only
+    return ditto_graph
+
+
+def bfs_tree(graph, source_name):
+    """
+    Returns the nodes reachable from source_name in breadth first order, and the parent of each node.
+    Both are empty if source_name is not in graph.
+    """
+    if source_name not in graph:
+        return [], {}
+    return topology.bfs_tree_order(graph, source_name)
+
+
+def bfs_parents(graph, source_name):
+    """
+    Returns the parent of every node reachable from source_name in a breadth first search.
+    The paths obtained by following the parents are the ones of nx.single_source_shortest_path.
+    """
+    return bfs_tree(graph, source_name)[1]
+
+
+def path_from_source(parent, node):
+    """Returns the list of nodes from the source to node, following the parents."""
+    path = [node]
+    while parent[path[-1]] is not None:
+        path.append(parent[path[-1]])
+    return path[::-1]
+
+
+def bridge_set(graph, nodes=None):
+    """
+    Returns the bridges of graph (restricted to nodes if given), in both orientations.
+    """
+    if nodes is not None:
+        graph = graph.subgraph(nodes)
+    bridges = set()
+    for u, v in nx.bridges(graph):
+        bridges.add((u, v))
+        bridges.add((v, u))
+    return bridges
+
+
+def classify_paths(order, parent, bridges, nodes):
+    """
+    Classifies the number of simple paths between the root of a breadth first search
+    (given by its order and parents) and each of the given nodes.
+    Returns a dictionary mapping each node to "0", "1" or ">1".
+
+    The path is unique if and only if every edge of the breadth first search path is a bridge,
+    since an edge lying on a cycle can always be bypassed. This is propagated down from the source
+    in one traversal, instead of enumerating the simple paths of every node.
+    """
+    unique = {}
+    for node in order:
+        p = parent[node]
+        unique[node] = p is None or (unique[p] and (p, node) in bridges)
+
+    result = {}
+    for node in nodes:
+        if node not in parent:
+            result[node] = "0"
+        elif unique[node]:
+            result[node] = "1"
+        else:
+            result[node] = ">1"
+    return result
+
+
+def count_paths_from_source(graph, source_name, nodes):
+    """
+    Classifies the number of simple paths between source_name and each of the given nodes.
+    Returns a dictionary mapping each node to "0", "1" or ">1".
+    """
+    order, parent = bfs_tree(graph, source_name)
+    return classify_paths(order, parent, bridge_set(graph, order), nodes)
+
+
+def transformer_labels(graph, order, parent):
+    """
+    Labels every node of a breadth first search with the transformers between the source and the node,
+    ignoring the substation transformers. Returns a dictionary mapping each node to a
+    (number of transformers, name of the transformer closest to the node) tuple. The number stops at 2.
+
+    The labels are propagated down from the source in one pass, instead of walking the path of every node.
+    """
+    labels = {}
+    for node in order:
+        p = parent[node]
+        if p is None:
+            labels[node] = (0, None)
+            continue
+        count, name = labels[p]
+        element = graph[p][node]
+        if element.get('equipment') == 'PowerTransformer' and not element['is_substation']:  # Load edges have no equipment
+            count, name = min(count + 1, 2), element['name']
+        labels[node] = (count, name)
+    return labels
+
+
+def number_of_loops(graph):
+    """Returns the number of independent loops of graph (edges - nodes + connected components)."""
+    return (
+        graph.number_of_edges()
+        - graph.number_of_nodes()
+        + nx.number_connected_components(graph)
+    )
@@ -6,18 +6,26 @@ class GridLABDBase(object):
 
     _properties = []
 
+    # Names of the properties of the class and all its parents.
+    # Built once per class by build_property_index.
+    _property_names = None
+
     def __init__(self, *args, **kwargs):
 
-        for p in self._build_properties():
-            self._properties = self._properties + p
+        if self.__class__.__dict__.get("_property_names") is None:
+            self.__class__.build_property_index()
 
         for k, v in kwargs.items():
             self[k] = v
 
-    def _build_properties(self):
-        for c in self.__class__.mro():
-            if c != self.__class__ and c != object:
-                yield c._properties
+    @classmethod
+    def build_property_index(cls):
+        """Precomputes the set of the names of the properties of the class and its parents."""
+        names = set()
+        for c in cls.mro():
+            if c is not object:
+                names.update(p["name"] for p in c.__dict__.get("_properties", []))
+        cls._property_names = frozenset(names)
 
     def __getitem__(self, k):
         try:
@@ -28,7 +36,7 @@ class GridLABDBase(object):
             )
 
     def __setitem__(self, k, v):
-        if k not in [p["name"] for p in self._properties]:
+        if k not in self._property_names:
             raise AttributeError(
                 "Unable to set {} with {} on {}".format(k, v, self.__class__.__name__)
             )
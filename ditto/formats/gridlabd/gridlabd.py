@@ -43,6 +43,7 @@ def __create():
             parent = None
 
         c = generate_class(klass, properties, parent=parent)
+        c.build_property_index()
         klasses[klass] = c
 
     for k, c in klasses.items():
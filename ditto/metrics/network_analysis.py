@@ -9,6 +9,8 @@ import time
 import logging
 import json
 import json_tricks
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from six import string_types
 
 import networkx as nx
@@ -18,6 +20,7 @@ import pandas as pd
 from scipy.spatial import ConvexHull
 
 from ditto.network.network import Network
+from ditto.metrics import topology
 from ditto.models.regulator import Regulator
 from ditto.models.line import Line
 from ditto.models.capacitor import Capacitor
@@ -31,6 +34,14 @@ from ..readers.abstract_reader import AbstractReader
 
 logger = logging.getLogger(__name__)
 
+# Analyzer used by the worker processes of compute_all_metrics_per_feeder.
+# The workers are forked and inherit it, so only object indices and results are pickled.
+_WORKER_ANALYZER = None
+
+
+def _analyze_feeder_worker(feeder_name, object_indices):
+    return _WORKER_ANALYZER.analyze_feeder(feeder_name, object_indices)
+
 
 class NetworkAnalyzer(object):
     """
@@ -245,24 +256,23 @@ class NetworkAnalyzer(object):
             )
 
         for cpt, feeder_name in enumerate(self.feeder_names):
-            feeder_node_list = self.feeder_nodes[cpt]
-            self.feeder_networks[feeder_name] = self.G.graph.subgraph(feeder_node_list)
-
             # If the feeder information is perfect, that is the end of the story.
             # But, most of the time, some nodes are missing from the feeder information.
             # This means that we get disconnected feeder networks which will cause some
             # issues later (when computing the diameter for example)
-            # For this reason, the following code is trying to infer the missing nodes
-            # and edges such that the feeder networks are all connected in the end.
-            while not nx.is_connected(self.feeder_networks[feeder_name]):
-                self.connect_disconnected_components(feeder_name)
-                feeder_node_list = self.feeder_nodes[cpt]
-                self.feeder_networks[feeder_name] = self.G.graph.subgraph(
-                    feeder_node_list
-                )
+            # For this reason, the missing nodes are inferred such that the feeder
+            # networks are all connected in the end.
+            components = topology.components_within(
+                self.G.graph, self.feeder_nodes[cpt]
+            )
+            if len(components) > 1:
+                self.connect_disconnected_components(feeder_name, components)
+
+            self.feeder_networks[feeder_name] = self.G.graph.subgraph(
+                self.feeder_nodes[cpt]
+            )
 
             # Build the node_feeder_mapping
-            # for node in self.feeder_nodes[cpt]:
             for node in self.feeder_networks[feeder_name].nodes():
                 self.node_feeder_mapping[node] = feeder_name
 
@@ -542,50 +552,25 @@ class NetworkAnalyzer(object):
                 else:
                     logger.debug(obj.name, type(obj))
 
-    def connect_disconnected_components(self, feeder_name):
+    def connect_disconnected_components(self, feeder_name, components=None):
         """
         Helper function for split_network_into_feeders.
-        This function takes the first two disconnected components in the feeder network corresponding to feeder_name, and connects them with a shortest path.
-        The underlying assumption is that all nodes lying on the shortest path are actual members of this feeder.
+        This function connects all the disconnected components of the feeder network corresponding to feeder_name.
+        The components are joined in one pass by shortest paths in the complete network (see topology.connect_components).
+        The underlying assumption is that all nodes lying on these paths are actual members of this feeder.
         """
         # Get the index of feeder_name
         idx = self.feeder_names.index(feeder_name)
 
-        # Get the feeder_node_list
-        feeder_node_list = self.feeder_nodes[idx]
-
-        # Build the subgraph from the complete network
-        self.feeder_networks[feeder_name] = self.G.graph.subgraph(feeder_node_list)
-
-        # Compute the connected components
-        # Since we were called by split_network_into_feeders only if the graph was disconnected,
-        # we know that we have at least 2 elements in cc
-        cc = nx.connected_components(self.feeder_networks[feeder_name])
-
-        # cc is a generator and calling list() on it is a bad idea...
-        # We simply grab the first two components...
-        first_component = next(cc)
-        second_component = next(cc)
-
-        # ...and we grab one node at random from each component.
-        n1 = first_component.pop()
-        n2 = second_component.pop()
-
-        # If there are the same, you have a serious problem.
-        # Better kill it here than waiting for weird issues later...
-        if n1 == n2:
-            raise ValueError(
-                "Feeder splitting error. Nodes from 2 different components are the same."
+        if components is None:
+            components = topology.components_within(
+                self.G.graph, self.feeder_nodes[idx]
             )
 
-        # Compute the shortest path
-        path = nx.shortest_path(self.G.graph, n1, n2)
-
-        # For each node in the shortest path...
-        for node in path:
-            # ...if the node is not already in the feeder, then add it
-            if node not in self.feeder_nodes[idx]:
-                self.feeder_nodes[idx].append(node)
+        # The nodes returned are not in the feeder yet, so they can simply be appended
+        self.feeder_nodes[idx].extend(
+            topology.connect_components(self.G.graph, components)
+        )
 
     def setup_results_data_structure(self, *args):
         """
@@ -1034,8 +1019,9 @@ class NetworkAnalyzer(object):
                     hasattr(trans_obj, "to_element")
                     and trans_obj.to_element is not None
                 ):
-                    _net3 = _net.copy()
+                    _net3 = _net
                     if not _net3.has_node(trans_obj.to_element):
+                        _net3 = _net.copy()
                         _sp = nx.shortest_path(
                             self.G.graph, trans_obj.to_element, list(_net3.nodes())[0]
                         )
@@ -1232,8 +1218,9 @@ class NetworkAnalyzer(object):
 
                 # Get the primary
                 if hasattr(obj, "from_element") and obj.from_element is not None:
-                    _net2 = _net.copy()
+                    _net2 = _net
                     if not _net2.has_node(_src):
+                        _net2 = _net.copy()
                         _sp = nx.shortest_path(
                             self.G.graph, _src, list(_net2.nodes())[0]
                         )
@@ -1387,9 +1374,33 @@ class NetworkAnalyzer(object):
             logger.debug("Could not find feeder for {}".format(obj.name))
             return None
 
+    def analyze_feeder(self, feeder_name, object_indices):
+        """
+        Sets up the results of a feeder and analyzes the objects of the model at the given indices.
+        Returns the results of the feeder, its points, and the (object index, value) pairs of its load distribution.
+        """
+        self.results[feeder_name] = self.setup_results_data_structure(feeder_name)
+        load_distribution = []
+        for index in object_indices:
+            self.load_distribution = []
+            self.analyze_object(self.model.models[index], feeder_name)
+            load_distribution.extend((index, value) for value in self.load_distribution)
+        return (
+            self.results[feeder_name],
+            self.points.get(feeder_name),
+            load_distribution,
+        )
+
     def compute_all_metrics_per_feeder(self, **kwargs):
         """
         Computes all the available metrics for each feeder.
+
+        **Usage:**
+
+            >>> analyst.compute_all_metrics_per_feeder(max_workers=4)
+
+            With max_workers > 1, the feeders are analyzed in forked worker processes.
+            The results are the same as the serial computation.
         """
         # Enables changing the flag
         if "compute_kva_density_with_transformers" in kwargs and isinstance(
@@ -1442,19 +1453,61 @@ class NetworkAnalyzer(object):
             if self.substations[k] is not None and len(self.substations[k]) > 0
         ]
 
-        # Setup the data structures for all feeders
-        self.results = {
-            k: self.setup_results_data_structure(k) for k in mv_feeder_names
-        }
-
-        # Loop over the objects in the model and analyze them
-        for obj in self.model.models:
+        # Partition the objects of the model by feeder (keeping the model order)
+        feeder_objects = {k: [] for k in mv_feeder_names}
+        for index, obj in enumerate(self.model.models):
             # Get the feeder of this object if it exists
             if hasattr(obj, "name"):
                 _feeder_ref = self.get_feeder(obj)
                 # If we have a valid name, analyze the object
-                if _feeder_ref is not None and _feeder_ref in mv_feeder_names:
-                    self.analyze_object(obj, _feeder_ref)
+                if _feeder_ref is not None and _feeder_ref in feeder_objects:
+                    feeder_objects[_feeder_ref].append(index)
+
+        # Setup the data structures and analyze the objects of every feeder.
+        # Feeders are independent, so they can be analyzed in worker processes.
+        self.results = {k: None for k in mv_feeder_names}
+        max_workers = kwargs.get("max_workers", 1)
+        if max_workers > 1 and "fork" not in multiprocessing.get_all_start_methods():
+            logger.warning(
+                "Parallel metric computation requires the fork start method. Running serially."
+            )
+            max_workers = 1
+
+        if max_workers > 1 and len(mv_feeder_names) > 1:
+            global _WORKER_ANALYZER
+            _WORKER_ANALYZER = self
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=max_workers,
+                    mp_context=multiprocessing.get_context("fork"),
+                ) as executor:
+                    futures = [
+                        executor.submit(
+                            _analyze_feeder_worker, _feeder_ref, feeder_objects[_feeder_ref]
+                        )
+                        for _feeder_ref in mv_feeder_names
+                    ]
+                    feeder_outputs = [future.result() for future in futures]
+            finally:
+                _WORKER_ANALYZER = None
+        else:
+            feeder_outputs = [
+                self.analyze_feeder(_feeder_ref, feeder_objects[_feeder_ref])
+                for _feeder_ref in mv_feeder_names
+            ]
+
+        # Merge the feeder results. The load distribution is put back in model order.
+        load_distribution = []
+        for _feeder_ref, (results, points, loads) in zip(
+            mv_feeder_names, feeder_outputs
+        ):
+            self.results[_feeder_ref] = results
+            if points is not None:
+                self.points[_feeder_ref] = points
+            load_distribution.extend(loads)
+        self.load_distribution = [
+            value for _, value in sorted(load_distribution, key=lambda x: x[0])
+        ]
 
         # Do some post-processing of the results before returning them
         #
@@ -2016,9 +2069,9 @@ class NetworkAnalyzer(object):
     def diameter(self, *args):
         """Returns the diameter of the network."""
         if args:
-            return nx.diameter(args[0])
+            return topology.diameter(args[0])
         else:
-            return nx.diameter(self.G.graph)
+            return topology.diameter(self.G.graph)
 
     def loops_within_feeder(self, *args):
         """Returns the number of loops within a feeder."""
@@ -2033,76 +2086,20 @@ class NetworkAnalyzer(object):
         Returns a dictionary where keys are transformer names and values are lists holding names of
         loads downstream of the transformer.
         """
+        # The upstream transformer of every node is indexed by the Network in one traversal
         transformer_load_mapping = {}
-        load_list = []
         for _obj in self.model.models:
-            if isinstance(_obj, Load):
-                load_list.append(_obj)
-
-        # Get the connecting elements of the loads.
-        # These will be the starting points of the upstream walks in the graph
-        connecting_elements = [load.connecting_element for load in load_list]
-
-        # For each connecting element...
-        for idx, end_node in enumerate(connecting_elements):
-
-            if self.G.digraph.has_node(end_node):
-                should_continue = True
-            else:
-                should_continue = False
-
-            # Find the upstream transformer by walking the graph upstream
-            while should_continue:
-
-                # Get predecessor node of current node in the DAG
-                try:
-                    from_node = next(self.G.digraph.predecessors(end_node))
-                except StopIteration:
-                    should_continue = False
-                    continue
-
-                # Look for the type of equipment that makes the connection between from_node and to_node
-                _type = None
-                if (from_node, end_node) in self.edge_equipment:
-                    _type = self.edge_equipment[(from_node, end_node)]
-                elif (end_node, from_node) in self.edge_equipment:
-                    _type = self.edge_equipment[(end_node, from_node)]
-
-                # It could be a Line, a Transformer...
-                # If it is a transformer, then we have found the upstream transformer...
-                if _type == "PowerTransformer":
-
-                    # ...we can then stop the loop...
-                    should_continue = False
-
-                    # ...and grab the transformer name to retrieve the data from the DiTTo object
-                    if (from_node, end_node) in self.edge_equipment_name:
-                        transformer_name = self.edge_equipment_name[
-                            (from_node, end_node)
-                        ]
-                    elif (end_node, from_node) in self.edge_equipment_name:
-                        transformer_name = self.edge_equipment_name[
-                            (end_node, from_node)
-                        ]
-                    # If we cannot find the object, raise an error because it sould not be the case...
-                    else:
-                        raise ValueError(
-                            "Unable to find equipment between {_from} and {_to}".format(
-                                _from=from_node, _to=end_node
-                            )
-                        )
-
+            if isinstance(_obj, Load) and self.G.digraph.has_node(
+                _obj.connecting_element
+            ):
+                transformer_name = self.G.get_upstream_transformer(
+                    self.model, _obj.connecting_element
+                )
+                if transformer_name is not None:
                     if transformer_name in transformer_load_mapping:
-                        transformer_load_mapping[transformer_name].append(
-                            load_list[idx].name
-                        )
+                        transformer_load_mapping[transformer_name].append(_obj.name)
                     else:
-                        transformer_load_mapping[transformer_name] = [
-                            load_list[idx].name
-                        ]
-
-                # Go upstream...
-                end_node = from_node
+                        transformer_load_mapping[transformer_name] = [_obj.name]
 
         return transformer_load_mapping
 
@@ -2110,11 +2107,11 @@ class NetworkAnalyzer(object):
         """Returns the average path length of the network."""
         if args:
             try:
-                return nx.average_shortest_path_length(args[0])
+                return topology.average_path_length(args[0])
             except ZeroDivisionError:
                 return 0
         else:
-            return nx.average_shortest_path_length(self.G.graph)
+            return topology.average_path_length(self.G.graph)
 
     def compute_node_line_mapping(self):
         """
@@ -2134,12 +2131,16 @@ class NetworkAnalyzer(object):
                         (obj.from_element, obj.to_element)
                     ] = obj.name
 
-    def get_impedance_list_between_nodes(self, net, node1, node2):
-        """TODO"""
-        impedance_list = []
-        line_list = self.list_lines_betweeen_nodes(net, node1, node2)
-        for line in line_list:
-            line_object = self.model[line]
+    def get_positive_sequence_impedance(self, line_name):
+        """
+        Returns the positive sequence impedance of a Line (or the single impedance of a 1x1 matrix).
+        Returns None if the line has no impedance matrix. Values are cached per line name.
+        """
+        if not hasattr(self, "_positive_sequence_impedances"):
+            self._positive_sequence_impedances = {}
+        if line_name not in self._positive_sequence_impedances:
+            Z_plus = None
+            line_object = self.model[line_name]
             if (
                 hasattr(line_object, "impedance_matrix")
                 and line_object.impedance_matrix is not None
@@ -2147,21 +2148,79 @@ class NetworkAnalyzer(object):
             ):
                 Z = np.array(line_object.impedance_matrix)
                 if Z.shape == (1, 1):
-                    impedance_list.append(Z[0, 0])
+                    Z_plus = Z[0, 0]
                 # elif Z.shape==(3,3):
                 else:
                     Z2 = self.abs_reader.get_sequence_impedance_matrix(Z)
                     Z_plus = self.abs_reader.get_positive_sequence_impedance(Z2)
-                    impedance_list.append(Z_plus)
+            self._positive_sequence_impedances[line_name] = Z_plus
+        return self._positive_sequence_impedances[line_name]
+
+    def get_impedance_list_between_nodes(self, net, node1, node2):
+        """
+        Returns the list of positive sequence impedances of the lines on the shortest path between node1 and node2.
+        """
+        impedance_list = []
+        line_list = self.list_lines_betweeen_nodes(net, node1, node2)
+        for line in line_list:
+            Z_plus = self.get_positive_sequence_impedance(line)
+            if Z_plus is not None:
+                impedance_list.append(Z_plus)
         return impedance_list
 
+    def get_impedance_between_nodes(self, node1, node2):
+        """
+        Returns the sum of the line positive sequence impedances between node1 and node2.
+
+        Uses the rooted tree index of the network, so that after one pass over the lines,
+        each query costs O(log n).
+        """
+        tree = self.G.rooted_tree()
+        if getattr(self, "_cumulative_impedance_tree", None) is not tree:
+            if not hasattr(self, "node_line_mapping"):
+                self.compute_node_line_mapping()
+            edge_impedances = {}
+            for (a, b), line_name in self.node_line_mapping.items():
+                Z_plus = self.get_positive_sequence_impedance(line_name)
+                if Z_plus is not None:
+                    edge_impedances[(a, b)] = Z_plus
+                    edge_impedances[(b, a)] = Z_plus
+            self._cumulative_impedance = tree.cumulative(
+                edge_impedances, dtype=np.complex128
+            )
+            self._cumulative_impedance_tree = tree
+        return tree.distance(node1, node2, values=self._cumulative_impedance)
+
+    def _tree_path(self, net, node1, node2):
+        """
+        Returns the path between node1 and node2 from the rooted tree index of the network,
+        or None if the network is meshed or the path leaves net.
+        """
+        if self.G is None:
+            return None
+        if getattr(self, "_radial_graph", None) is not self.G.graph:
+            self._is_radial = topology.is_radial(self.G.graph)
+            self._radial_graph = self.G.graph
+        if not self._is_radial:
+            return None
+        tree = self.G.rooted_tree()
+        if node1 not in tree or node2 not in tree:
+            return None
+        path = tree.path(node1, node2)
+        if net is not self.G.graph and not all(net.has_node(n) for n in path):
+            return None
+        return path
+
     def list_lines_betweeen_nodes(self, net, node1, node2):
         """
         The function takes a network and two nodes as inputs.
         It returns a list of Line names forming the shortest path between the two nodes.
         """
-        # Compute the shortest path as a sequence of node names
-        path = nx.shortest_path(net, node1, node2)
+        # On radial networks, the unique path is read from the rooted tree index
+        path = self._tree_path(net, node1, node2)
+        if path is None:
+            # Compute the shortest path as a sequence of node names
+            path = nx.shortest_path(net, node1, node2)
         # Transform it in a sequence of edges (n0,n1),(n1,n2),(n2,n3)...
         edge_list = [(a, b) for a, b in zip(path[:-1], path[1:])]
         # Compute the sequence of corresponding lines
@@ -2174,6 +2233,16 @@ class NetworkAnalyzer(object):
                 line_list.append(self.node_line_mapping[edge[::-1]])
         return line_list
 
+    @staticmethod
+    def _distance_to(dist, source, node):
+        """Looks node up in the distances computed from source, raising like nx.shortest_path_length."""
+        try:
+            return dist[node]
+        except KeyError:
+            raise nx.NetworkXNoPath(
+                "Node {n} not reachable from {s}".format(n=node, s=source)
+            )
+
     def average_regulator_sub_distance(self, *args):
         """
         Returns the average distance between the substation and the regulators (if any).
@@ -2192,15 +2261,12 @@ class NetworkAnalyzer(object):
             _sp = nx.shortest_path(self.G.graph, _src, list(_net.nodes())[0])
             for n1, n2 in zip(_sp[:-1], _sp[1:]):
                 _net.add_edge(n1, n2, length=self.G.graph[n1][n2]["length"])
+        dist = topology.distances_from_source(_net, _src, weight="length")
         L = []
         for obj in self.model.models:
             if isinstance(obj, Regulator):
                 if _net.has_node(obj.from_element):
-                    L.append(
-                        nx.shortest_path_length(
-                            _net, _src, obj.from_element, weight="length"
-                        )
-                    )
+                    L.append(self._distance_to(dist, _src, obj.from_element))
         if len(L) > 0:
             return np.mean(L)
         else:
@@ -2224,15 +2290,12 @@ class NetworkAnalyzer(object):
             _sp = nx.shortest_path(self.G.graph, _src, list(_net.nodes())[0])
             for n1, n2 in zip(_sp[:-1], _sp[1:]):
                 _net.add_edge(n1, n2, length=self.G.graph[n1][n2]["length"])
+        dist = topology.distances_from_source(_net, _src, weight="length")
         L = []
         for obj in self.model.models:
             if isinstance(obj, Capacitor):
                 if _net.has_node(obj.connecting_element):
-                    L.append(
-                        nx.shortest_path_length(
-                            _net, _src, obj.connecting_element, weight="length"
-                        )
-                    )
+                    L.append(self._distance_to(dist, _src, obj.connecting_element))
         if len(L) > 0:
             return np.mean(L)
         else:
@@ -2256,16 +2319,13 @@ class NetworkAnalyzer(object):
             _sp = nx.shortest_path(self.G.graph, _src, list(_net.nodes())[0])
             for n1, n2 in zip(_sp[:-1], _sp[1:]):
                 _net.add_edge(n1, n2, length=self.G.graph[n1][n2]["length"])
+        dist = topology.distances_from_source(_net, _src, weight="length")
         L = []
         for obj in self.model.models:
             if isinstance(obj, Line) and obj.is_recloser == 1:
                 if hasattr(obj, "from_element") and obj.from_element is not None:
                     if _net.has_node(obj.from_element):
-                        L.append(
-                            nx.shortest_path_length(
-                                _net, _src, obj.from_element, weight="length"
-                            )
-                        )
+                        L.append(self._distance_to(dist, _src, obj.from_element))
         if len(L) > 0:
             return np.mean(L)
         else:
@@ -2286,15 +2346,14 @@ class NetworkAnalyzer(object):
         else:
             _net = self.G.graph
             _src = self.source
-        dist = {}
         _net = _net.copy()
         if not _net.has_node(_src):
             _sp = nx.shortest_path(self.G.graph, _src, list(_net.nodes())[0])
             for n1, n2 in zip(_sp[:-1], _sp[1:]):
                 _net.add_edge(n1, n2, length=self.G.graph[n1][n2]["length"])
-        for node in _net.nodes():
-            dist[node] = nx.shortest_path_length(_net, _src, node, weight="length")
-        return np.max(list(dist.values())) * 0.000621371  # Convert length to miles
+        return (
+            topology.max_distance_from_source(_net, _src, weight="length") * 0.000621371
+        )  # Convert length to miles
 
     def furtherest_node_miles_clever(self):
         """
@@ -2304,13 +2363,13 @@ class NetworkAnalyzer(object):
 
         .. warning:: Not working....
         """
-        dist = {}
-        for node in self.G.graph.nodes():
-            if nx.degree(self.G.graph, node) == 1:
-                dist[node] = nx.shortest_path_length(
-                    self.G.graph, self.source, node, weight="length"
-                )
-        return np.max(list(dist.values())) * 0.000621371  # Convert length to miles
+        leaves = [n for n, d in self.G.graph.degree() if d == 1]
+        return (
+            topology.max_distance_from_source(
+                self.G.graph, self.source, weight="length", nodes=leaves
+            )
+            * 0.000621371
+        )  # Convert length to miles
 
     def lv_length_miles(self):
         """Returns the sum of the low voltage line lengths in miles."""
@@ -0,0 +1,220 @@
+# coding: utf8
+
+"""
+Topology metrics for distribution feeders.
+
+Distribution feeders are almost always radial, in which case the usual networkx
+metrics (diameter, average shortest path length, eccentricity) can be computed
+in linear time from a single traversal instead of all pairs shortest paths.
+The functions of this module detect radial networks and use the tree algorithms
+for them, falling back to the general networkx algorithms otherwise, so the
+results are the same in both cases.
+"""
+from __future__ import absolute_import, division, print_function
+from builtins import super, range, zip, round, map
+
+from collections import deque
+
+import networkx as nx
+
+
+def is_radial(graph):
+    """Returns True if graph is an undirected tree (connected and without loops)."""
+    if graph.is_directed() or graph.is_multigraph():
+        return False
+    n = graph.number_of_nodes()
+    return n > 0 and graph.number_of_edges() == n - 1 and nx.is_connected(graph)
+
+
+def bfs_tree_order(graph, source):
+    """
+    Returns the nodes of graph in breadth first order from source, and the parent of each node.
+    The parent of the source is None.
+    """
+    parent = {source: None}
+    order = [source]
+    queue = deque([source])
+    while queue:
+        node = queue.popleft()
+        for neighbor in graph[node]:
+            if neighbor not in parent:
+                parent[neighbor] = node
+                order.append(neighbor)
+                queue.append(neighbor)
+    return order, parent
+
+
+def _farthest_node(graph, source):
+    """Returns the node the furthest from source (in number of edges) and its distance."""
+    order, parent = bfs_tree_order(graph, source)
+    depth = {source: 0}
+    for node in order[1:]:
+        depth[node] = depth[parent[node]] + 1
+    return order[-1], depth[order[-1]]
+
+
+def diameter(graph):
+    """
+    Returns the diameter of graph, in number of edges.
+
+    Uses two breadth first searches on radial networks, nx.diameter otherwise.
+    """
+    if not is_radial(graph):
+        return nx.diameter(graph)
+    start = next(iter(graph.nodes()))
+    end, _ = _farthest_node(graph, start)
+    _, distance = _farthest_node(graph, end)
+    return distance
+
+
+def average_path_length(graph):
+    """
+    Returns the average shortest path length of graph, in number of edges.
+
+    On radial networks, every edge lies on the paths between the s nodes on one side
+    and the n-s nodes on the other side, so the sum of all pair distances is the sum
+    of s*(n-s) over the edges. Uses nx.average_shortest_path_length otherwise.
+    """
+    if not is_radial(graph):
+        return nx.average_shortest_path_length(graph)
+    n = graph.number_of_nodes()
+    if n == 1:
+        return 0
+    order, parent = bfs_tree_order(graph, next(iter(graph.nodes())))
+    size = dict.fromkeys(order, 1)
+    total = 0
+    for node in reversed(order[1:]):
+        size[parent[node]] += size[node]
+        total += size[node] * (n - size[node])
+    return 2.0 * total / (n * (n - 1))
+
+
+def distances_from_source(graph, source, weight="length"):
+    """
+    Returns a dictionary of the weighted distances from source to every reachable node.
+
+    Missing weights count as 1, like in networkx. Radial networks are traversed once,
+    other networks use a single Dijkstra.
+    """
+    if not is_radial(graph):
+        return nx.single_source_dijkstra_path_length(graph, source, weight=weight)
+    order, parent = bfs_tree_order(graph, source)
+    distance = {source: 0}
+    for node in order[1:]:
+        distance[node] = distance[parent[node]] + graph[parent[node]][node].get(weight, 1)
+    return distance
+
+
+def max_distance_from_source(graph, source, weight="length", nodes=None):
+    """
+    Returns the maximum weighted distance between source and the given nodes (all nodes by default).
+
+    Raises nx.NetworkXNoPath if one of the nodes cannot be reached from source.
+    """
+    distance = distances_from_source(graph, source, weight=weight)
+    if nodes is None:
+        nodes = graph.nodes()
+    result = None
+    for node in nodes:
+        if node not in distance:
+            raise nx.NetworkXNoPath(
+                "Node {n} not reachable from {s}".format(n=node, s=source)
+            )
+        if result is None or distance[node] > result:
+            result = distance[node]
+    return result
+
+
+def components_within(graph, nodes):
+    """
+    Returns the connected components (as sets) of the subgraph of graph induced by nodes,
+    without building the subgraph.
+    """
+    order = [n for n in nodes if n in graph]
+    nodes = set(order)
+    components = []
+    seen = set()
+    for start in order:
+        if start in seen:
+            continue
+        component = {start}
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            for neighbor in graph[node]:
+                if neighbor in nodes and neighbor not in component:
+                    component.add(neighbor)
+                    queue.append(neighbor)
+        seen |= component
+        components.append(component)
+    return components
+
+
+def connect_components(graph, components):
+    """
+    Returns the list of nodes of graph to add to the given components so that they become connected.
+
+    A single breadth first search from all the components at once labels every node with its
+    closest component. Each edge between two labels gives a path joining two components, and a
+    minimum spanning tree over these paths connects all of them (Mehlhorn's approximation of the
+    Steiner tree).
+
+    Raises nx.NetworkXNoPath if the components are not connected in graph.
+    """
+    label = {}
+    parent = {}
+    depth = {}
+    queue = deque()
+    for i, component in enumerate(components):
+        for node in component:
+            label[node] = i
+            parent[node] = None
+            depth[node] = 0
+            queue.append(node)
+    while queue:
+        node = queue.popleft()
+        for neighbor in graph[node]:
+            if neighbor not in label:
+                label[neighbor] = label[node]
+                parent[neighbor] = node
+                depth[neighbor] = depth[node] + 1
+                queue.append(neighbor)
+
+    links = [
+        (depth[u] + depth[v] + 1, u, v)
+        for u, v in graph.edges()
+        if u in label and v in label and label[u] != label[v]
+    ]
+    links.sort(key=lambda link: link[0])
+
+    # Kruskal over the components, with a union find on their indices
+    root = list(range(len(components)))
+
+    def find(i):
+        while root[i] != i:
+            root[i] = root[root[i]]
+            i = root[i]
+        return i
+
+    added = []
+    added_set = set()
+    joined = 1
+    for _, u, v in links:
+        if joined >= len(components):
+            break
+        a = find(label[u])
+        b = find(label[v])
+        if a == b:
+            continue
+        root[a] = b
+        joined += 1
+        # Walk back to both components. Nodes with a parent are outside of the components.
+        for node in (u, v):
+            while parent[node] is not None and node not in added_set:
+                added.append(node)
+                added_set.add(node)
+                node = parent[node]
+
+    if joined < len(components):
+        raise nx.NetworkXNoPath("The components are not connected in the graph.")
+    return added
@@ -25,6 +25,15 @@ class Timeseries(DiTToHasTraits):
         help="""The absolute location on disk of the data""", default_value=None
     )
 
+    data_file = Unicode(
+        help="""The location on disk of the binary column file holding the data (see ditto.timeseries.backend). The data is memory-mapped when it is accessed""",
+        default_value=None,
+    )
+    data_key = Unicode(
+        help="""The key of the profile in the column file data_file""",
+        default_value=None,
+    )
+
     data_location_kvar = Unicode(
         help="""The absolute location on disk of the data""", default_value=None
     )
@@ -41,13 +41,17 @@ class system_structure_modifier(Modifier):
     Author: Nicolas Gensollen. December 2017.
     """
 
-    def __init__(self, model, *args):
+    def __init__(self, model, *args, **kwargs):
         """Class CONSTRUCTOR.
 
         :param model: DiTTo model on which to perform modifications
         :type model: DiTTo model
         :param source: Name of the source node. (The network will be built from this node)
         :type source: String (name of object is used)
+        :param set_attributes: Copy the attributes of the objects on the nodes and edges of the graph. Optional. Default=True
+        :type set_attributes: bool
+
+        .. note:: terminals_to_phases only needs the equipment on the edges, which is set when the graph is built, so set_attributes=False can be used to skip the copy.
 
         .. warning:: source cannot be the name of a line or a transformer since these objects are not nodes but edges in the Network representation.
         """
@@ -95,7 +99,8 @@ class system_structure_modifier(Modifier):
 
         self.model.set_names()
         # Set the attributes in the graph
-        self.G.set_attributes(self.model)
+        if kwargs.get("set_attributes", True):
+            self.G.set_attributes(self.model)
 
         self.model.set_names()
 
@@ -363,74 +368,76 @@ class system_structure_modifier(Modifier):
         # This is useful to run some tests (count, intersection...)
         self._list_of_feeder_objects = []
 
-        # First step: Find all the transformer objects in the models
-        for elt in self.model.models:
-            if isinstance(elt, PowerTransformer):
+        # First step: Find all the substation transformers in the models
+        substations = [
+            elt
+            for elt in self.model.models
+            if isinstance(elt, PowerTransformer)
+            and hasattr(elt, "is_substation")
+            and elt.is_substation == 1
+            and hasattr(elt, "name")
+        ]
+
+        # Step 2: Find all elements downstream of these substations (in one batch)
+        all_downstream_elts = self.G.get_all_elements_downstream_batch(
+            self.model, [elt.to_element for elt in substations]
+        )
+
+        for elt in substations:
+            downstream_elts = all_downstream_elts[elt.to_element]
 
-                # If we have a substation...
+            # Now, we might have substations in these elements.
+            # In this case we simply do nothing since these lower substations will be consider later in the outer loop.
+            #
+            # TODO:: Find a more clever way to do that without looping for nothing...
+            #
+            skip = False
+            for down_elt in downstream_elts:
                 if (
-                    hasattr(elt, "is_substation")
-                    and elt.is_substation == 1
-                    and hasattr(elt, "name")
+                    hasattr(down_elt, "is_substation")
+                    and down_elt.is_substation == 1
                 ):
-
-                    # Step 2: Find all elements downstream of this substation
-                    downstream_elts = self.G.get_all_elements_downstream(
-                        self.model, elt.to_element
+                    logger.debug(
+                        "Info: substation {a} found downstream of substation {b}".format(
+                            b=elt.name, a=down_elt.name
+                        )
                     )
+                    skip = True
+                    break
+            # If no substation was found downstream, then set the substation_name and feeder_name attributes of the objects
+            if not skip:
+                self._list_of_feeder_objects.append(downstream_elts)
 
-                    # Now, we might have substations in these elements.
-                    # In this case we simply do nothing since these lower substations will be consider later in the outer loop.
-                    #
-                    # TODO:: Find a more clever way to do that without looping for nothing...
-                    #
-                    skip = False
-                    for down_elt in downstream_elts:
-                        if (
-                            hasattr(down_elt, "is_substation")
-                            and down_elt.is_substation == 1
-                        ):
-                            logger.debug(
-                                "Info: substation {a} found downstream of substation {b}".format(
-                                    b=elt.name, a=down_elt.name
-                                )
+                for down_elt in downstream_elts:
+                    if (
+                        down_elt.substation_name is not None
+                        and len(down_elt.substation_name) != 0
+                    ):
+                        raise ValueError(
+                            "Substation name for element {name} was already set at {_previous}. Trying to overwrite with {_next}".format(
+                                name=down_elt.name,
+                                _previous=down_elt.substation_name,
+                                _next=elt.name,
                             )
-                            skip = True
-                            break
-                    # If no substation was found downstream, then set the substation_name and feeder_name attributes of the objects
-                    if not skip:
-                        self._list_of_feeder_objects.append(downstream_elts)
-
-                        for down_elt in downstream_elts:
-                            if (
-                                down_elt.substation_name is not None
-                                and len(down_elt.substation_name) != 0
-                            ):
-                                raise ValueError(
-                                    "Substation name for element {name} was already set at {_previous}. Trying to overwrite with {_next}".format(
-                                        name=down_elt.name,
-                                        _previous=down_elt.substation_name,
-                                        _next=elt.name,
-                                    )
-                                )
-                            else:
-                                down_elt.substation_name = elt.name
+                        )
+                    else:
+                        down_elt.substation_name = elt.name
 
-                            if (
-                                down_elt.feeder_name is not None
-                                and len(down_elt.feeder_name) != 0
-                            ):
-                                raise ValueError(
-                                    "Feeder name for element {name} was already set at {_previous}. Trying to overwrite with {_next}".format(
-                                        name=down_elt.name,
-                                        _previous=down_elt.feeder_name,
-                                        _next="Feeder_" + elt.name,
-                                    )
-                                )
-                            else:
-                                down_elt.feeder_name = (
-                                    "Feeder_" + elt.name
-                                )  # Change the feeder naming convention here...
+                    if (
+                        down_elt.feeder_name is not None
+                        and len(down_elt.feeder_name) != 0
+                    ):
+                        raise ValueError(
+                            "Feeder name for element {name} was already set at {_previous}. Trying to overwrite with {_next}".format(
+                                name=down_elt.name,
+                                _previous=down_elt.feeder_name,
+                                _next="Feeder_" + elt.name,
+                            )
+                        )
+                    else:
+                        down_elt.feeder_name = (
+                            "Feeder_" + elt.name
+                        )  # Change the feeder naming convention here...
 
     def replace_kth_switch_with_recloser(self):
         """
@@ -744,10 +751,6 @@ class system_structure_modifier(Modifier):
             if isinstance(_obj, Load):
                 load_list.append(_obj)
 
-        # Get the connecting elements of the loads.
-        # These will be the starting points of the upstream walks in the graph
-        connecting_elements = [load.connecting_element for load in load_list]
-
         # List of lists where we store the names of the lines between the loads and the upstream transformer.
         # We need to keep track of these to remove/add wires once we have the phase of the transformer
         line_names = []
@@ -755,79 +758,20 @@ class system_structure_modifier(Modifier):
         # List where we store the names of the upstream transformers for every load
         transformer_names = []
 
-        # For each connecting element...
-        for idx, end_node in enumerate(connecting_elements):
-
-            continu = True
-            line_names.append([])
-
-            # Find the upstream transformer by walking the graph upstream
-            while continu:
-
-                # Get predecessor node of current node in the DAG
-                from_node = next(self.G.digraph.predecessors(end_node))
-
-                # Look for the type of equipment that makes the connection between from_node and to_node
-                _type = None
-                if (from_node, end_node) in self.edge_equipment:
-                    _type = self.edge_equipment[(from_node, end_node)]
-                elif (end_node, from_node) in self.edge_equipment:
-                    _type = self.edge_equipment[(end_node, from_node)]
-
-                # It could be a Line, a Transformer...
-                # If it is a transformer, then we have found the upstream transformer...
-                if _type == "PowerTransformer":
-
-                    # ...we can then stop the loop...
-                    continu = False
-
-                    # ...and grab the transformer name to retrieve the data from the DiTTo object
-                    if (from_node, end_node) in self.edge_equipment_name:
-                        transformer_names.append(
-                            self.edge_equipment_name[(from_node, end_node)]
-                        )
-                        self.model[
-                            load_list[idx].name
-                        ].upstream_transformer_name = self.edge_equipment_name[
-                            (from_node, end_node)
-                        ]
-                    elif (end_node, from_node) in self.edge_equipment_name:
-                        transformer_names.append(
-                            self.edge_equipment_name[(end_node, from_node)]
-                        )
-                        self.model[
-                            load_list[idx].name
-                        ].upstream_transformer_name = self.edge_equipment_name[
-                            (end_node, from_node)
-                        ]
-                    # If we cannot find the object, raise an error because it sould not be the case...
-                    else:
-                        raise ValueError(
-                            "Unable to find equipment between {_from} and {_to}".format(
-                                _from=from_node, _to=end_node
-                            )
-                        )
-
-                # ...if it is a Line, store the name to modify the wires later, once the upstream transformer will be found
-                elif _type == "Line":
-                    if (from_node, end_node) in self.edge_equipment_name:
-                        line_names[-1].append(
-                            self.edge_equipment_name[(from_node, end_node)]
-                        )
-                    elif (end_node, from_node) in self.edge_equipment_name:
-                        line_names[-1].append(
-                            self.edge_equipment_name[(end_node, from_node)]
-                        )
-                    # Again, if we cannot find the object, raise an error because it sould not be the case...
-                    else:
-                        raise ValueError(
-                            "Unable to find equipment between {_from} and {_to}".format(
-                                _from=from_node, _to=end_node
-                            )
-                        )
-
-                # Go upstream...
-                end_node = from_node
+        # The upstream transformer of every node, and the lines in between, are indexed by the Network
+        for load in load_list:
+            transformer_name = self.G.get_upstream_transformer(
+                self.model, load.connecting_element
+            )
+            if transformer_name is None:
+                raise ValueError(
+                    "Unable to find the upstream transformer of load {}".format(
+                        load.name
+                    )
+                )
+            transformer_names.append(transformer_name)
+            load.upstream_transformer_name = transformer_name
+            line_names.append(self.G.get_upstream_lines(load.connecting_element))
 
         # At this point, we exited the loop, so we have found the transformers for all the load objects
         # Cast the list to a Numpy array first
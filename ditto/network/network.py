@@ -5,10 +5,11 @@ from builtins import super, range, zip, round, map
 
 import logging
 import random
-import traceback
+from collections import deque
 
 import networkx as nx
 from ditto.models.base import DiTToHasTraits
+from ditto.network.tree import RootedTree, SubtreeIndex
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +27,10 @@ class Network:
         self.attributes_set = (
             False  # Flag that indicates whether the attributes have been set or not.
         )
+        self.source = None
+        self._rooted_tree = None  # Cached RootedTree of the digraph, see rooted_tree()
+        self._upstream_index = None  # Cached upstream transformer index, see build_upstream_index()
+        self._subtree_index = None  # Cached SubtreeIndex of the digraph, see subtree_index()
 
     def provide_graphs(self, graph, digraph):
         """
@@ -39,11 +44,18 @@ class Network:
         self.graph = graph
         self.digraph = digraph
         self.is_built = True
+        self._rooted_tree = None
+        self._upstream_index = None
+        self._subtree_index = None
 
     # Only builds connected nodes
     #
     # Nicolas modification: Added source in the args for bfs
     def build(self, model, source="sourcebus"):
+        self.source = source
+        self._rooted_tree = None
+        self._upstream_index = None
+        self._subtree_index = None
         self.graph = nx.Graph()
         graph_edges = set()
         graph_nodes = set()
@@ -154,6 +166,10 @@ class Network:
     """
 
     def rebuild_digraph(self, model, source="sourcebus"):
+        self.source = source
+        self._rooted_tree = None
+        self._upstream_index = None
+        self._subtree_index = None
         self.digraph = nx.DiGraph()
         self.digraph.add_edges_from(list(self.bfs_order(source=source)))
 
@@ -340,45 +356,120 @@ class Network:
                         is_open = False
 
                 if is_open:
+                    self._rooted_tree = None
+                    self._upstream_index = None
+                    self._subtree_index = None
                     self.graph.remove_edge(m.from_element, m.to_element)
                     if self.digraph.has_edge(m.from_element, m.to_element):
                         self.digraph.remove_edge(m.from_element, m.to_element)
                     if self.digraph.has_edge(m.to_element, m.from_element):
                         self.digraph.remove_edge(m.to_element, m.from_element)
 
+    def rooted_tree(self):
+        """
+        Returns the RootedTree index of the digraph, rooted at the source.
+        It is computed once and cached until the graphs are rebuilt or modified through this class.
+        """
+        if self._rooted_tree is None:
+            root = self.source
+            if root is None or not self.digraph.has_node(root):
+                root = next((n for n, d in self.digraph.in_degree() if d == 0), None)
+                if root is None:
+                    raise ValueError(
+                        "Cannot root the network: the digraph has no node without a parent (empty or cyclic)"
+                    )
+            self._rooted_tree = RootedTree(self.digraph, root, graph=self.graph)
+        return self._rooted_tree
+
+    def build_upstream_index(self):
+        """
+        Assigns every node of the digraph its closest upstream PowerTransformer in one top-down traversal.
+        The parent of every node and the equipment connecting them are stored as well, such that the lines
+        between a node and its upstream transformer can be listed without searching the graph.
+        The index is cached until the graphs are rebuilt or modified through this class.
+        """
+        transformer = {}
+        parent = {}
+        edge = {}
+        roots = [n for n, d in self.digraph.in_degree() if d == 0]
+        for root in roots:
+            transformer[root] = None
+            parent[root] = None
+            queue = deque([root])
+            while queue:
+                node = queue.popleft()
+                for child in self.digraph.successors(node):
+                    if child in parent:
+                        continue
+                    data = self.digraph[node][child]
+                    parent[child] = node
+                    edge[child] = (data.get("equipment"), data.get("equipment_name"))
+                    if edge[child][0] == "PowerTransformer":
+                        transformer[child] = edge[child][1]
+                    else:
+                        transformer[child] = transformer[node]
+                    queue.append(child)
+        self._upstream_index = (transformer, parent, edge)
+        return self._upstream_index
+
     def get_upstream_transformer(self, model, node):
+        """
+        Returns the name of the closest PowerTransformer upstream of node, or None if there is none.
+        """
+        if self._upstream_index is None:
+            self.build_upstream_index()
+        return self._upstream_index[0].get(node)
 
-        curr_node = node
-        curr = list(self.digraph.predecessors(node))
-        edge_equipment = nx.get_edge_attributes(self.digraph, "equipment")
-        edge_equipment_name = nx.get_edge_attributes(self.digraph, "equipment_name")
-        # import pdb; pdb.set_trace()
-        while curr != []:
-            edge_type = edge_equipment[(curr[0], curr_node)]
-            if edge_type == "PowerTransformer":
-                return edge_equipment_name[(curr[0], curr_node)]
-            curr_node = curr[0]  # assuming that the network is a DAG
-            curr = list(self.digraph.predecessors(curr_node))
-        return None
+    def get_upstream_lines(self, node):
+        """
+        Returns the names of the Line objects between node and its closest upstream PowerTransformer,
+        from node upwards. If there is no transformer upstream, all the lines up to the source are returned.
+        """
+        if self._upstream_index is None:
+            self.build_upstream_index()
+        _, parent, edge = self._upstream_index
+        lines = []
+        while parent.get(node) is not None:
+            equipment, name = edge[node]
+            if equipment == "PowerTransformer":
+                break
+            if equipment == "Line":
+                lines.append(name)
+            node = parent[node]
+        return lines
+
+    def subtree_index(self):
+        """
+        Returns the SubtreeIndex of the digraph.
+        It is computed once and cached until the graphs are rebuilt or modified through this class.
+        """
+        if self._subtree_index is None:
+            self._subtree_index = SubtreeIndex(self.digraph, graph=self.graph)
+        return self._subtree_index
 
     def get_all_elements_downstream(self, model, source):
         """Returns all the DiTTo objects which location is downstream of a given node.
         This might be handy when trying to find all the objects below a substation such that the network can be properly seperated in different feeders for analysis.
         """
-        _elts = set()
+        return self.get_all_elements_downstream_batch(model, [source])[source]
+
+    def get_all_elements_downstream_batch(self, model, sources):
+        """Returns a dictionary mapping each of the given nodes to the list of DiTTo objects downstream of it.
+        The queries are answered from the subtree index of the network, which is only built once.
+        """
+        if not sources:
+            return {}
         model.set_names()
 
         # Checking that the network is already built
-        # TODO: Log instead of printing...
         if not self.is_built:
             logger.debug(
                 "Warning. Trying to use Network model without building the network."
             )
-            logger.debug("Calling build() with source={}".format(source))
-            self.build(model, source=source)
+            logger.debug("Calling build() with source={}".format(sources[0]))
+            self.build(model, source=sources[0])
 
         # Checking that the attributes have been set
-        # TODO: Log instead of printing...
         if not self.attributes_set:
             logger.debug(
                 "Warning. Trying to use Network model without setting the attributes first."
@@ -386,40 +477,33 @@ class Network:
             logger.debug("Setting the attributes...")
             self.set_attributes(model)
 
-        # Run the dfs or die trying...
-        try:
-            childrens = nx.dfs_successors(self.digraph, source)
-        except:
-            traceback.print_exc()
-            raise ValueError("dfs failed with source={}".format(source))
-
-        # Following two lines extract the data stored in the edges
-        # More precisely, the type of equipment and the name of the equipment
-        # that makes the connection (usually a line or a transformer)
-        #
-        edge_equipment = nx.get_edge_attributes(self.graph, "equipment")
-        edge_equipment_name = nx.get_edge_attributes(self.graph, "equipment_name")
-
-        # Build the list of equipment names downstream
-        for source, destinations in childrens.items():
-            _elts.add(source)
-            for destination in destinations:
-                _elts.add(destination)
-                if (source, destination) in edge_equipment_name:
-                    _elts.add(edge_equipment_name[(source, destination)])
-                elif (destination, source) in edge_equipment_name:
-                    _elts.add(edge_equipment_name[(destination, source)])
-
-        # Get the corresponding DiTTo objects
-        # Warning: This will fail if set_names() has not been called before.
-        _obj = []
-        for x in _elts:
-            try:
-                _obj.append(model[x])
-            except:
-                raise ValueError("Unable to get DiTTo object with name {}".format(x))
-
-        return _obj
+        index = self.subtree_index()
+
+        result = {}
+        for source in sources:
+            if source not in index:
+                raise ValueError("dfs failed with source={}".format(source))
+
+            # Nothing is downstream of a leaf (not even the leaf itself)
+            names = index.elements_downstream(source)
+            if len(names) == 1:
+                names = []
+
+            # Get the corresponding DiTTo objects
+            # Warning: This will fail if set_names() has not been called before.
+            _obj = []
+            seen = set()
+            for x in names:
+                if x in seen:
+                    continue
+                seen.add(x)
+                try:
+                    _obj.append(model[x])
+                except:
+                    raise ValueError("Unable to get DiTTo object with name {}".format(x))
+            result[source] = _obj
+
+        return result
 
     def get_nodes(self):
         return self.graph.nodes()
@@ -484,28 +568,27 @@ class Network:
             return [edge[1], edge[0]]
         return [edge[0], edge[1]]
 
-    def middle_single_phase(self, nodes):
+    def _middle_single_phase_edge(self, nodes):
+        """
+        Returns the edge in the middle of the longest section of the cycle with the fewest phases,
+        as a pair of consecutive nodes, or None if the cycle has less than two nodes.
+        nodes is the list of the nodes of the cycle in order.
+        A random edge of the cycle is returned if the phases of one of the nodes are unknown.
+        """
+        if len(nodes) < 2:
+            return None
         at_1p_section = False
         cnt = 0
         max_cnt = 0
         pos_max_cnt = -1
         min_phase = 1000
-        for i in range(len(nodes)):
-            # logger.debug('phaselen:')
-            # logger.debug(len(self.graph.nodes[nodes[i]]['phases']))
-            if (not "phases" in self.graph.nodes[nodes[i]]) or self.graph.nodes[
-                nodes[i]
-            ]["phases"] == None:
-                pos = rand.randint(0, len(nodes) - 2)
-                order1 = tuple([nodes[pos], nodes[pos + 1]])
-                order2 = tuple([nodes[pos + 1], nodes[pos]])
-                if order1 in self.graph.edges():
-                    return self.graph[order1[0]][order1[1]]["name"]
-                else:
-                    return self.graph[order2[0]][order2[1]]["name"]
-            if len(self.graph.nodes[nodes[i]]["phases"]) < min_phase:
-                min_phase = len(self.graph.nodes[nodes[i]]["phases"])
-        # logger.debug(min_phase)
+        for node in nodes:
+            phases = self.graph.nodes[node].get("phases")
+            if phases is None:
+                pos = random.randint(0, len(nodes) - 2)
+                return nodes[pos], nodes[pos + 1]
+            if len(phases) < min_phase:
+                min_phase = len(phases)
         for i in range(len(nodes)):
             node = nodes[i]
             if at_1p_section and len(self.graph.nodes[node]["phases"]) > min_phase:
@@ -521,20 +604,55 @@ class Network:
             pos_max_cnt = (
                 len(nodes) - 2
             )  # Shift by 1 to avoid any index out of bounds issues.
-            cnt = max_cnt = cnt
+            max_cnt = cnt
 
         if pos_max_cnt > -1:
-            order1 = tuple(
-                [nodes[pos_max_cnt - max_cnt / 2], nodes[pos_max_cnt - max_cnt / 2 + 1]]
-            )
-            order2 = tuple(
-                [nodes[pos_max_cnt - max_cnt / 2 + 1], nodes[pos_max_cnt - max_cnt / 2]]
-            )
-            if order1 in self.graph.edges():
-                logger.debug(order1)
-                return self.graph[order1[0]][order1[1]]["name"]
-            else:
-                logger.debug(order2)
-                return self.graph[order2[0]][order2[1]]["name"]
-        else:
+            middle = pos_max_cnt - max_cnt // 2
+            return nodes[middle], nodes[middle + 1]
+        return None
+
+    def _edge_name(self, edge):
+        data = self.graph[edge[0]][edge[1]]
+        return data.get("equipment_name", data.get("name"))
+
+    def middle_single_phase(self, nodes):
+        """
+        Returns the name of the equipment in the middle of the longest section of the cycle
+        with the fewest phases (see _middle_single_phase_edge), or () if there is none.
+        """
+        edge = self._middle_single_phase_edge(nodes)
+        if edge is None:
             return ()
+        logger.debug(edge)
+        return self._edge_name(edge)
+
+    def break_cycles(self):
+        """
+        Removes edges from the undirected graph until it has no loops, and returns the names of
+        the equipment removed. One edge is removed from every cycle of a cycle basis, chosen with
+        middle_single_phase.
+
+        Removing an edge shared by several cycles of the basis can leave a loop made of the others,
+        so a new basis is computed on the remaining graph until there is none. Every round removes
+        at least one edge and is linear in the size of the graph, so this stays polynomial on heavily
+        meshed networks, unlike enumerating all the simple cycles.
+
+        .. note:: Only the graph is modified. The digraph has to be rebuilt afterwards.
+        """
+        removed = []
+        cycles = nx.cycle_basis(self.graph)
+        while cycles:
+            for cycle in cycles:
+                edges = list(zip(cycle, cycle[1:] + cycle[:1]))
+                if not all(self.graph.has_edge(u, v) for u, v in edges):
+                    continue  # Already broken by a previous edge
+                logger.debug("Detected cycle {cycle}".format(cycle=cycle))
+                edge = self._middle_single_phase_edge(cycle)
+                if edge is None:
+                    edge = edges[-1]
+                name = self._edge_name(edge)
+                self.graph.remove_edge(*edge)
+                if name is not None:
+                    removed.append(name)
+            cycles = nx.cycle_basis(self.graph)
+        return removed
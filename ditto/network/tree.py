@@ -0,0 +1,234 @@
+"""Rooted tree index over the oriented digraph of a DiTTo Network."""
+
+from __future__ import absolute_import, division, print_function
+from builtins import super, range, zip, round, map
+
+import logging
+from collections import deque
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class RootedTree(object):
+    """
+    Index of the tree obtained by orienting a Network from its source.
+
+    One breadth first traversal computes, for every node reachable from the root,
+    its parent, its depth and the cumulative length from the root. Ancestor tables
+    (binary lifting) are then built with NumPy so that the lowest common ancestor of
+    two nodes, and hence the distance between them, is found in O(log n).
+
+    **Usage:**
+
+        >>> tree = network.rooted_tree()
+        >>> tree.distance_from_root("node_12")
+        >>> tree.path("load_3", "xfmr_sec_1")
+
+    .. note:: Only the first predecessor of a node is followed, which is exact for the
+              digraph of Network.build since it is made of the bfs edges from the source.
+    """
+
+    def __init__(self, digraph, root, weight="length", graph=None):
+        self.root = root
+        self.weight = weight
+
+        # Nodes are mapped to integers in BFS order. The root is 0.
+        self.nodes = [root]
+        self.index = {root: 0}
+        parent = [0]
+        depth = [0]
+        length = [0.0]
+
+        # Edge weights are read from graph if provided (the undirected graph usually holds them)
+        if graph is None:
+            graph = digraph
+
+        queue = deque([root])
+        while queue:
+            node = queue.popleft()
+            i = self.index[node]
+            for child in digraph.successors(node):
+                if child in self.index:
+                    continue
+                self.index[child] = len(self.nodes)
+                self.nodes.append(child)
+                parent.append(i)
+                depth.append(depth[i] + 1)
+                if graph.has_edge(node, child):
+                    data = graph[node][child]
+                else:
+                    data = digraph[node][child]
+                w = data.get(weight, 1)
+                length.append(length[i] + (w if w is not None else 0))
+                queue.append(child)
+
+        self.parent = np.array(parent, dtype=np.int64)
+        self.depth = np.array(depth, dtype=np.int64)
+        self.length = np.array(length, dtype=np.float64)
+
+        # up[k][i] is the 2^k-th ancestor of i (the root is its own ancestor)
+        self.up = [self.parent]
+        for _ in range(max(int(self.depth.max()).bit_length() - 1, 0)):
+            self.up.append(self.up[-1][self.up[-1]])
+
+    def __contains__(self, node):
+        return node in self.index
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def parent_of(self, node):
+        """Returns the parent of node, or None for the root."""
+        i = self.index[node]
+        if i == 0:
+            return None
+        return self.nodes[self.parent[i]]
+
+    def depth_of(self, node):
+        """Returns the number of edges between the root and node."""
+        return int(self.depth[self.index[node]])
+
+    def distance_from_root(self, node):
+        """Returns the cumulative weight between the root and node."""
+        return float(self.length[self.index[node]])
+
+    def cumulative(self, edge_values, dtype=np.float64):
+        """
+        Returns an array holding, for every node (in index order), the sum of edge_values
+        over the edges between the root and the node.
+        edge_values maps (parent, child) to a value. Missing edges count as 0.
+        """
+        values = np.zeros(len(self.nodes), dtype=dtype)
+        for i in range(1, len(self.nodes)):
+            p = self.parent[i]
+            values[i] = values[p] + edge_values.get((self.nodes[p], self.nodes[i]), 0)
+        return values
+
+    def _lca(self, i, j):
+        if self.depth[i] < self.depth[j]:
+            i, j = j, i
+        diff = int(self.depth[i] - self.depth[j])
+        k = 0
+        while diff:
+            if diff & 1:
+                i = self.up[k][i]
+            diff >>= 1
+            k += 1
+        if i == j:
+            return int(i)
+        for k in range(len(self.up) - 1, -1, -1):
+            if self.up[k][i] != self.up[k][j]:
+                i = self.up[k][i]
+                j = self.up[k][j]
+        return int(self.parent[i])
+
+    def lowest_common_ancestor(self, node1, node2):
+        """Returns the deepest node that is an ancestor of both node1 and node2."""
+        return self.nodes[self._lca(self.index[node1], self.index[node2])]
+
+    def distance(self, node1, node2, values=None):
+        """
+        Returns the weighted distance between node1 and node2 along the tree.
+        values can be an array returned by cumulative() to sum other edge quantities.
+        """
+        if values is None:
+            values = self.length
+        i = self.index[node1]
+        j = self.index[node2]
+        return values[i] + values[j] - 2 * values[self._lca(i, j)]
+
+    def path(self, node1, node2):
+        """Returns the list of nodes on the tree path from node1 to node2."""
+        i = self.index[node1]
+        j = self.index[node2]
+        a = self._lca(i, j)
+        up_part = []
+        while i != a:
+            up_part.append(self.nodes[i])
+            i = self.parent[i]
+        down_part = []
+        while j != a:
+            down_part.append(self.nodes[j])
+            j = self.parent[j]
+        return up_part + [self.nodes[a]] + down_part[::-1]
+
+
+class SubtreeIndex(object):
+    """
+    Euler tour (interval) index of the oriented digraph of a Network.
+
+    The digraph is traversed once in depth first preorder. Every node then owns the
+    interval [start, end) of that order which holds exactly the node and all the nodes
+    downstream of it, so "everything below X" is a slice and "is Y below X" is two comparisons.
+    The name of the equipment connecting each node to its parent is stored in the same order.
+
+    **Usage:**
+
+        >>> index = network.subtree_index()
+        >>> index.nodes_downstream("node_12")
+        >>> index.elements_downstream("xfmr_sec_1")
+        >>> index.is_downstream("load_3", "node_12")
+
+    .. note:: Like RootedTree, a node with several predecessors is only placed below the first one reached.
+    """
+
+    def __init__(self, digraph, graph=None):
+        if graph is None:
+            graph = digraph
+
+        self.order = []
+        self.equipment = []
+        self.start = {}
+        self.end = {}
+
+        roots = [n for n, d in digraph.in_degree() if d == 0]
+        for root in roots:
+            self._add(root, None)
+            stack = [(root, iter(digraph.successors(root)))]
+            while stack:
+                node, children = stack[-1]
+                for child in children:
+                    if child in self.start:
+                        continue
+                    if graph.has_edge(node, child):
+                        data = graph[node][child]
+                    else:
+                        data = digraph[node][child]
+                    self._add(child, data.get("equipment_name"))
+                    stack.append((child, iter(digraph.successors(child))))
+                    break
+                else:
+                    stack.pop()
+                    self.end[node] = len(self.order)
+
+    def _add(self, node, equipment_name):
+        self.start[node] = len(self.order)
+        self.order.append(node)
+        self.equipment.append(equipment_name)
+
+    def __contains__(self, node):
+        return node in self.start
+
+    def __len__(self):
+        return len(self.order)
+
+    def is_downstream(self, node, ancestor):
+        """Returns True if node is ancestor itself or lies below it."""
+        return self.start[ancestor] <= self.start[node] < self.end[ancestor]
+
+    def nodes_downstream(self, node):
+        """Returns node followed by all the nodes below it, in depth first order."""
+        return self.order[self.start[node] : self.end[node]]
+
+    def elements_downstream(self, node):
+        """
+        Returns the names of node, of all the nodes below it and of the equipment connecting them.
+        The equipment connecting node to its own parent is not included.
+        """
+        start = self.start[node]
+        end = self.end[node]
+        names = list(self.order[start:end])
+        names.extend(e for e in self.equipment[start + 1 : end] if e is not None)
+        return names
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+Equipment database of EDD DEW models (DataBase.xlsx).
+
+The workbook is read once per file and kept in memory as typed NumPy columns. A
+copy of the columns is saved as plain arrays (an ``.npz`` file, without pickle)
+in the user cache directory and reused as long as the workbook modification time
+does not change, so that batch conversions do not pay for opening the workbook
+more than once. The directory is ``$DITTO_CACHE_DIR``, or ``ditto/dew`` under
+``$XDG_CACHE_HOME`` (``~/.cache`` by default).
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import hashlib
+import logging
+import os
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+#: In-process cache of loaded databases, keyed on the absolute workbook path.
+_DATABASES = {}
+
+# Kinds of the cells of the object columns in the cache
+_STRING, _FLOAT, _INT = 0, 1, 2
+
+
+def cache_directory():
+    """Returns the directory of the cached databases."""
+    if os.environ.get("DITTO_CACHE_DIR"):
+        return os.path.join(os.environ["DITTO_CACHE_DIR"], "dew")
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "ditto", "dew")
+
+
+class DEWDatabase(object):
+    """Column store for the sheets of a DEW ``DataBase.xlsx`` workbook.
+
+    Columns are exposed under the ``<SHEET>_<COLUMN>`` names used by DEW
+    (e.g. ``PTXFRM_DSECKV``). Columns that only hold numbers are stored as
+    ``float64`` arrays, all others as ``object`` arrays.
+
+    **Usage:**
+
+    >>> db = DEWDatabase.load("./DataBase.xlsx")
+    >>> db["PTXFRM_DSECKV"][db.index("PTXFRM_IPTROW", 12.0)]
+    """
+
+    #: Bump this when the layout of the cache changes.
+    cache_version = 2
+
+    def __init__(self, columns, mtime=None):
+        self.columns = columns
+        self.mtime = mtime
+        self._indexes = {}
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def index(self, name, value):
+        """Returns the position of the first occurrence of value in the column name.
+
+        Behaves like ``list.index`` (and raises ValueError when the value is not
+        found) but uses a hash index built on first use of the column.
+        """
+        if name not in self._indexes:
+            positions = {}
+            for position, v in enumerate(self.columns[name].tolist()):
+                positions.setdefault(v, position)
+            self._indexes[name] = positions
+        try:
+            return self._indexes[name][value]
+        except (KeyError, TypeError):
+            raise ValueError("{v} is not in {n}".format(v=value, n=name))
+
+    @staticmethod
+    def cache_path(path):
+        """Returns the cache file of the workbook at path, named after the hash of its absolute path."""
+        digest = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()
+        return os.path.join(cache_directory(), digest + ".npz")
+
+    @classmethod
+    def load(cls, path, use_cache=True):
+        """Returns the database stored in the workbook at path.
+
+        The database is looked up in the in-process cache first, then in the
+        cache directory. The workbook itself is only opened
+        when neither is up to date with its modification time.
+        """
+        path = os.path.abspath(path)
+        mtime = os.path.getmtime(path)
+
+        if use_cache:
+            db = _DATABASES.get(path)
+            if db is not None and db.mtime == mtime:
+                return db
+
+            db = cls._read_cache(path, mtime)
+            if db is not None:
+                _DATABASES[path] = db
+                return db
+
+        db = cls(cls._read_workbook(path), mtime=mtime)
+
+        if use_cache:
+            _DATABASES[path] = db
+            cls._write_cache(path, db)
+
+        return db
+
+    @staticmethod
+    def _read_workbook(path):
+        import xlrd
+
+        workbook = xlrd.open_workbook(path, "r")
+        columns = {}
+        for sheet in workbook.sheets():
+            for i in range(sheet.ncols):
+                values = sheet.col_values(i)
+                name = "{s}_{c}".format(s=sheet.name, c=values[0])
+                columns[name] = _to_array(values[1:])
+        return columns
+
+    @classmethod
+    def _read_cache(cls, path, mtime):
+        """Returns the cached database of the workbook at path, or None if there is no valid cache for mtime."""
+        try:
+            with np.load(cls.cache_path(path), allow_pickle=False) as cached:
+                if (
+                    int(cached["version"]) != cls.cache_version
+                    or float(cached["mtime"]) != mtime
+                    or str(cached["path"]) != path
+                ):
+                    return None
+                columns = {}
+                for number, name in enumerate(cached["names"].tolist()):
+                    if "f{}".format(number) in cached:
+                        columns[name] = cached["f{}".format(number)]
+                    else:
+                        columns[name] = _decode_objects(
+                            cached["s{}".format(number)], cached["k{}".format(number)]
+                        )
+        except Exception:  # A missing, partial or foreign cache file is read again from the workbook
+            logger.debug("No usable DEW database cache for {}".format(path))
+            return None
+        return cls(columns, mtime=mtime)
+
+    @classmethod
+    def _write_cache(cls, path, db):
+        arrays = {
+            "version": np.array(cls.cache_version),
+            "mtime": np.array(db.mtime, dtype=np.float64),
+            "path": np.array(path),
+            "names": np.array(list(db.columns), dtype=str),
+        }
+        for number, values in enumerate(db.columns.values()):
+            if values.dtype == np.float64:
+                arrays["f{}".format(number)] = values
+            else:
+                arrays["s{}".format(number)], arrays["k{}".format(number)] = _encode_objects(values)
+
+        cache_path = cls.cache_path(path)
+        try:
+            if not os.path.isdir(os.path.dirname(cache_path)):
+                os.makedirs(os.path.dirname(cache_path))
+            # Written under a temporary name and renamed, so a partial file is never read
+            temporary = cache_path + ".{}.tmp.npz".format(os.getpid())
+            np.savez(temporary, **arrays)
+            os.replace(temporary, cache_path)
+        except (OSError, ValueError):
+            logger.warning("Could not write DEW database cache for {}".format(path))
+
+
+def _encode_objects(values):
+    """Returns an object column as the strings of its cells and their kinds, which np.savez stores without pickle."""
+    strings, kinds = [], []
+    for v in values.tolist():
+        if isinstance(v, float):
+            strings.append(repr(v))
+            kinds.append(_FLOAT)
+        elif isinstance(v, int):
+            strings.append(str(int(v)))
+            kinds.append(_INT)
+        else:
+            strings.append(u"{}".format(v))
+            kinds.append(_STRING)
+    return np.array(strings, dtype=str).reshape(len(strings)), np.array(kinds, dtype=np.int8)
+
+
+def _decode_objects(strings, kinds):
+    """Rebuilds an object column from the output of _encode_objects."""
+    converters = {_STRING: str, _FLOAT: float, _INT: int}
+    array = np.empty(len(strings), dtype=object)
+    array[:] = [converters[k](v) for v, k in zip(strings.tolist(), kinds.tolist())]
+    return array
+
+
+def _to_array(values):
+    """Converts a column of cell values to a float64 array if every cell is a number."""
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+        return np.asarray(values, dtype=np.float64)
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
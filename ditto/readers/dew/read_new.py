@@ -17,9 +17,9 @@ import os
 import math
 
 import numpy as np
-import xlrd
 
 from ditto.store import Store
+from ditto.readers.dew.database import DEWDatabase
 from ditto.models.node import Node
 from ditto.models.regulator import Regulator
 from ditto.models.base import Unicode
@@ -39,17 +39,8 @@ logger = logging.getLogger(__name__)
 
 class Reader:
     def parse(self, model, inputfile, databasepath):
-        xl_workbook = xlrd.open_workbook(databasepath, "r")
-        sheet_names = xl_workbook.sheet_names()
-        xl_sheet = xl_workbook.sheet_by_name(sheet_names[0])
-        xl_sheet = xl_workbook.sheet_by_index(0)
-        for j in range(0, len(sheet_names)):
-            globals()["xl_sheet1" + str(j)] = xl_workbook.sheet_by_index(j)
-            xl_sheet1 = globals()["xl_sheet1" + str(j)]
-            st_name = sheet_names[j] + "_"
-            for i in range(0, xl_sheet1.ncols, 1):
-                aa = xl_sheet1.col_values(i)
-                globals()[st_name + str(xl_sheet1.cell(0, i).value)] = aa[1:]
+        self.database = DEWDatabase.load(databasepath)
+        db = self.database
 
         #
 
@@ -81,14 +72,14 @@ class Reader:
                     if row_node1[0] == "$CMP," and row_node1[1] == node_path:
                         if row_node1[18] == "16,":
                             voltage_node = (
-                                float(PTXFRM_DSECKV[int(row_node1[6][:-1])])
+                                float(db["PTXFRM_DSECKV"][int(row_node1[6][:-1])])
                                 * 1.732
                                 * 1000
                             )
                             break
                         elif row_node1[18] == "1032,":
                             voltage_node = (
-                                float(PTSUB_DPHABKV[int(row_node1[6][:-1])]) * 1000
+                                float(db["PTSUB_DPHABKV"][int(row_node1[6][:-1])]) * 1000
                             )  # multiplied by 1000 to match with ditto, ditto dividing by 1000
                             break
                         else:
@@ -233,10 +224,10 @@ class Reader:
                             try:
                                 iptr = entries[6][:-1]
                                 api_regulator.highstep = int(
-                                    PTXFRM_SNUMSTEPS[PTXFRM_IPTROW.index(float(iptr))]
+                                    db["PTXFRM_SNUMSTEPS"][db.index("PTXFRM_IPTROW", float(iptr))]
                                 )
                                 api_regulator.lowstep = int(
-                                    PTXFRM_SNUMSTEPS[PTXFRM_IPTROW.index(float(iptr))]
+                                    db["PTXFRM_SNUMSTEPS"][db.index("PTXFRM_IPTROW", float(iptr))]
                                 )
 
                             except AttributeError:
@@ -247,8 +238,8 @@ class Reader:
                         row_rwdg = row_rwdg.strip()
                         row_rwdg1 = row_rwdg.split()
                         iptr_rwdg = float(row_rwdg1[6][:-1])
-                        tf_rcfg = APIXFRMCONIDX_STNAM[
-                            int(PTXFRM_IXFRMCON[PTXFRM_IPTROW.index(iptr_rwdg)])
+                        tf_rcfg = db["APIXFRMCONIDX_STNAM"][
+                            int(db["PTXFRM_IXFRMCON"][db.index("PTXFRM_IPTROW", iptr_rwdg)])
                         ]
                         tf_rcfg1 = tf_rcfg.split(":")
                         if "3-wireSec" in tf_rcfg1[1]:
@@ -304,8 +295,8 @@ class Reader:
                                     pass
                                 try:
                                     api_regulator.ct_prim = float(
-                                        PTINST_DSECDRATA[
-                                            PTINST_IPTROW.index(float(row_pt1[2][:-1]))
+                                        db["PTINST_DSECDRATA"][
+                                            db.index("PTINST_IPTROW", float(row_pt1[2][:-1]))
                                         ]
                                     ) * float(row_pt1[7][:-1])
                                 except AttributeError:
@@ -348,15 +339,15 @@ class Reader:
                         row_wdg = row_wdg.strip()
                         row_wdg1 = row_wdg.split()
                         iptr_wdg = float(row_wdg1[6][:-1])
-                        tf_cfg = APIXFRMCONIDX_STNAM[
-                            int(PTXFRM_IXFRMCON[PTXFRM_IPTROW.index(iptr_wdg)])
+                        tf_cfg = db["APIXFRMCONIDX_STNAM"][
+                            int(db["PTXFRM_IXFRMCON"][db.index("PTXFRM_IPTROW", iptr_wdg)])
                         ]
                         tf_cfg1 = tf_cfg.split(":")
-                        prv = PTXFRM_DPRIKV[int(PTXFRM_IPTROW.index(iptr_wdg))]
-                        sev = PTXFRM_DSECKV[int(PTXFRM_IPTROW.index(iptr_wdg))]
-                        zmag = float(PTXFRM_DISAT0A[int(PTXFRM_IPTROW.index(iptr_wdg))])
+                        prv = db["PTXFRM_DPRIKV"][int(db.index("PTXFRM_IPTROW", iptr_wdg))]
+                        sev = db["PTXFRM_DSECKV"][int(db.index("PTXFRM_IPTROW", iptr_wdg))]
+                        zmag = float(db["PTXFRM_DISAT0A"][int(db.index("PTXFRM_IPTROW", iptr_wdg))])
                         zang = float(
-                            PTXFRM_DVSAT0PC[int(PTXFRM_IPTROW.index(iptr_wdg))]
+                            db["PTXFRM_DVSAT0PC"][int(db.index("PTXFRM_IPTROW", iptr_wdg))]
                         )
                         resistance = zmag * math.cos(math.radians(zang))
                         reactance = zmag * math.sin(math.radians(zang))
@@ -385,8 +376,8 @@ class Reader:
                                     if len(ph1) == 1:
                                         windings[w].nominal_voltage = (
                                             float(
-                                                PTXFRM_DPRIKV[
-                                                    int(PTXFRM_IPTROW.index(iptr_wdg))
+                                                db["PTXFRM_DPRIKV"][
+                                                    int(db.index("PTXFRM_IPTROW", iptr_wdg))
                                                 ]
                                             )
                                             * 10 ** 3
@@ -395,8 +386,8 @@ class Reader:
                                     else:
                                         windings[w].nominal_voltage = (
                                             float(
-                                                PTXFRM_DPRIKV[
-                                                    int(PTXFRM_IPTROW.index(iptr_wdg))
+                                                db["PTXFRM_DPRIKV"][
+                                                    int(db.index("PTXFRM_IPTROW", iptr_wdg))
                                                 ]
                                             )
                                             * 10 ** 3
@@ -405,8 +396,8 @@ class Reader:
                                         )
                                     windings[w].rated_power = (
                                         float(
-                                            PTXFRM_DNOMKVA[
-                                                int(PTXFRM_IPTROW.index(iptr_wdg))
+                                            db["PTXFRM_DNOMKVA"][
+                                                int(db.index("PTXFRM_IPTROW", iptr_wdg))
                                             ]
                                         )
                                         * 10 ** 3
@@ -424,8 +415,8 @@ class Reader:
                                     if len(ph1) == 1:
                                         windings[w].nominal_voltage = (
                                             float(
-                                                PTXFRM_DSECKV[
-                                                    int(PTXFRM_IPTROW.index(iptr_wdg))
+                                                db["PTXFRM_DSECKV"][
+                                                    int(db.index("PTXFRM_IPTROW", iptr_wdg))
                                                 ]
                                             )
                                             * 10 ** 3
@@ -434,8 +425,8 @@ class Reader:
                                     else:
                                         windings[w].nominal_voltage = (
                                             float(
-                                                PTXFRM_DSECKV[
-                                                    int(PTXFRM_IPTROW.index(iptr_wdg))
+                                                db["PTXFRM_DSECKV"][
+                                                    int(db.index("PTXFRM_IPTROW", iptr_wdg))
                                                 ]
                                             )
                                             * 10 ** 3
@@ -444,8 +435,8 @@ class Reader:
                                         )
                                     windings[w].rated_power = (
                                         float(
-                                            PTXFRM_DNOMKVA[
-                                                int(PTXFRM_IPTROW.index(iptr_wdg))
+                                            db["PTXFRM_DNOMKVA"][
+                                                int(db.index("PTXFRM_IPTROW", iptr_wdg))
                                             ]
                                         )
                                         * 10 ** 3
@@ -465,8 +456,8 @@ class Reader:
                                 try:
                                     windings[w].nominal_voltage = (
                                         float(
-                                            PTXFRM_DSECKV[
-                                                int(PTXFRM_IPTROW.index(iptr_wdg))
+                                            db["PTXFRM_DSECKV"][
+                                                int(db.index("PTXFRM_IPTROW", iptr_wdg))
                                             ]
                                         )
                                         * 10 ** 3
@@ -474,8 +465,8 @@ class Reader:
                                     )
                                     windings[w].rated_power = (
                                         float(
-                                            PTXFRM_DNOMKVA[
-                                                int(PTXFRM_IPTROW.index(iptr_wdg))
+                                            db["PTXFRM_DNOMKVA"][
+                                                int(db.index("PTXFRM_IPTROW", iptr_wdg))
                                             ]
                                         )
                                         * 10 ** 3
@@ -546,7 +537,7 @@ class Reader:
                     try:
                         api_transformer.emergency_power = (
                             float(
-                                PTXFRM_DFAVLTMRATKVA[int(PTXFRM_IPTROW.index(iptr_wdg))]
+                                db["PTXFRM_DFAVLTMRATKVA"][int(db.index("PTXFRM_IPTROW", iptr_wdg))]
                             )
                             * 10 ** 3
                         )  # DiTTo in volt ampere
@@ -555,9 +546,9 @@ class Reader:
 
                     try:
                         api_transformer.loadloss = (
-                            float(PTXFRM_DWINDLOSSW[int(PTXFRM_IPTROW.index(iptr_wdg))])
+                            float(db["PTXFRM_DWINDLOSSW"][int(db.index("PTXFRM_IPTROW", iptr_wdg))])
                             + float(
-                                PTXFRM_DCORELOSSW[int(PTXFRM_IPTROW.index(iptr_wdg))]
+                                db["PTXFRM_DCORELOSSW"][int(db.index("PTXFRM_IPTROW", iptr_wdg))]
                             )
                         ) / 1000.0  # DiTTo in volt ampere
                     except:
@@ -565,7 +556,7 @@ class Reader:
 
                     try:
                         api_transformer.normhkva = (
-                            float(PTXFRM_DPRIKV[int(PTXFRM_IPTROW.index(iptr_wdg))])
+                            float(db["PTXFRM_DPRIKV"][int(db.index("PTXFRM_IPTROW", iptr_wdg))])
                             * 10 ** 3
                         )  # DiTTo in volt ampere
                     except:
@@ -573,7 +564,7 @@ class Reader:
 
                     try:
                         api_transformer.noload_loss = (
-                            float(PTXFRM_DCORELOSSW[int(PTXFRM_IPTROW.index(iptr_wdg))])
+                            float(db["PTXFRM_DCORELOSSW"][int(db.index("PTXFRM_IPTROW", iptr_wdg))])
                         ) / 1000.0  # DiTTo in volt ampere
                     except:
                         pass
@@ -590,20 +581,20 @@ class Reader:
                     #                    api_transformer.reactances.append(float(reactance*0.5))   #XHT
                     elif num_windings == 3:
                         if (
-                            PTXFRM_QCOMPEXISTS[int(PTXFRM_IPTROW.index(iptr_wdg))]
+                            db["PTXFRM_QCOMPEXISTS"][int(db.index("PTXFRM_IPTROW", iptr_wdg))]
                             == 205.0
                         ):
                             zmag1 = float(
-                                PTXFRM_DISAT1A[int(PTXFRM_IPTROW.index(iptr_wdg))]
+                                db["PTXFRM_DISAT1A"][int(db.index("PTXFRM_IPTROW", iptr_wdg))]
                             )
                             zang1 = float(
-                                PTXFRM_DVSAT1PC[int(PTXFRM_IPTROW.index(iptr_wdg))]
+                                db["PTXFRM_DVSAT1PC"][int(db.index("PTXFRM_IPTROW", iptr_wdg))]
                             )
                             zmag2 = float(
-                                PTXFRM_DISAT2A[int(PTXFRM_IPTROW.index(iptr_wdg))]
+                                db["PTXFRM_DISAT2A"][int(db.index("PTXFRM_IPTROW", iptr_wdg))]
                             )
                             zang2 = float(
-                                PTXFRM_DVSAT2PC[int(PTXFRM_IPTROW.index(iptr_wdg))]
+                                db["PTXFRM_DVSAT2PC"][int(db.index("PTXFRM_IPTROW", iptr_wdg))]
                             )
                             reactance1 = zmag1 * math.sin(math.radians(zang1))
                             reactance2 = zmag2 * math.sin(math.radians(zang2))
@@ -735,27 +726,27 @@ class Reader:
                         break
 
                 if (
-                    PTCAP_SCON[PTCAP_IPTROW.index(iptr_cap)] == 1.0
-                    or PTCAP_SCON[PTCAP_IPTROW.index(iptr_cap)] == 3.0
+                    db["PTCAP_SCON"][db.index("PTCAP_IPTROW", iptr_cap)] == 1.0
+                    or db["PTCAP_SCON"][db.index("PTCAP_IPTROW", iptr_cap)] == 3.0
                 ):
                     api_capacitor.connection_type = "Y"
                     api_capacitor.nominal_voltage = (
                         float(
                             (
-                                APILEVIDX_DVARLEV[
-                                    int(PTCAP_IVLEV[PTCAP_IPTROW.index(iptr_cap)])
+                                db["APILEVIDX_DVARLEV"][
+                                    int(db["PTCAP_IVLEV"][db.index("PTCAP_IPTROW", iptr_cap)])
                                 ]
                             )
                         )
                         * 10 ** 3
                     )
-                elif PTCAP_SCON[PTCAP_IPTROW.index(iptr_cap)] == 2.0:
+                elif db["PTCAP_SCON"][db.index("PTCAP_IPTROW", iptr_cap)] == 2.0:
                     api_capacitor.connection_type = "D"
                     api_capacitor.nominal_voltage = (
                         float(
                             (
-                                APILEVIDX_DVARLEV[
-                                    int(PTCAP_IVLEV[PTCAP_IPTROW.index(iptr_cap)])
+                                db["APILEVIDX_DVARLEV"][
+                                    int(db["PTCAP_IVLEV"][db.index("PTCAP_IPTROW", iptr_cap)])
                                 ]
                             )
                         )
@@ -765,8 +756,8 @@ class Reader:
                     api_capacitor.nominal_voltage = (
                         float(
                             (
-                                APILEVIDX_DVARLEV[
-                                    int(PTCAP_IVLEV[PTCAP_IPTROW.index(iptr_cap)])
+                                db["APILEVIDX_DVARLEV"][
+                                    int(db["PTCAP_IVLEV"][db.index("PTCAP_IPTROW", iptr_cap)])
                                 ]
                             )
                             / 1.732
@@ -777,15 +768,15 @@ class Reader:
 
                 api_capacitor.low = (
                     float(
-                        APIRANIDX_DLOWVAL[
-                            int(PTCAP_IVRAN[PTCAP_IPTROW.index(iptr_cap)])
+                        db["APIRANIDX_DLOWVAL"][
+                            int(db["PTCAP_IVRAN"][db.index("PTCAP_IPTROW", iptr_cap)])
                         ]
                     )
                     * 1000
                 )  # cross check
                 api_capacitor.high = (
                     float(
-                        APIRANIDX_DUPVAL[int(PTCAP_IVRAN[PTCAP_IPTROW.index(iptr_cap)])]
+                        db["APIRANIDX_DUPVAL"][int(db["PTCAP_IVRAN"][db.index("PTCAP_IPTROW", iptr_cap)])]
                     )
                     * 1000
                 )  # cross check
@@ -826,22 +817,22 @@ class Reader:
                 for p, p_c in enumerate(ph_c):
                     phase_capacitors.append(PhaseCapacitor(model))
                     phase_capacitors[p].phase = p_c
-                    if float(PTCAP_SCON[PTCAP_IPTROW.index(iptr_cap)]) in (
+                    if float(db["PTCAP_SCON"][db.index("PTCAP_IPTROW", iptr_cap)]) in (
                         1.0,
                         2.0,
                         3.0,
                     ):
                         phase_capacitors[p].var = (
-                            float(PTCAP_DRATKVAR[PTCAP_IPTROW.index(iptr_cap)])
+                            float(db["PTCAP_DRATKVAR"][db.index("PTCAP_IPTROW", iptr_cap)])
                             * 10 ** 3
                         ) / 3.0
                     else:
                         phase_capacitors[p].var = (
-                            float(PTCAP_DRATKVAR[PTCAP_IPTROW.index(iptr_cap)])
+                            float(db["PTCAP_DRATKVAR"][db.index("PTCAP_IPTROW", iptr_cap)])
                             * 10 ** 3
                         )
                     phase_capacitors[p].sections = int(
-                        PTCAP_SNUMPOSRACK[PTCAP_IPTROW.index(iptr_cap)]
+                        db["PTCAP_SNUMPOSRACK"][db.index("PTCAP_IPTROW", iptr_cap)]
                     )
                     phase_capacitors[p].normalsections = normalsec
                     iter_pcap = iter_cap
@@ -934,14 +925,14 @@ class Reader:
                     else:
                         wires[pw].phase = ph_w[pw]
                         if int(entries[5][:-1]) == 8 or int(entries[5][:-1]) == 100:
-                            wires[pw].nameclass = PTSWT_STDESC[int(entries[6][:-1])]
+                            wires[pw].nameclass = db["PTSWT_STDESC"][int(entries[6][:-1])]
                             wires[pw].is_fuse = True
                             wires[pw].resistance = 0.001
                             wires[pw].ampacity = float(
-                                PTSWT_DCURTRATA[int(entries[6][:-1])]
+                                db["PTSWT_DCURTRATA"][int(entries[6][:-1])]
                             )
                             wires[pw].emergency_ampacity = (
-                                float(PTSWT_DCURTRATA[int(entries[6][:-1])]) * 1.5
+                                float(db["PTSWT_DCURTRATA"][int(entries[6][:-1])]) * 1.5
                             )
                         else:
                             wires[pw].is_fuse = False
@@ -962,14 +953,14 @@ class Reader:
                             58,
                             76,
                         ):
-                            wires[pw].nameclass = PTSWT_STDESC[int(entries[6][:-1])]
+                            wires[pw].nameclass = db["PTSWT_STDESC"][int(entries[6][:-1])]
                             wires[pw].is_switch = 1
                             wires[pw].resistance = 0.001
                             wires[pw].ampacity = float(
-                                PTSWT_DCURTRATA[int(entries[6][:-1])]
+                                db["PTSWT_DCURTRATA"][int(entries[6][:-1])]
                             )
                             wires[pw].emergency_ampacity = float(
-                                PTSWT_DCURTRATA[int(entries[6][:-1])]
+                                db["PTSWT_DCURTRATA"][int(entries[6][:-1])]
                             )
                         else:
                             wires[pw].is_switch = 0
@@ -987,7 +978,7 @@ class Reader:
                                 or int(entries[5][:-1]) == 37
                                 or int(entries[5][:-1]) == 38
                             ):
-                                #                        if PTLINESPC_SOVERHEAD[int(row_wr1[4][:-1])] == 0.0:
+                                #                        if db["PTLINESPC_SOVERHEAD"][int(row_wr1[4][:-1])] == 0.0:
                                 if pw >= num_ph:
                                     if int(row_wr1[6][:-1]) == -1:
                                         wires[pw].nameclass = None
@@ -1003,55 +994,55 @@ class Reader:
                                             None  # switches resistance update it
                                         )
                                     else:
-                                        wires[pw].nameclass = PTLINECOND_STDESC[
+                                        wires[pw].nameclass = db["PTLINECOND_STDESC"][
                                             int(row_wr1[6][:-1])
                                         ]
                                         wires[pw].diameter = (
                                             float(
-                                                PTLINECOND_DRADCONDSUL[
+                                                db["PTLINECOND_DRADCONDSUL"][
                                                     int(row_wr1[6][:-1])
                                                 ]
                                             )
                                             * 2
                                         )
                                         wires[pw].gmr = float(
-                                            PTLINECOND_DGMRSUL[int(row_wr1[6][:-1])]
+                                            db["PTLINECOND_DGMRSUL"][int(row_wr1[6][:-1])]
                                         )
                                         wires[pw].ampacity = float(
-                                            PTLINECOND_DRATAMBTEMP0A[
+                                            db["PTLINECOND_DRATAMBTEMP0A"][
                                                 int(row_wr1[6][:-1])
                                             ]
                                         )
                                         wires[pw].emergency_ampacity = float(
-                                            PTLINECOND_DRATAMBTEMP1A[
+                                            db["PTLINECOND_DRATAMBTEMP1A"][
                                                 int(row_wr1[6][:-1])
                                             ]
                                         )
                                         wires[pw].resistance = float(
-                                            PTLINECOND_DROHMPRLUL[int(row_wr1[6][:-1])]
+                                            db["PTLINECOND_DROHMPRLUL"][int(row_wr1[6][:-1])]
                                         ) * float(row_wr1[13][:-1])
                                 else:
-                                    wires[pw].nameclass = PTLINECOND_STDESC[
+                                    wires[pw].nameclass = db["PTLINECOND_STDESC"][
                                         int(row_wr1[5][:-1])
                                     ]
                                     wires[pw].diameter = (
                                         float(
-                                            PTLINECOND_DRADCONDSUL[int(row_wr1[5][:-1])]
+                                            db["PTLINECOND_DRADCONDSUL"][int(row_wr1[5][:-1])]
                                         )
                                         * 2
                                     )
                                     wires[pw].gmr = float(
-                                        PTLINECOND_DGMRSUL[int(row_wr1[5][:-1])]
+                                        db["PTLINECOND_DGMRSUL"][int(row_wr1[5][:-1])]
                                     )
-                                    #                                logger.debug(float(PTLINECOND_DGMRSUL[int(row_wr1[5][:-1])]))
+                                    #                                logger.debug(float(db["PTLINECOND_DGMRSUL"][int(row_wr1[5][:-1])]))
                                     wires[pw].ampacity = float(
-                                        PTLINECOND_DRATAMBTEMP1A[int(row_wr1[5][:-1])]
+                                        db["PTLINECOND_DRATAMBTEMP1A"][int(row_wr1[5][:-1])]
                                     )
                                     wires[pw].emergency_ampacity = float(
-                                        PTLINECOND_DRATAMBTEMP1A[int(row_wr1[5][:-1])]
+                                        db["PTLINECOND_DRATAMBTEMP1A"][int(row_wr1[5][:-1])]
                                     )
                                     wires[pw].resistance = float(
-                                        PTLINECOND_DROHMPRLUL[int(row_wr1[5][:-1])]
+                                        db["PTLINECOND_DROHMPRLUL"][int(row_wr1[5][:-1])]
                                     ) * float(row_wr1[13][:-1])
                             else:
                                 if pw >= num_ph:
@@ -1065,109 +1056,109 @@ class Reader:
                                         wires[pw].emergency_ampacity = None
                                         wires[pw].resistance = None
                                     else:
-                                        wires[pw].nameclass = PTCABCOND_STDESC[
+                                        wires[pw].nameclass = db["PTCABCOND_STDESC"][
                                             int(row_wr1[6][:-1])
                                         ]
                                         wires[pw].diameter = (
                                             float(
-                                                PTCABCOND_DRADCONDSUL[
+                                                db["PTCABCOND_DRADCONDSUL"][
                                                     int(row_wr1[6][:-1])
                                                 ]
                                             )
                                             * 2
                                         )
                                         wires[pw].gmr = float(
-                                            PTCABCOND_DGMRSUL[int(row_wr1[6][:-1])]
+                                            db["PTCABCOND_DGMRSUL"][int(row_wr1[6][:-1])]
                                         )
                                         wires[pw].resistance = float(
-                                            PTCABCOND_DROHMPRLUL[int(row_wr1[6][:-1])]
+                                            db["PTCABCOND_DROHMPRLUL"][int(row_wr1[6][:-1])]
                                         ) * float(row_wr1[13][:-1])
                                         if (
-                                            PTLINESPC_SOVERHEAD[int(row_wr1[4][:-1])]
+                                            db["PTLINESPC_SOVERHEAD"][int(row_wr1[4][:-1])]
                                             == 0.0
                                         ):
                                             wires[pw].ampacity = float(
-                                                PTCABCOND_DRATA0[int(row_wr1[6][:-1])]
+                                                db["PTCABCOND_DRATA0"][int(row_wr1[6][:-1])]
                                             )
                                             wires[pw].emergency_ampacity = float(
-                                                PTCABCOND_DRATA0[int(row_wr1[5][:-1])]
+                                                db["PTCABCOND_DRATA0"][int(row_wr1[5][:-1])]
                                             )  # not provided
                                         if (
-                                            PTLINESPC_SOVERHEAD[int(row_wr1[4][:-1])]
+                                            db["PTLINESPC_SOVERHEAD"][int(row_wr1[4][:-1])]
                                             == 1.0
                                         ):
                                             wires[pw].ampacity = float(
-                                                PTCABCOND_DRATA1[int(row_wr1[6][:-1])]
+                                                db["PTCABCOND_DRATA1"][int(row_wr1[6][:-1])]
                                             )
                                             wires[pw].emergency_ampacity = float(
-                                                PTCABCOND_DRATA1[int(row_wr1[5][:-1])]
+                                                db["PTCABCOND_DRATA1"][int(row_wr1[5][:-1])]
                                             )  # not provided
                                         if (
-                                            PTLINESPC_SOVERHEAD[int(row_wr1[4][:-1])]
+                                            db["PTLINESPC_SOVERHEAD"][int(row_wr1[4][:-1])]
                                             == 2.0
                                         ):
                                             wires[pw].ampacity = float(
-                                                PTCABCOND_DRATA2[int(row_wr1[6][:-1])]
+                                                db["PTCABCOND_DRATA2"][int(row_wr1[6][:-1])]
                                             )
                                             wires[pw].emergency_ampacity = float(
-                                                PTCABCOND_DRATA2[int(row_wr1[5][:-1])]
+                                                db["PTCABCOND_DRATA2"][int(row_wr1[5][:-1])]
                                             )  # not provided
                                 else:
-                                    wires[pw].nameclass = PTCABCOND_STDESC[
+                                    wires[pw].nameclass = db["PTCABCOND_STDESC"][
                                         int(row_wr1[5][:-1])
                                     ]
                                     wires[pw].diameter = (
                                         float(
-                                            PTCABCOND_DRADCONDSUL[int(row_wr1[5][:-1])]
+                                            db["PTCABCOND_DRADCONDSUL"][int(row_wr1[5][:-1])]
                                         )
                                         * 2
                                     )
                                     wires[pw].gmr = float(
-                                        PTCABCOND_DGMRSUL[int(row_wr1[5][:-1])]
+                                        db["PTCABCOND_DGMRSUL"][int(row_wr1[5][:-1])]
                                     )
                                     wires[pw].resistance = float(
-                                        PTCABCOND_DROHMPRLUL[int(row_wr1[5][:-1])]
+                                        db["PTCABCOND_DROHMPRLUL"][int(row_wr1[5][:-1])]
                                     ) * float(row_wr1[13][:-1])
-                                    if PTLINESPC_SOVERHEAD[int(row_wr1[4][:-1])] == 0.0:
+                                    if db["PTLINESPC_SOVERHEAD"][int(row_wr1[4][:-1])] == 0.0:
                                         wires[pw].ampacity = float(
-                                            PTCABCOND_DRATA0[int(row_wr1[5][:-1])]
+                                            db["PTCABCOND_DRATA0"][int(row_wr1[5][:-1])]
                                         )
                                         wires[pw].emergency_ampacity = float(
-                                            PTCABCOND_DRATA0[int(row_wr1[5][:-1])]
+                                            db["PTCABCOND_DRATA0"][int(row_wr1[5][:-1])]
                                         )  # not provided
-                                    if PTLINESPC_SOVERHEAD[int(row_wr1[4][:-1])] == 1.0:
+                                    if db["PTLINESPC_SOVERHEAD"][int(row_wr1[4][:-1])] == 1.0:
                                         wires[pw].ampacity = float(
-                                            PTCABCOND_DRATA1[int(row_wr1[5][:-1])]
+                                            db["PTCABCOND_DRATA1"][int(row_wr1[5][:-1])]
                                         )
                                         wires[pw].emergency_ampacity = float(
-                                            PTCABCOND_DRATA1[int(row_wr1[5][:-1])]
+                                            db["PTCABCOND_DRATA1"][int(row_wr1[5][:-1])]
                                         )  # not provided
-                                    if PTLINESPC_SOVERHEAD[int(row_wr1[4][:-1])] == 2.0:
+                                    if db["PTLINESPC_SOVERHEAD"][int(row_wr1[4][:-1])] == 2.0:
                                         wires[pw].ampacity = float(
-                                            PTCABCOND_DRATA2[int(row_wr1[5][:-1])]
+                                            db["PTCABCOND_DRATA2"][int(row_wr1[5][:-1])]
                                         )
                                         wires[pw].emergency_ampacity = float(
-                                            PTCABCOND_DRATA2[int(row_wr1[5][:-1])]
+                                            db["PTCABCOND_DRATA2"][int(row_wr1[5][:-1])]
                                         )  # not provided
 
                             if (
-                                PTLINESPC_TMUTSPC[int(row_wr1[4][:-1])] == 0.0
-                                or PTLINESPC_TMUTSPC[int(row_wr1[4][:-1])] == 1.0
+                                db["PTLINESPC_TMUTSPC"][int(row_wr1[4][:-1])] == 0.0
+                                or db["PTLINESPC_TMUTSPC"][int(row_wr1[4][:-1])] == 1.0
                             ):
                                 if pw >= num_ph:
                                     wires[pw].X = (
-                                        float(PTLINESPC_DXNEU[int(row_wr1[4][:-1])])
+                                        float(db["PTLINESPC_DXNEU"][int(row_wr1[4][:-1])])
                                         * 0.3048
                                         - float(
-                                            PTLINESPC_DXPH1ORR1[int(row_wr1[4][:-1])]
+                                            db["PTLINESPC_DXPH1ORR1"][int(row_wr1[4][:-1])]
                                         )
                                         * 0.3048
                                     )
                                     wires[pw].Y = (
-                                        float(PTLINESPC_DYNEU[int(row_wr1[4][:-1])])
+                                        float(db["PTLINESPC_DYNEU"][int(row_wr1[4][:-1])])
                                         * 0.3048
                                         - float(
-                                            PTLINESPC_DYPH1ORX1[int(row_wr1[4][:-1])]
+                                            db["PTLINESPC_DYPH1ORX1"][int(row_wr1[4][:-1])]
                                         )
                                         * 0.3048
                                     )
@@ -1175,7 +1166,7 @@ class Reader:
                                     if pw == 0:
                                         wires[pw].X = (
                                             float(
-                                                PTLINESPC_DXPH1ORR1[
+                                                db["PTLINESPC_DXPH1ORR1"][
                                                     int(row_wr1[4][:-1])
                                                 ]
                                             )
@@ -1183,7 +1174,7 @@ class Reader:
                                         )  # feet to meter converted
                                         wires[pw].Y = (
                                             float(
-                                                PTLINESPC_DYPH1ORX1[
+                                                db["PTLINESPC_DYPH1ORX1"][
                                                     int(row_wr1[4][:-1])
                                                 ]
                                             )
@@ -1192,13 +1183,13 @@ class Reader:
                                     if pw == 1:
                                         wires[pw].X = (
                                             float(
-                                                PTLINESPC_DXPH2ORR0[
+                                                db["PTLINESPC_DXPH2ORR0"][
                                                     int(row_wr1[4][:-1])
                                                 ]
                                             )
                                             * 0.3048
                                             - float(
-                                                PTLINESPC_DXPH1ORR1[
+                                                db["PTLINESPC_DXPH1ORR1"][
                                                     int(row_wr1[4][:-1])
                                                 ]
                                             )
@@ -1206,13 +1197,13 @@ class Reader:
                                         )
                                         wires[pw].Y = (
                                             float(
-                                                PTLINESPC_DYPH2ORX0[
+                                                db["PTLINESPC_DYPH2ORX0"][
                                                     int(row_wr1[4][:-1])
                                                 ]
                                             )
                                             * 0.3048
                                             - float(
-                                                PTLINESPC_DYPH1ORX1[
+                                                db["PTLINESPC_DYPH1ORX1"][
                                                     int(row_wr1[4][:-1])
                                                 ]
                                             )
@@ -1221,13 +1212,13 @@ class Reader:
                                     if pw == 2:
                                         wires[pw].X = (
                                             float(
-                                                PTLINESPC_DXPH3ORY0[
+                                                db["PTLINESPC_DXPH3ORY0"][
                                                     int(row_wr1[4][:-1])
                                                 ]
                                             )
                                             * 0.3048
                                             - float(
-                                                PTLINESPC_DXPH1ORR1[
+                                                db["PTLINESPC_DXPH1ORR1"][
                                                     int(row_wr1[4][:-1])
                                                 ]
                                             )
@@ -1235,13 +1226,13 @@ class Reader:
                                         )
                                         wires[pw].Y = (
                                             float(
-                                                PTLINESPC_DYPH3ORY1[
+                                                db["PTLINESPC_DYPH3ORY1"][
                                                     int(row_wr1[4][:-1])
                                                 ]
                                             )
                                             * 0.3048
                                             - float(
-                                                PTLINESPC_DYPH1ORX1[
+                                                db["PTLINESPC_DYPH1ORX1"][
                                                     int(row_wr1[4][:-1])
                                                 ]
                                             )
@@ -1480,40 +1471,40 @@ class Reader:
                             or int(entries[5][:-1]) == 46
                         ):
                             if (
-                                PTLINESPC_TMUTSPC[int(row_ug1[4][:-1])] == 0.0
-                                or PTLINESPC_TMUTSPC[int(row_ug1[4][:-1])] == 1.0
+                                db["PTLINESPC_TMUTSPC"][int(row_ug1[4][:-1])] == 0.0
+                                or db["PTLINESPC_TMUTSPC"][int(row_ug1[4][:-1])] == 1.0
                             ):
                                 cond_dia1 = (
-                                    float(PTCABCOND_DRADCONDSUL[int(row_ug1[5][:-1])])
+                                    float(db["PTCABCOND_DRADCONDSUL"][int(row_ug1[5][:-1])])
                                     * 2
                                 )
                                 cond_dia2 = (
-                                    float(PTCABCOND_DRADCONDSUL[int(row_ug1[5][:-1])])
+                                    float(db["PTCABCOND_DRADCONDSUL"][int(row_ug1[5][:-1])])
                                     * 2
                                 )
                                 cond_dia3 = (
-                                    float(PTCABCOND_DRADCONDSUL[int(row_ug1[5][:-1])])
+                                    float(db["PTCABCOND_DRADCONDSUL"][int(row_ug1[5][:-1])])
                                     * 2
                                 )
                                 cond_res1 = (
-                                    float(PTCABCOND_DROHMPRLUL[int(row_ug1[5][:-1])])
+                                    float(db["PTCABCOND_DROHMPRLUL"][int(row_ug1[5][:-1])])
                                     * 5.28
                                 )  # LUL TO MILE
                                 cond_res2 = (
-                                    float(PTCABCOND_DROHMPRLUL[int(row_ug1[5][:-1])])
+                                    float(db["PTCABCOND_DROHMPRLUL"][int(row_ug1[5][:-1])])
                                     * 5.28
                                 )  # LUL TO MILE
                                 cond_res3 = (
-                                    float(PTCABCOND_DROHMPRLUL[int(row_ug1[5][:-1])])
+                                    float(db["PTCABCOND_DROHMPRLUL"][int(row_ug1[5][:-1])])
                                     * 5.28
                                 )  # LUL TO MILE
-                                XA = float(PTLINESPC_DXPH1ORR1[int(row_ug1[4][:-1])])
-                                XB = float(PTLINESPC_DXPH2ORR0[int(row_ug1[4][:-1])])
-                                XC = float(PTLINESPC_DXPH3ORY0[int(row_ug1[4][:-1])])
-                                XN = float(PTLINESPC_DXNEU[int(row_ug1[4][:-1])])
+                                XA = float(db["PTLINESPC_DXPH1ORR1"][int(row_ug1[4][:-1])])
+                                XB = float(db["PTLINESPC_DXPH2ORR0"][int(row_ug1[4][:-1])])
+                                XC = float(db["PTLINESPC_DXPH3ORY0"][int(row_ug1[4][:-1])])
+                                XN = float(db["PTLINESPC_DXNEU"][int(row_ug1[4][:-1])])
                                 permA = float(
-                                    PTINSULIDX_DRELATIVEPERMIT[
-                                        int(PTCABCOND_IINSUL[int(row_ug1[5][:-1])])
+                                    db["PTINSULIDX_DRELATIVEPERMIT"][
+                                        int(db["PTCABCOND_IINSUL"][int(row_ug1[5][:-1])])
                                     ]
                                 )
                                 if row_ug1[6] == "-1,":
@@ -1522,43 +1513,43 @@ class Reader:
                                 else:
                                     cond_dia7 = (
                                         float(
-                                            PTCABCOND_DRADCONDSUL[int(row_ug1[6][:-1])]
+                                            db["PTCABCOND_DRADCONDSUL"][int(row_ug1[6][:-1])]
                                         )
                                         / 12
                                     )
                                     cond_res7 = (
                                         float(
-                                            PTCABCOND_DROHMPRLUL[int(row_ug1[6][:-1])]
+                                            db["PTCABCOND_DROHMPRLUL"][int(row_ug1[6][:-1])]
                                         )
                                         * 5.28
                                     )  # LUL TO MILE
                                 if (
-                                    PTCABCOND_TCONCENTNEU[int(row_ug1[5][:-1])] == 1.0
+                                    db["PTCABCOND_TCONCENTNEU"][int(row_ug1[5][:-1])] == 1.0
                                 ):  # CONCENTRIC NEUTRAL
                                     out_dia1 = float(
-                                        PTCABCOND_DDIANEUSTRNDSUL[int(row_ug1[5][:-1])]
+                                        db["PTCABCOND_DDIANEUSTRNDSUL"][int(row_ug1[5][:-1])]
                                     )
                                     out_dia2 = float(
-                                        PTCABCOND_DDIANEUSTRNDSUL[int(row_ug1[5][:-1])]
+                                        db["PTCABCOND_DDIANEUSTRNDSUL"][int(row_ug1[5][:-1])]
                                     )
                                     out_dia3 = float(
-                                        PTCABCOND_DDIANEUSTRNDSUL[int(row_ug1[5][:-1])]
+                                        db["PTCABCOND_DDIANEUSTRNDSUL"][int(row_ug1[5][:-1])]
                                     )
                                     GMR1 = (
-                                        float(PTCABCOND_DGMRSUL[int(row_ug1[5][:-1])])
+                                        float(db["PTCABCOND_DGMRSUL"][int(row_ug1[5][:-1])])
                                         / 12
                                     )
                                     GMR2 = (
-                                        float(PTCABCOND_DGMRSUL[int(row_ug1[5][:-1])])
+                                        float(db["PTCABCOND_DGMRSUL"][int(row_ug1[5][:-1])])
                                         / 12
                                     )
                                     GMR3 = (
-                                        float(PTCABCOND_DGMRSUL[int(row_ug1[5][:-1])])
+                                        float(db["PTCABCOND_DGMRSUL"][int(row_ug1[5][:-1])])
                                         / 12
                                     )
                                     GMR4C = (
                                         float(
-                                            PTCABCOND_DNEUSTRNDGMRSUL[
+                                            db["PTCABCOND_DNEUSTRNDGMRSUL"][
                                                 int(row_ug1[5][:-1])
                                             ]
                                         )
@@ -1566,7 +1557,7 @@ class Reader:
                                     )
                                     GMR5C = (
                                         float(
-                                            PTCABCOND_DNEUSTRNDGMRSUL[
+                                            db["PTCABCOND_DNEUSTRNDGMRSUL"][
                                                 int(row_ug1[5][:-1])
                                             ]
                                         )
@@ -1574,7 +1565,7 @@ class Reader:
                                     )
                                     GMR6C = (
                                         float(
-                                            PTCABCOND_DNEUSTRNDGMRSUL[
+                                            db["PTCABCOND_DNEUSTRNDGMRSUL"][
                                                 int(row_ug1[5][:-1])
                                             ]
                                         )
@@ -1585,25 +1576,25 @@ class Reader:
                                     GMR6S = 0
                                     cond_dia4 = (
                                         float(
-                                            PTCABCOND_DRADSTRNDSUL[int(row_ug1[5][:-1])]
+                                            db["PTCABCOND_DRADSTRNDSUL"][int(row_ug1[5][:-1])]
                                         )
                                         * 2
                                     )
                                     cond_dia5 = (
                                         float(
-                                            PTCABCOND_DRADSTRNDSUL[int(row_ug1[5][:-1])]
+                                            db["PTCABCOND_DRADSTRNDSUL"][int(row_ug1[5][:-1])]
                                         )
                                         * 2
                                     )
                                     cond_dia6 = (
                                         float(
-                                            PTCABCOND_DRADSTRNDSUL[int(row_ug1[5][:-1])]
+                                            db["PTCABCOND_DRADSTRNDSUL"][int(row_ug1[5][:-1])]
                                         )
                                         * 2
                                     )
                                     cond_res4 = (
                                         float(
-                                            PTCABCOND_DNEUSTRNDROHM[
+                                            db["PTCABCOND_DNEUSTRNDROHM"][
                                                 int(row_ug1[5][:-1])
                                             ]
                                         )
@@ -1611,7 +1602,7 @@ class Reader:
                                     )
                                     cond_res5 = (
                                         float(
-                                            PTCABCOND_DNEUSTRNDROHM[
+                                            db["PTCABCOND_DNEUSTRNDROHM"][
                                                 int(row_ug1[5][:-1])
                                             ]
                                         )
@@ -1619,7 +1610,7 @@ class Reader:
                                     )
                                     cond_res6 = (
                                         float(
-                                            PTCABCOND_DNEUSTRNDROHM[
+                                            db["PTCABCOND_DNEUSTRNDROHM"][
                                                 int(row_ug1[5][:-1])
                                             ]
                                         )
@@ -1637,13 +1628,13 @@ class Reader:
                                     sheild_dia3 = 0
                                     sheild_dia4 = 0
                                     nue_strands4 = float(
-                                        PTCABCOND_SNUMNEUSTRND[int(row_ug1[5][:-1])]
+                                        db["PTCABCOND_SNUMNEUSTRND"][int(row_ug1[5][:-1])]
                                     )
                                     nue_strands5 = float(
-                                        PTCABCOND_SNUMNEUSTRND[int(row_ug1[5][:-1])]
+                                        db["PTCABCOND_SNUMNEUSTRND"][int(row_ug1[5][:-1])]
                                     )
                                     nue_strands6 = float(
-                                        PTCABCOND_SNUMNEUSTRND[int(row_ug1[5][:-1])]
+                                        db["PTCABCOND_SNUMNEUSTRND"][int(row_ug1[5][:-1])]
                                     )
                                     R14 = (out_dia1 - cond_dia4) / 24
                                     R25 = (out_dia2 - cond_dia5) / 24
@@ -1680,7 +1671,7 @@ class Reader:
                                     else:
                                         GMR7 = (
                                             float(
-                                                PTCABCOND_DGMRSUL[int(row_ug1[6][:-1])]
+                                                db["PTCABCOND_DGMRSUL"][int(row_ug1[6][:-1])]
                                             )
                                             / 12
                                         )
@@ -1688,45 +1679,45 @@ class Reader:
                                         D27 = abs(XN - XB)
                                         D37 = abs(XN - XC)
                                 elif (
-                                    PTCABCOND_TCONCENTNEU[int(row_ug1[5][:-1])] == 0.0
+                                    db["PTCABCOND_TCONCENTNEU"][int(row_ug1[5][:-1])] == 0.0
                                 ):  # TAPE SHEILD
                                     out_dia1 = float(
-                                        PTCABCOND_DCONDJACKETSUL[int(row_ug1[5][:-1])]
+                                        db["PTCABCOND_DCONDJACKETSUL"][int(row_ug1[5][:-1])]
                                     )
                                     out_dia2 = float(
-                                        PTCABCOND_DCONDJACKETSUL[int(row_ug1[5][:-1])]
+                                        db["PTCABCOND_DCONDJACKETSUL"][int(row_ug1[5][:-1])]
                                     )
                                     out_dia3 = float(
-                                        PTCABCOND_DCONDJACKETSUL[int(row_ug1[5][:-1])]
+                                        db["PTCABCOND_DCONDJACKETSUL"][int(row_ug1[5][:-1])]
                                     )
                                     GMR1 = (
-                                        float(PTCABCOND_DGMRSUL[int(row_ug1[5][:-1])])
+                                        float(db["PTCABCOND_DGMRSUL"][int(row_ug1[5][:-1])])
                                         / 12
                                     )
                                     GMR2 = (
-                                        float(PTCABCOND_DGMRSUL[int(row_ug1[5][:-1])])
+                                        float(db["PTCABCOND_DGMRSUL"][int(row_ug1[5][:-1])])
                                         / 12
                                     )
                                     GMR3 = (
-                                        float(PTCABCOND_DGMRSUL[int(row_ug1[5][:-1])])
+                                        float(db["PTCABCOND_DGMRSUL"][int(row_ug1[5][:-1])])
                                         / 12
                                     )
                                     GMR4C = 0
                                     GMR5C = 0
                                     GMR6C = 0
                                     Tape_Thick = float(
-                                        PTCABCOND_DDIANEUSTRNDSUL[int(row_ug1[5][:-1])]
+                                        db["PTCABCOND_DDIANEUSTRNDSUL"][int(row_ug1[5][:-1])]
                                     )
                                     GMR4S = (
-                                        float(PTCABCOND_DINSULSUL[int(row_ug1[5][:-1])])
+                                        float(db["PTCABCOND_DINSULSUL"][int(row_ug1[5][:-1])])
                                         + Tape_Thick
                                     ) / 24.0  # recheck this
                                     GMR5S = (
-                                        float(PTCABCOND_DINSULSUL[int(row_ug1[5][:-1])])
+                                        float(db["PTCABCOND_DINSULSUL"][int(row_ug1[5][:-1])])
                                         + Tape_Thick
                                     ) / 24.0  # recheck this
                                     GMR6S = (
-                                        float(PTCABCOND_DINSULSUL[int(row_ug1[5][:-1])])
+                                        float(db["PTCABCOND_DINSULSUL"][int(row_ug1[5][:-1])])
                                         + Tape_Thick
                                     ) / 24.0  # recheck this
                                     cond_dia4 = 0
@@ -1739,12 +1730,12 @@ class Reader:
                                         (7.9385e8)
                                         * 0.3048
                                         * float(
-                                            PTCABCOND_DNEUSTRNDROHM[
+                                            db["PTCABCOND_DNEUSTRNDROHM"][
                                                 int(row_ug1[5][:-1])
                                             ]
                                         )
                                     ) / (
-                                        float(PTCABCOND_DINSULSUL[int(row_ug1[5][:-1])])
+                                        float(db["PTCABCOND_DINSULSUL"][int(row_ug1[5][:-1])])
                                         * Tape_Thick
                                         * 1000
                                     )
@@ -1752,12 +1743,12 @@ class Reader:
                                         (7.9385e8)
                                         * 0.3048
                                         * float(
-                                            PTCABCOND_DNEUSTRNDROHM[
+                                            db["PTCABCOND_DNEUSTRNDROHM"][
                                                 int(row_ug1[5][:-1])
                                             ]
                                         )
                                     ) / (
-                                        float(PTCABCOND_DINSULSUL[int(row_ug1[5][:-1])])
+                                        float(db["PTCABCOND_DINSULSUL"][int(row_ug1[5][:-1])])
                                         * Tape_Thick
                                         * 1000
                                     )
@@ -1765,12 +1756,12 @@ class Reader:
                                         (7.9385e8)
                                         * 0.3048
                                         * float(
-                                            PTCABCOND_DNEUSTRNDROHM[
+                                            db["PTCABCOND_DNEUSTRNDROHM"][
                                                 int(row_ug1[5][:-1])
                                             ]
                                         )
                                     ) / (
-                                        float(PTCABCOND_DINSULSUL[int(row_ug1[5][:-1])])
+                                        float(db["PTCABCOND_DINSULSUL"][int(row_ug1[5][:-1])])
                                         * Tape_Thick
                                         * 1000
                                     )
@@ -1778,28 +1769,28 @@ class Reader:
                                     sheild_thick2 = Tape_Thick
                                     sheild_thick3 = Tape_Thick
                                     sheild_dia1 = (
-                                        float(PTCABCOND_DINSULSUL[int(row_ug1[5][:-1])])
+                                        float(db["PTCABCOND_DINSULSUL"][int(row_ug1[5][:-1])])
                                         + 2 * Tape_Thick
                                     )
                                     # recheck this
                                     sheild_dia2 = (
-                                        float(PTCABCOND_DINSULSUL[int(row_ug1[5][:-1])])
+                                        float(db["PTCABCOND_DINSULSUL"][int(row_ug1[5][:-1])])
                                         + 2 * Tape_Thick
                                     )
                                     # recheck this
                                     sheild_dia3 = (
-                                        float(PTCABCOND_DINSULSUL[int(row_ug1[5][:-1])])
+                                        float(db["PTCABCOND_DINSULSUL"][int(row_ug1[5][:-1])])
                                         + 2 * Tape_Thick
                                     )
                                     # recheck this
                                     nue_strands4 = float(
-                                        PTCABCOND_SNUMNEUSTRND[int(row_ug1[5][:-1])]
+                                        db["PTCABCOND_SNUMNEUSTRND"][int(row_ug1[5][:-1])]
                                     )
                                     nue_strands5 = float(
-                                        PTCABCOND_SNUMNEUSTRND[int(row_ug1[5][:-1])]
+                                        db["PTCABCOND_SNUMNEUSTRND"][int(row_ug1[5][:-1])]
                                     )
                                     nue_strands6 = float(
-                                        PTCABCOND_SNUMNEUSTRND[int(row_ug1[5][:-1])]
+                                        db["PTCABCOND_SNUMNEUSTRND"][int(row_ug1[5][:-1])]
                                     )
                                     R14 = (sheild_dia1 - sheild_thick1) / 2
                                     R25 = (sheild_dia2 - sheild_thick2) / 2
@@ -1818,26 +1809,26 @@ class Reader:
                                     else:
                                         GMR7 = (
                                             float(
-                                                PTCABCOND_DGMRSUL[int(row_ug1[6][:-1])]
+                                                db["PTCABCOND_DGMRSUL"][int(row_ug1[6][:-1])]
                                             )
                                             / 12
                                         )
                                         sheild_thick4 = float(
-                                            PTCABCOND_DDIANEUSTRNDSUL[
+                                            db["PTCABCOND_DDIANEUSTRNDSUL"][
                                                 int(row_ug1[6][:-1])
                                             ]
                                         )
                                         sheild_dia4 = float(
-                                            PTCABCOND_DINSULSUL[int(row_ug1[6][:-1])]
+                                            db["PTCABCOND_DINSULSUL"][int(row_ug1[6][:-1])]
                                         ) + float(
-                                            PTCABCOND_DDIANEUSTRNDSUL[
+                                            db["PTCABCOND_DDIANEUSTRNDSUL"][
                                                 int(row_ug1[6][:-1])
                                             ]
                                         )
                                         # recheck this
                                         cond_res7 = (
                                             float(
-                                                PTCABCOND_DROHMPRLUL[
+                                                db["PTCABCOND_DROHMPRLUL"][
                                                     int(row_ug1[6][:-1])
                                                 ]
                                             )
@@ -2083,7 +2074,7 @@ class Reader:
                                     [D71, D72, D73, D74, D75, D76, 0.0],
                                 ]
                                 if (
-                                    PTCABCOND_TCONCENTNEU[int(row_ug1[5][:-1])] == 1.0
+                                    db["PTCABCOND_TCONCENTNEU"][int(row_ug1[5][:-1])] == 1.0
                                 ):  # Concentric Neutral
                                     for i_cn in range(7):
                                         for j_cn in range(7):
@@ -2431,12 +2422,12 @@ class Reader:
                                         Yabc[2][2] = ccn * Cap_Freq
                             else:  # if sequence impedance componets are defined #expand this part
                                 Z012 = Yabc
-                                R1 = float(PTLINESPC_DXPH1ORR1[int(entries[6][:-1])])
-                                X1 = float(PTLINESPC_DYPH1ORX1[int(entries[6][:-1])])
-                                R0 = float(PTLINESPC_DXPH2ORR0[int(entries[6][:-1])])
-                                X0 = float(PTLINESPC_DYPH2ORX0[int(entries[6][:-1])])
-                                Y1 = float(PTLINESPC_DYPH3ORY1[int(entries[6][:-1])])
-                                Y0 = float(PTLINESPC_DXPH3ORY0[int(entries[6][:-1])])
+                                R1 = float(db["PTLINESPC_DXPH1ORR1"][int(entries[6][:-1])])
+                                X1 = float(db["PTLINESPC_DYPH1ORX1"][int(entries[6][:-1])])
+                                R0 = float(db["PTLINESPC_DXPH2ORR0"][int(entries[6][:-1])])
+                                X0 = float(db["PTLINESPC_DYPH2ORX0"][int(entries[6][:-1])])
+                                Y1 = float(db["PTLINESPC_DYPH3ORY1"][int(entries[6][:-1])])
+                                Y0 = float(db["PTLINESPC_DXPH3ORY0"][int(entries[6][:-1])])
                                 if "A" in ph_w:
                                     Zabc[0][0] = ((complex(R1, X1)) / 1.25) / 0.151515
                                     Yabc[0][0] = ((complex(0, Y1)) / 1.25) / 0.151515
@@ -2494,45 +2485,45 @@ class Reader:
                             DBE = 0.0
                             DCE = 0.0
                             GMRA_OH = (
-                                float(PTLINECOND_DGMRSUL[int(row_ug1[5][:-1])]) / 12.0
+                                float(db["PTLINECOND_DGMRSUL"][int(row_ug1[5][:-1])]) / 12.0
                             )
                             GMRB_OH = (
-                                float(PTLINECOND_DGMRSUL[int(row_ug1[5][:-1])]) / 12.0
+                                float(db["PTLINECOND_DGMRSUL"][int(row_ug1[5][:-1])]) / 12.0
                             )
                             GMRC_OH = (
-                                float(PTLINECOND_DGMRSUL[int(row_ug1[5][:-1])]) / 12.0
+                                float(db["PTLINECOND_DGMRSUL"][int(row_ug1[5][:-1])]) / 12.0
                             )
                             RESA_OH = (
-                                float(PTLINECOND_DROHMPRLUL[int(row_ug1[5][:-1])])
+                                float(db["PTLINECOND_DROHMPRLUL"][int(row_ug1[5][:-1])])
                                 * 5.28
                             )
                             RESB_OH = (
-                                float(PTLINECOND_DROHMPRLUL[int(row_ug1[5][:-1])])
+                                float(db["PTLINECOND_DROHMPRLUL"][int(row_ug1[5][:-1])])
                                 * 5.28
                             )
                             RESC_OH = (
-                                float(PTLINECOND_DROHMPRLUL[int(row_ug1[5][:-1])])
+                                float(db["PTLINECOND_DROHMPRLUL"][int(row_ug1[5][:-1])])
                                 * 5.28
                             )
                             DIAA = (
-                                float(PTLINECOND_DRADCONDSUL[int(row_ug1[5][:-1])]) * 2
+                                float(db["PTLINECOND_DRADCONDSUL"][int(row_ug1[5][:-1])]) * 2
                             )
                             DIAB = (
-                                float(PTLINECOND_DRADCONDSUL[int(row_ug1[5][:-1])]) * 2
+                                float(db["PTLINECOND_DRADCONDSUL"][int(row_ug1[5][:-1])]) * 2
                             )
                             DIAC = (
-                                float(PTLINECOND_DRADCONDSUL[int(row_ug1[5][:-1])]) * 2
+                                float(db["PTLINECOND_DRADCONDSUL"][int(row_ug1[5][:-1])]) * 2
                             )
                             if (
-                                PTLINESPC_TMUTSPC[int(row_ug1[4][:-1])] == 0.0
-                                or PTLINESPC_TMUTSPC[int(row_ug1[4][:-1])] == 1.0
+                                db["PTLINESPC_TMUTSPC"][int(row_ug1[4][:-1])] == 0.0
+                                or db["PTLINESPC_TMUTSPC"][int(row_ug1[4][:-1])] == 1.0
                             ):
-                                X1 = float(PTLINESPC_DXPH1ORR1[int(row_ug1[4][:-1])])
-                                X2 = float(PTLINESPC_DXPH2ORR0[int(row_ug1[4][:-1])])
-                                X3 = float(PTLINESPC_DXPH3ORY0[int(row_ug1[4][:-1])])
-                                Y1 = float(PTLINESPC_DYPH1ORX1[int(row_ug1[4][:-1])])
-                                Y2 = float(PTLINESPC_DYPH2ORX0[int(row_ug1[4][:-1])])
-                                Y3 = float(PTLINESPC_DYPH3ORY1[int(row_ug1[4][:-1])])
+                                X1 = float(db["PTLINESPC_DXPH1ORR1"][int(row_ug1[4][:-1])])
+                                X2 = float(db["PTLINESPC_DXPH2ORR0"][int(row_ug1[4][:-1])])
+                                X3 = float(db["PTLINESPC_DXPH3ORY0"][int(row_ug1[4][:-1])])
+                                Y1 = float(db["PTLINESPC_DYPH1ORX1"][int(row_ug1[4][:-1])])
+                                Y2 = float(db["PTLINESPC_DYPH2ORX0"][int(row_ug1[4][:-1])])
+                                Y3 = float(db["PTLINESPC_DYPH3ORY1"][int(row_ug1[4][:-1])])
                                 PH1 = ""
                                 PH2 = ""
                                 PH3 = ""
@@ -2594,8 +2585,8 @@ class Reader:
                                     XN = 0.0
                                     YN = 0.0
                                 else:
-                                    XN = float(PTLINESPC_DXNEU[int(row_ug1[4][:-1])])
-                                    YN = float(PTLINESPC_DYNEU[int(row_ug1[4][:-1])])
+                                    XN = float(db["PTLINESPC_DXNEU"][int(row_ug1[4][:-1])])
+                                    YN = float(db["PTLINESPC_DYNEU"][int(row_ug1[4][:-1])])
                                 DAB = pow((pow(XB - XA, 2) + pow(YB - YA, 2)), 0.5)
                                 DAC = pow((pow(XC - XA, 2) + pow(YC - YA, 2)), 0.5)
                                 DBC = pow((pow(XC - XB, 2) + pow(YC - YB, 2)), 0.5)
@@ -2612,15 +2603,15 @@ class Reader:
                                 DIAN = 0
                             else:
                                 GMRN_OH = (
-                                    float(PTLINECOND_DGMRSUL[int(row_ug1[6][:-1])])
+                                    float(db["PTLINECOND_DGMRSUL"][int(row_ug1[6][:-1])])
                                     / 12.0
                                 )
                                 RESN_OH = (
-                                    float(PTLINECOND_DROHMPRLUL[int(row_ug1[6][:-1])])
+                                    float(db["PTLINECOND_DROHMPRLUL"][int(row_ug1[6][:-1])])
                                     * 5.28
                                 )
                                 DIAN = (
-                                    float(PTLINECOND_DRADCONDSUL[int(row_ug1[6][:-1])])
+                                    float(db["PTLINECOND_DRADCONDSUL"][int(row_ug1[6][:-1])])
                                     * 2
                                 )
                             if "A" in ph_w:
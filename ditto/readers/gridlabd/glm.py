@@ -0,0 +1,158 @@
+"""Streaming tokenizer for GridLAB-D GLM files.
+
+The GLM input is read line by line, following ``#include`` directives
+depth-first, and turned into compact object and schedule records without
+ever holding the text of the model in memory.
+"""
+from __future__ import absolute_import, division, print_function
+from builtins import super, range, zip, round, map
+
+from collections import namedtuple
+from datetime import datetime
+from croniter import croniter
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# An ``object`` block: class name, name given in the header (or None) and the
+# (property, value) pairs in the order they appear in the file.
+GLMObject = namedtuple("GLMObject", ["klass", "name", "properties"])
+
+# A ``schedule`` block: name and the (cron expression, value) rows.
+GLMSchedule = namedtuple("GLMSchedule", ["name", "rows"])
+
+
+def iter_lines(path, _stack=None):
+    """Yields the lines of a GLM file, expanding ``#include`` directives in place.
+
+    Included paths are resolved relative to the including file, falling back
+    to the current working directory. Circular includes are skipped.
+    """
+    path = os.path.abspath(path)
+    stack = _stack if _stack is not None else []
+    if path in stack:
+        logger.warning("Skipping circular #include of {}".format(path))
+        return
+    stack.append(path)
+
+    with open(path, "r") as f:
+        for row in f:
+            if row[:8] == "#include":
+                location = row.split()[1].strip('"')
+                candidate = os.path.join(os.path.dirname(path), location)
+                if not os.path.exists(candidate):
+                    candidate = location
+                for included in iter_lines(candidate, stack):
+                    yield included
+            else:
+                yield row
+
+    stack.pop()
+
+
+def iter_blocks(lines, ignore_classes=()):
+    """Yields a GLMObject or GLMSchedule for every top level block in lines.
+
+    Objects whose class is in ignore_classes are dropped. Nested objects are
+    not emitted; their properties are folded into the enclosing object.
+    """
+    curr_object = None
+    curr_schedule = None
+    ignore_elements = False
+    schedule_bracket_cnt = 0
+
+    for row in lines:
+        row = row.strip()
+
+        if row[:2] == "//":
+            continue
+        entries = row.split()
+        if len(entries) > 0 and entries[0] == "object":
+            if curr_object is None:
+                obj = entries[1].split(":")
+                if obj[0] in ignore_classes:
+                    continue
+                curr_object = GLMObject(obj[0], obj[1] if len(obj) > 1 else None, [])
+            else:
+                ignore_elements = True
+
+        elif len(entries) > 0 and entries[0] == "schedule":
+            if curr_schedule is None:
+                curr_schedule = GLMSchedule(entries[1], [])
+                schedule_bracket_cnt = 1
+
+        else:
+            if curr_object is None and curr_schedule is None:
+                continue
+            if curr_object is not None:
+                if len(entries) > 1:
+                    value = entries[1]
+                    if value[-1] == ";":
+                        value = value[:-1]
+                    curr_object.properties.append((entries[0], value))
+
+                if len(row) >= 1:
+                    if row[-1] == "}" or row[-2:] == "};":
+                        if ignore_elements:  # Assumes only one layer of nesting
+                            ignore_elements = False
+                        else:
+                            yield curr_object
+                            curr_object = None
+
+            if curr_schedule is not None:
+                row = row.strip(";")
+                entries = row.split()
+                if len(entries) > 5:
+                    curr_schedule.rows.append((" ".join(entries[:-1]), entries[-1]))
+
+                if len(row) >= 1:
+                    if row[-1] == "}":
+                        schedule_bracket_cnt = schedule_bracket_cnt - 1
+                    if row[0] == "{":
+                        schedule_bracket_cnt = schedule_bracket_cnt + 1
+                    if schedule_bracket_cnt == 0:
+                        yield curr_schedule
+                        curr_schedule = None
+
+
+class LazySchedules(object):
+    """Mapping from schedule name to its value at origin_datetime.
+
+    The cron rows of a schedule are only evaluated the first time the schedule
+    is looked up, so schedules that no kept object refers to cost nothing.
+    """
+
+    def __init__(self, origin_datetime, delta_datetime):
+        self.origin_datetime = origin_datetime
+        self.sub_datetime = origin_datetime - delta_datetime
+        self.rows = {}
+        self.values = {}
+
+    def add(self, schedule):
+        self.rows[schedule.name] = schedule.rows
+
+    def _evaluate(self, name):
+        value = None
+        for cron, v in self.rows.get(name, []):
+            iter = croniter(cron, self.sub_datetime)
+            if iter.get_next(datetime) == self.origin_datetime:
+                value = v
+                break
+        self.values[name] = value
+        return value
+
+    def __contains__(self, name):
+        if name not in self.values:
+            self._evaluate(name)
+        return self.values[name] is not None
+
+    def __getitem__(self, name):
+        if name not in self:
+            raise KeyError(name)
+        return self.values[name]
+
+    def __repr__(self):
+        return "LazySchedules({} schedules, {} evaluated)".format(
+            len(self.rows), len(self.values)
+        )
@@ -3,7 +3,6 @@ from builtins import super, range, zip, round, map
 
 from datetime import datetime
 from datetime import timedelta
-from croniter import croniter
 import logging
 import math
 import sys
@@ -39,6 +38,7 @@ from ditto.formats.gridlabd import base
 from ditto.models.base import Unicode
 
 from ..abstract_reader import AbstractReader
+from .glm import iter_lines, iter_blocks, GLMSchedule, LazySchedules
 
 logger = logging.getLogger(__name__)
 
@@ -50,6 +50,23 @@ class Reader(AbstractReader):
     """
     register_names = ["glm", "gridlabd"]
 
+    # Classes that have no DiTTo equivalent. Their objects are dropped while tokenizing.
+    ignored_classes = frozenset(
+        [
+            "house",
+            "solar",
+            "inverter",
+            "waterheater",
+            "climate",
+            "ZIPload",
+            "tape.recorder",
+            "player",
+            "tape.collector",
+            "tape.group_recorder",
+            "recorder",
+        ]
+    )
+
     all_gld_objects = {}
     all_api_objects = {}
 
@@ -495,126 +512,28 @@ class Reader(AbstractReader):
     def parse(self, model, origin_datetime="2017 Jun 1 2:00PM"):
         origin_datetime = datetime.strptime(origin_datetime, "%Y %b %d %I:%M%p")
         delta_datetime = timedelta(minutes=1)
-        sub_datetime = origin_datetime - delta_datetime
-
-        inputfile = open(self.input_file, "r")
-        all_rows = inputfile.readlines()
-        curr_object = None
-        curr_schedule = None
-        ignore_elements = False
-        found_schedule = False
-        all_includes = []
-        all_schedules = {}
-        for row in all_rows:
-            if row[:8] == "#include":
-                entries = row.split()
-                location = entries[1].strip('"')
-                include_file = open(location, "r")
-                include_rows = include_file.readlines()
-                all_includes = all_includes + include_rows
-        all_rows = all_rows + all_includes
-        for row in all_rows:
-            row = row.strip()
-
-            if row[:2] == "//":
-                continue
-            entries = row.split()
-            if len(entries) > 0 and entries[0] == "object":
-                if curr_object is None:
-                    obj = entries[1].split(":")
-                    obj_class = obj[0]
-                    if (
-                        obj_class == "house"
-                        or obj_class == "solar"
-                        or obj_class == "inverter"
-                        or obj_class == "waterheater"
-                        or obj_class == "climate"
-                        or obj_class == "ZIPload"
-                        or obj_class == "tape.recorder"
-                        or obj_class == "player"
-                        or obj_class == "tape.collector"
-                        or obj_class == "tape.group_recorder"
-                        or obj_class == "recorder"
-                    ):
-                        continue
-                    curr_object = getattr(gridlabd, obj_class)()
-                    if len(obj) > 1:
-                        curr_object["name"] = obj_class + ":" + obj[1]
-                else:
-                    ignore_elements = True
 
-            elif len(entries) > 0 and entries[0] == "schedule":
-                if curr_schedule is None:
-                    schedule = entries[1]
-                    schedule_bracket_cnt = 1
-                curr_schedule = schedule
-
-            else:
-                if curr_object == None and curr_schedule == None:
-                    continue
-                if curr_object != None:
-                    entries = row.split()
-                    if len(entries) > 1:
-                        element = entries[0]
-                        value = entries[1]
-                        if value[-1] == ";":
-                            value = value[:-1]
-                        if len(entries) > 2:
-                            units = entries[2]
-                            # TODO: Deal with units correctly
-                            # print element,value,units
-                            # if units[0] =='k':
-                            #    value = value/1000.0
-                        # Assuming no nested objects for now.
-                        curr_object[element] = value
-
-                    if len(row) >= 1:
-                        if row[-1] == "}" or row[-2:] == "};":
-                            if ignore_elements:  # Assumes only one layer of nesting
-                                ignore_elements = False
-                            else:
-                                try:
-                                    self.all_gld_objects[
-                                        curr_object["name"]
-                                    ] = curr_object
-                                    curr_object = None
-                                except:
+        all_schedules = LazySchedules(origin_datetime, delta_datetime)
+        lines = iter_lines(self.input_file)
+        for block in iter_blocks(lines, ignore_classes=self.ignored_classes):
+            if isinstance(block, GLMSchedule):
+                all_schedules.add(block)
+                continue
 
-                                    if (
-                                        curr_object["from"] != None
-                                        and curr_object["to"] != None
-                                    ):
-                                        curr_object["name"] = (
-                                            curr_object["from"]
-                                            + "-"
-                                            + curr_object["to"]
-                                        )
-                                        self.all_gld_objects[
-                                            curr_object["name"]
-                                        ] = curr_object
+            curr_object = getattr(gridlabd, block.klass)()
+            if block.name is not None:
+                curr_object["name"] = block.klass + ":" + block.name
+            for element, value in block.properties:
+                curr_object[element] = value
 
-                                    else:
-                                        logger.debug("Warning object missing a name")
-                                    curr_object = None
-                if curr_schedule != None:
-                    row = row.strip(";")
-                    entries = row.split()
-                    if len(entries) > 5 and not found_schedule:
-                        cron = " ".join(entries[:-1])
-                        value = entries[-1]
-                        iter = croniter(cron, sub_datetime)
-                        if iter.get_next(datetime) == origin_datetime:
-                            found_schedule = True
-                            all_schedules[curr_schedule] = value
-
-                    if len(row) >= 1:
-                        if row[-1] == "}":
-                            schedule_bracket_cnt = schedule_bracket_cnt - 1
-                        if row[0] == "{":
-                            schedule_bracket_cnt = schedule_bracket_cnt + 1
-                        if schedule_bracket_cnt == 0:
-                            curr_schedule = None
-                            found_schedule = False
+            try:
+                self.all_gld_objects[curr_object["name"]] = curr_object
+            except:
+                if curr_object["from"] != None and curr_object["to"] != None:
+                    curr_object["name"] = curr_object["from"] + "-" + curr_object["to"]
+                    self.all_gld_objects[curr_object["name"]] = curr_object
+                else:
+                    logger.debug("Warning object missing a name")
 
         logger.debug(all_schedules)
         for obj_name, obj in self.all_gld_objects.items():
@@ -0,0 +1,111 @@
+'''
+    Incremental loading of Windmil MultiSpeak exports.
+
+    The xml files are parsed with iterparse and every element below
+    MultiSpeakMsgHeader/MultiSpeak is handed over as soon as it is complete,
+    in the same dictionary layout xmltodict produces, before its subtree is
+    discarded. Equipment libraries are cached per file and modification time.
+'''
+from concurrent.futures import ProcessPoolExecutor
+import os
+import xml.etree.ElementTree as ET
+
+import pandas as pd
+
+_LIBRARIES = {}
+
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def element_to_dict(element):
+    '''
+        Converts an ElementTree element to the value xmltodict would give it:
+        attributes are prefixed with '@', repeated children become lists and
+        text next to attributes or children is stored under '#text'.
+    '''
+    result = {}
+    for key, value in element.attrib.items():
+        result['@' + _local_name(key)] = value
+
+    for child in element:
+        name = _local_name(child.tag)
+        value = element_to_dict(child)
+        if name in result:
+            if not isinstance(result[name], list):
+                result[name] = [result[name]]
+            result[name].append(value)
+        else:
+            result[name] = value
+
+    text = element.text.strip() if element.text is not None else ''
+    if not result:
+        return text or None
+    if text:
+        result['#text'] = text
+    return result
+
+
+def iter_multispeak_elements(path):
+    '''
+        Yields (class name, element dictionary) for every element of a MultiSpeak file.
+    '''
+    stack = []
+    for event, element in ET.iterparse(path, events=('start', 'end')):
+        if event == 'start':
+            stack.append(element)
+            continue
+
+        stack.pop()
+        if len(stack) == 2 and _local_name(stack[0].tag) == 'MultiSpeakMsgHeader' \
+                and _local_name(stack[1].tag) == 'MultiSpeak':
+            yield _local_name(element.tag), element_to_dict(element)
+            # Drop the finished subtree so that memory stays bounded by the largest element
+            stack[1].remove(element)
+
+
+def read_multispeak_file(path):
+    '''
+        Returns the elements of a MultiSpeak file as a list. Used by the worker processes.
+    '''
+    return list(iter_multispeak_elements(path))
+
+
+def iter_multispeak_folder(folder, max_workers=1):
+    '''
+        Yields (class name, element dictionary) for all the xml files of a folder, in file order.
+        With max_workers > 1 the files are parsed concurrently in worker processes.
+    '''
+    filenames = [f for f in os.listdir(folder) if '.xml' in f]
+    paths = [os.path.join(folder, f) for f in filenames]
+    if max_workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(read_multispeak_file, path) for path in paths]
+            for filename, future in zip(filenames, futures):
+                try:
+                    elements = future.result()
+                except Exception:
+                    raise ValueError('Unable to open file {name}'.format(name=filename))
+                for item in elements:
+                    yield item
+    else:
+        for filename, path in zip(filenames, paths):
+            try:
+                for item in iter_multispeak_elements(path):
+                    yield item
+            except (ET.ParseError, OSError):
+                raise ValueError('Unable to open file {name}'.format(name=filename))
+
+
+def read_library(path):
+    '''
+        Reads an equipment library workbook, reusing the previous result while the file is unchanged.
+    '''
+    path = os.path.abspath(path)
+    mtime = os.path.getmtime(path)
+    cached = _LIBRARIES.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, pd.read_excel(path, index_col=0).T)
+        _LIBRARIES[path] = cached
+    return cached[1]
@@ -4,10 +4,9 @@ import numpy as np
 import logging
 import os
 
-import xmltodict
-
 
 from ditto.readers.abstract_reader import AbstractReader
+from ditto.readers.windmil.multispeak import iter_multispeak_folder, read_library
 from ditto.store import Store
 from ditto.models.node import Node
 from ditto.models.line import Line
@@ -44,53 +43,29 @@ class Reader(AbstractReader):
             self.windmil_folders['Network'] = kwargs['network_folder']
         if 'library_folder' in kwargs:
             self.windmil_folders['Libraries'] = kwargs['library_folder']
+        # Number of processes used to parse the xml files of the network folder
+        self.load_workers = kwargs.get('load_workers', 1)
 
 
-    def __CreateElmDicts(self, parsed_xml):
-        '''
-        This function
-        :param ParsedXML:
-        :return:
-        '''
-
-        for object_name, object_dictionary in parsed_xml.items():
-            if object_name not in self.elements_by_class:
-                self.elements_by_class[object_name] = {}
-            if isinstance(object_dictionary, list):
-                for ElmDict in object_dictionary:
-                    if '@objectID' in ElmDict:
-                        self.elements[ElmDict['@objectID']] = ElmDict
-                        self.elements_by_class[object_name][ElmDict['@objectID']] = ElmDict
-            else:
-                if '@objectID' in object_dictionary:
-                    self.elements[object_dictionary['@objectID']] = object_dictionary
-                    self.elements_by_class[object_name][object_dictionary['@objectID']] = object_dictionary
-        return
-
     def get_file_content(self):
         """
             Windmil generates multiple xml(Multispeak format) files for a single project. The code below
-            reads all the xml files in a given folder and merges them to form 1 dictionary
+            streams all the xml files in a given folder into one element index, keyed on objectID
         """
         self.elements = {}
         self.elements_by_class = {}
-        multispeak_files = os.listdir(self.windmil_folders['Network'])
-        for filename in multispeak_files:
-            if '.xml' in filename:
-                try:
-                    XmlFile = open(self.windmil_folders['Network'] + filename)
-                    XmlDict = xmltodict.parse(XmlFile.read())['MultiSpeakMsgHeader']['MultiSpeak']
-                    XmlFile.close()
-                    self.__CreateElmDicts(XmlDict)
-                except:
-                    raise ValueError('Unable to open file {name}'.format(name=filename))
+        for object_name, element in iter_multispeak_folder(self.windmil_folders['Network'], self.load_workers):
+            if object_name not in self.elements_by_class:
+                self.elements_by_class[object_name] = {}
+            if isinstance(element, dict) and '@objectID' in element:
+                self.elements[element['@objectID']] = element
+                self.elements_by_class[object_name][element['@objectID']] = element
 
         # The code is used to read all the relevant equipment libraries and create a dictionary of DataFrames
         self.libraries = {}
         for library_name, library_path in self.windmil_folders['Libraries'].items():
             try:
-                LibData = pd.read_excel(library_path, index_col=0)
-                self.libraries[library_name] = LibData.T
+                self.libraries[library_name] = read_library(library_path)
             except:
                 raise ValueError('Unable to open file {name}'.format(name=library_path))
         return
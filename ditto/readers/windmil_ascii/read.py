@@ -44,13 +44,11 @@ class Reader(AbstractReader):
         if "network_folder" in kwargs:
             self.windmil_folder = kwargs["network_folder"]
 
+        # Plot the network with bokeh while loading it
+        self.plot = kwargs.get("plot", False)
+
     def filter_edges_by_class(self, class_name):
-        relevant_edges = (
-            (u, v)
-            for u, v, d in self.nxGraph.edges(data=True)
-            if d["class"] == class_name
-        )
-        return relevant_edges
+        return iter(list(self.edges_by_class.get(class_name, {})))
 
     def get_file_content(self):
         """
@@ -58,8 +56,9 @@ class Reader(AbstractReader):
             reads all the xml files in a given folder and merges them to form 1 dictionary
         """
         try:
-            wm_data = wm2graph(self.windmil_folder)
+            wm_data = wm2graph(self.windmil_folder, plot=self.plot)
             self.nxGraph = wm_data.nxGraph
+            self.edges_by_class = wm_data.edges_by_class
         except:
             raise ValueError(
                 "Unable to open project from {name}".format(name=self.windmil_folder)
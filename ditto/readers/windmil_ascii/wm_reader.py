@@ -3,11 +3,6 @@ __version__ = "1.0.0"
 __maintainer__ = "Aadil Latif"
 __email__ = "aadil.latif@nrel.gov"
 
-from bokeh.models import  BoxSelectTool, BoxZoomTool, PanTool, WheelZoomTool, ResetTool, SaveTool, HoverTool
-from bokeh.models import ColumnDataSource
-from bokeh.plotting import figure
-from bokeh.io import curdoc, show
-
 from ditto.readers.windmil_ascii.wm_lookup_tables import *
 import networkx as nx
 import pandas as pd
@@ -17,9 +12,13 @@ import os
 
 class wm2graph:
 
-    def __init__(self, project_folder=None):
+    def __init__(self, project_folder=None, plot=False):
         self.files = {}
         self.tables = {}
+        # Plotting requires bokeh and is only done on request
+        self.plot = plot
+        # (from node, to node) of every edge, indexed on the 'class' of the edge
+        self.edges_by_class = {}
         try:
             file_list = os.listdir(project_folder)
             #print(file_list)
@@ -105,31 +104,45 @@ class wm2graph:
             #self.create_motors()
             self.get_base_kv()
             self.get_graph_metrics()
-            self.create_plot(True)
+            if self.plot:
+                self.create_plot(True)
         else:
             raise ValueError('Circuit elements file not found')
 
+    def add_element_edge(self, from_node, to_node, properties):
+        if self.nxGraph.has_edge(from_node, to_node):
+            old_class = self.nxGraph[from_node][to_node].get('class')
+            self.edges_by_class.get(old_class, {}).pop((from_node, to_node), None)
+        self.nxGraph.add_edge(from_node, to_node, **properties)
+        self.edges_by_class.setdefault(properties['class'], {})[(from_node, to_node)] = None
+
     def get_base_kv(self):
+        """
+            Propagates 'kv' down the graph. An edge without 'kv' takes the value of the first edge
+            feeding its from node, resolved once per edge without recursion.
+        """
         for node1, node2 in self.nxGraph.edges():
             if 'kv' not in self.nxGraph[node1][node2]:
                 self.get_edge_attribute(node1, node2, 'kv')
 
-    def get_edge_attribute(self,Node1, Node2, Ppty):
-        self.EdgePath = []
-        Value = self.iterate_nodes(Node1, Node2, Ppty)
-        for Edge in self.EdgePath:
+    def get_edge_attribute(self, Node1, Node2, Ppty):
+        EdgePath = []
+        visited = set()
+        Edge = (Node1, Node2)
+        Value = None
+        while Edge not in visited:
+            if Ppty in self.nxGraph[Edge[0]][Edge[1]]:
+                Value = self.nxGraph[Edge[0]][Edge[1]][Ppty]
+                break
+            EdgePath.append(Edge)
+            visited.add(Edge)
+            inEdge = next(iter(self.nxGraph.in_edges(Edge[0])), None)
+            if inEdge is None:
+                break
+            Edge = inEdge
+        for Edge in EdgePath:
             self.nxGraph[Edge[0]][Edge[1]][Ppty] = Value
-        return
-
-    def iterate_nodes(self, Node1, Node2, Ppty):
-        self.EdgePath.append([Node1, Node2])
-        if Ppty not in self.nxGraph[Node1][Node2]:
-            inEdge = self.nxGraph.in_edges([Node1])
-            if inEdge:
-                inEdgeNodes = list(inEdge[0])
-                return self.iterate_nodes(inEdgeNodes[0], inEdgeNodes[1], Ppty)
-        else:
-            return self.nxGraph[Node1][Node2][Ppty]
+        return Value
 
     def create_element_libraries(self):
         class_id_lookup = {
@@ -160,7 +173,7 @@ class wm2graph:
         return element_type_library
 
     def get_class_type_locations(self, class_name):
-        relevant_edges = ((u, v) for u, v, d in self.nxGraph.edges(data=True) if d['class'] == class_name)
+        relevant_edges = self.edges_by_class.get(class_name, {})
         Xs=[]
         Ys=[]
         for edge in relevant_edges:
@@ -173,6 +186,11 @@ class wm2graph:
         return Xs, Ys
 
     def create_plot(self, updateCoordinates):
+        from bokeh.models import BoxSelectTool, BoxZoomTool, PanTool, WheelZoomTool, ResetTool, SaveTool
+        from bokeh.models import ColumnDataSource
+        from bokeh.plotting import figure
+        from bokeh.io import curdoc, show
+
         load_x = []
         load_y = []
         load_lines_xs = []
@@ -396,7 +414,7 @@ class wm2graph:
                 'feeder'       : node['Feeder Name'],
                 'mGID'         : node['mGUID'],
             }
-            self.nxGraph.add_edge(from_node, to_node, reg_dict)
+            self.add_element_edge(from_node, to_node, reg_dict)
             self.nxGraph.node[to_node] = {
                 'x': node['X Coordinate'],
                 'y': node['Y Coordinate'],
@@ -432,7 +450,7 @@ class wm2graph:
                 'mGID'         : substation['mGUID'],
             }
             self.nxGraph.graph['kvBase'] = reg_dict['kv']
-            self.nxGraph.add_edge(from_node, to_node, reg_dict)
+            self.add_element_edge(from_node, to_node, reg_dict)
             self.nxGraph.node[to_node] = {
                 'x': substation['X Coordinate'],
                 'y': substation['Y Coordinate'],
@@ -485,7 +503,7 @@ class wm2graph:
                 'mGID'         : reg['mGUID'],
             }
 
-            self.nxGraph.add_edge(from_node, to_node, reg_dict)
+            self.add_element_edge(from_node, to_node, reg_dict)
             self.nxGraph.node[to_node] = {
                 'x': reg['X Coordinate'],
                 'y': reg['Y Coordinate'],
@@ -529,7 +547,7 @@ class wm2graph:
                 'feeder'           : xfmr['Feeder Name'],
                 'mGID'             : xfmr['mGUID'],
             }
-            self.nxGraph.add_edge(from_node, to_node, fuse_dict)
+            self.add_element_edge(from_node, to_node, fuse_dict)
 
             self.nxGraph.node[to_node] = {
                 'x': xfmr['X Coordinate'],
@@ -570,7 +588,7 @@ class wm2graph:
                 'feeder'       : fuse['Feeder Name'],
                 'mGID'         : fuse['mGUID'],
             }
-            self.nxGraph.add_edge(from_node, to_node, fuse_dict)
+            self.add_element_edge(from_node, to_node, fuse_dict)
             self.nxGraph.node[to_node] = {
                 'x': fuse['X Coordinate'],
                 'y': fuse['Y Coordinate'],
@@ -603,7 +621,7 @@ class wm2graph:
                 'feeder'       : switch['Feeder Name'],
                 'mGID'         : switch['mGUID'],
             }
-            self.nxGraph.add_edge(from_node, to_node, switch_dict)
+            self.add_element_edge(from_node, to_node, switch_dict)
             self.nxGraph.node[to_node] = {
                 'x': switch['X Coordinate'],
                 'y': switch['Y Coordinate'],
@@ -644,7 +662,7 @@ class wm2graph:
 
                 }
 
-                self.nxGraph.add_edge(from_node, to_node, line_properties)
+                self.add_element_edge(from_node, to_node, line_properties)
                 self.nxGraph.node[to_node] = {
                     'x': line['X Coordinate'],
                     'y': line['Y Coordinate'],
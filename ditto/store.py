@@ -29,6 +29,7 @@ from .network.network import Network
 from .core import DiTToBase, DiTToTypeError
 from .modify.modify import Modifier
 from .models.node import Node
+from .timeseries.registry import TimeseriesRegistry
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +57,7 @@ class Store(object):
         self._model_store = list()
         self._model_names = {}
         self._network = Network()
+        self.timeseries_registry = None
 
     def __repr__(self):
         return "<%s.%s(elements=%s, models=%s) object at %s>" % (
@@ -135,20 +137,15 @@ class Store(object):
         # self._network.print_attrs()
 
     def delete_cycles(self):
-        """ First convert graph to directed graph (doubles the edges hence creating length 2 cycles)
-        Then find cycles of length greater than 2
+        """ Break the loops of the undirected graph, one edge per cycle of a cycle basis (see Network.break_cycles)
         Use heuristic of removing edge in the middle of the longest single phase section of the loop
-        If no single phase sections, remove edge the furthest from the source
+        The equipment of the edges removed is deleted from the model, and the graph is rebuilt once at the end
         """
-        for i in self._network.find_cycles():
-            if len(i) > 2:
-                logger.debug("Detected cycle {cycle}".format(cycle=i))
-                edge = self._network.middle_single_phase(i)
-                for j in self.models:
-                    if hasattr(j, "name") and j.name == edge:
-                        logger.debug("deleting " + edge)
-                        modifier = Modifier()
-                        modifier.delete_element(self, j)
+        names = set(self._network.break_cycles())
+        modifier = Modifier()
+        for j in [m for m in self.models if getattr(m, "name", None) in names]:
+            logger.debug("deleting " + j.name)
+            modifier.delete_element(self, j)
         self.build_networkx()
 
     def direct_from_source(self, source="sourcebus"):
@@ -198,6 +195,14 @@ class Store(object):
                 except KeyError:
                     pass
 
+    def deduplicate_timeseries(self, base_path=""):
+        """ Keep a single Timeseries for every identical profile (same data, scale factor and interval) of a feeder, and share the in-memory data of the identical profiles.
+        The on-disk data is located relative to base_path. The registry of the profiles is kept in timeseries_registry.
+        Returns the number of Timeseries removed from the model.
+        """
+        self.timeseries_registry = TimeseriesRegistry(base_path)
+        return self.timeseries_registry.deduplicate(self)
+
     def get_internal_edges(self, nodeset):
         return self._network.find_internal_edges(nodeset)
 
@@ -0,0 +1,200 @@
+# coding: utf8
+
+"""
+Memory-mapped storage of the timeseries profiles.
+
+A column file holds many profiles one after the other as raw float32 or float64 values, with
+an index <file>.index.json giving the dtype and the (offset, length) of every profile. A
+Timeseries refers to a profile with its data_file and data_key, and the values are only read
+from disk, through a numpy memmap, when they are accessed. The writers copy the raw values of
+a profile to the binary loadshape files (.sng for float32, .dbl for float64) or stream them
+to csv, without building a DataFrame.
+
+**Usage:**
+
+    >>> ColumnFile.write("profiles.bin", {"residential": values_1, "commercial": values_2})
+    >>> Timeseries(model, data_file="profiles.bin", data_key="residential", interval=0.25)
+    >>> ColumnFile("profiles.bin").array("residential")[:96]
+"""
+from __future__ import absolute_import, division, print_function
+from builtins import super, range, zip, round, map
+
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+from ditto.timeseries.metadata import BINARY_DTYPES
+
+logger = logging.getLogger(__name__)
+
+INDEX_SUFFIX = ".index.json"
+
+# Number of values copied at once when streaming a profile
+CHUNK_SIZE = 1 << 16
+
+
+def binary_extension(dtype):
+    """Returns the extension of the binary loadshape files holding values of dtype."""
+    dtype = np.dtype(dtype)
+    for extension, file_dtype in BINARY_DTYPES.items():
+        if np.dtype(file_dtype) == dtype:
+            return extension
+    raise ValueError("No binary loadshape format for dtype {}".format(dtype))
+
+
+class ColumnFile(object):
+    """
+    Profiles stored in a binary file of float32 or float64 values, with an index of their offsets.
+
+    The index is read when the file is opened and the values are memory-mapped on access, so
+    opening a file with thousands of yearly profiles costs nothing until they are used.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path + INDEX_SUFFIX, "r") as f:
+            index = json.load(f)
+        self.dtype = np.dtype(index["dtype"])
+        self._profiles = {key: tuple(v) for key, v in index["profiles"].items()}
+
+    @classmethod
+    def write(cls, path, profiles, dtype="float32"):
+        """
+        Writes the profiles (dictionary or iterable of (key, values)) to path and its index.
+        The files are written under temporary names and renamed once the profiles are exhausted,
+        so the profiles can be read lazily from the file being replaced. Returns the ColumnFile.
+        """
+        dtype = np.dtype(dtype)
+        if isinstance(profiles, dict):
+            profiles = profiles.items()
+        index = {}
+        offset = 0
+        temporary = path + ".{}.tmp".format(os.getpid())
+        try:
+            with open(temporary, "wb") as f:
+                for key, values in profiles:
+                    if key in index:
+                        raise ValueError("Duplicate profile {}".format(key))
+                    values = np.ascontiguousarray(values, dtype=dtype).ravel()
+                    f.write(values.tobytes())
+                    index[key] = (offset, len(values))
+                    offset += len(values)
+            with open(temporary + INDEX_SUFFIX, "w") as f:
+                json.dump({"dtype": dtype.name, "profiles": index}, f)
+            os.replace(temporary, path)
+            os.replace(temporary + INDEX_SUFFIX, path + INDEX_SUFFIX)
+        finally:
+            for name in [temporary, temporary + INDEX_SUFFIX]:
+                if os.path.exists(name):
+                    os.remove(name)
+        return cls(path)
+
+    def keys(self):
+        return self._profiles.keys()
+
+    def __contains__(self, key):
+        return key in self._profiles
+
+    def __len__(self):
+        return len(self._profiles)
+
+    def length(self, key):
+        """Returns the number of values of the profile key, without reading it."""
+        return self._profiles[key][1]
+
+    def array(self, key):
+        """Returns the values of the profile key as a read-only memmap."""
+        offset, length = self._profiles[key]
+        if length == 0:
+            return np.zeros(0, dtype=self.dtype)
+        return np.memmap(
+            self.path,
+            dtype=self.dtype,
+            mode="r",
+            offset=offset * self.dtype.itemsize,
+            shape=(length,),
+        )
+
+    def copy_to(self, key, path):
+        """Copies the raw values of the profile key to path, a binary loadshape file (.sng or .dbl)."""
+        offset, length = self._profiles[key]
+        with open(self.path, "rb") as source, open(path, "wb") as destination:
+            source.seek(offset * self.dtype.itemsize)
+            remaining = length * self.dtype.itemsize
+            while remaining > 0:
+                chunk = source.read(min(remaining, CHUNK_SIZE * self.dtype.itemsize))
+                if not chunk:
+                    raise IOError("{} is shorter than its index".format(self.path))
+                destination.write(chunk)
+                remaining -= len(chunk)
+
+    def export_csv(self, key, path):
+        """Writes the profile key to path as a csv file with one value per line, streaming the values."""
+        write_csv(self.array(key), path)
+
+
+def write_csv(values, path, fmt="%.9g"):
+    """Writes the values to path, one per line, CHUNK_SIZE values at a time."""
+    with open(path, "w") as f:
+        for start in range(0, len(values), CHUNK_SIZE):
+            np.savetxt(f, np.asarray(values[start : start + CHUNK_SIZE]), fmt=fmt)
+
+
+class ColumnFiles(object):
+    """The column files opened, by absolute path, so that each index is only read once."""
+
+    def __init__(self):
+        self._files = {}
+
+    def get(self, path):
+        path = os.path.abspath(path)
+        if path not in self._files:
+            self._files[path] = ColumnFile(path)
+        return self._files[path]
+
+    def add(self, column_file):
+        """Replaces the opened file at the path of column_file, after it was rewritten. Returns column_file."""
+        self._files[os.path.abspath(column_file.path)] = column_file
+        return column_file
+
+    def clear(self):
+        self._files.clear()
+
+
+column_files = ColumnFiles()
+
+
+def has_column_data(timeseries):
+    return timeseries.data_file is not None and timeseries.data_key is not None
+
+
+def column_array(timeseries, base_path=""):
+    """Returns the memory-mapped values of a Timeseries stored in a column file."""
+    return column_files.get(os.path.join(base_path, timeseries.data_file)).array(
+        timeseries.data_key
+    )
+
+
+def timeseries_values(timeseries, base_path=""):
+    """
+    Returns the values (first column) of timeseries as a numpy array, or None if it has no data.
+    The values of a column file are memory-mapped, the ones of a data_location file are read.
+    """
+    if timeseries.data is not None:
+        return np.asarray(timeseries.data.iloc[:, 0], dtype=float)
+    if has_column_data(timeseries):
+        return column_array(timeseries, base_path)
+    if timeseries.data_location is not None:
+        return read_values(os.path.join(base_path, timeseries.data_location))
+    return None
+
+
+def read_values(path):
+    """Returns the values of a loadshape file: memory-mapped for .sng and .dbl files, the first column of a csv file otherwise."""
+    dtype = BINARY_DTYPES.get(os.path.splitext(path)[1].lower())
+    if dtype is not None:
+        return np.memmap(path, dtype=dtype, mode="r")
+    return np.asarray(pd.read_csv(path, header=None).iloc[:, 0], dtype=float)
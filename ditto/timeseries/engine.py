@@ -0,0 +1,312 @@
+# coding: utf8
+
+"""
+Batch transformations of the timeseries profiles of a model.
+
+The profiles with the same number of points and interval are stacked in 2-D arrays (one row
+per profile, a bounded number of values at a time), so scaling, resampling, clipping to a time window and aggregating thousands of
+profiles is a handful of numpy operations on each stack instead of a pandas round trip per
+Timeseries. The functions work on any stacked array, and TimeseriesEngine applies them to the
+Timeseries of a Store, either yielding the transformed stacks or storing them in a column file
+that the Timeseries are then pointed to, so the writers reuse the data without scaling it again.
+
+Intervals and windows are expressed in the unit of Timeseries.interval. A Timeseries whose
+interval is not set (None or 0) is taken to have an interval of 1, the default of the writers.
+
+**Usage:**
+
+    >>> engine = TimeseriesEngine(model, base_path="./profiles")
+    >>> feeders = engine.aggregate("feeder_name", interval=1.0)
+    >>> engine.apply("hourly.bin", interval=1.0)
+"""
+from __future__ import absolute_import, division, print_function
+from builtins import super, range, zip, round, map
+
+import collections
+import logging
+import math
+import os
+
+import numpy as np
+
+from ditto.models.timeseries import Timeseries
+from ditto.timeseries.backend import (
+    ColumnFile,
+    column_files,
+    has_column_data,
+    timeseries_values,
+)
+
+logger = logging.getLogger(__name__)
+
+# Reductions used when several points are merged into one by resample
+REDUCTIONS = {"mean": np.mean, "sum": np.sum, "max": np.max, "min": np.min}
+
+# Number of values stacked at once by TimeseriesEngine (32 MB of float64)
+CHUNK_POINTS = 1 << 22
+
+# Tolerance used to compare ratios of intervals and window bounds to whole numbers of points
+TOLERANCE = 1e-9
+
+ProfileStack = collections.namedtuple("ProfileStack", ["timeseries", "interval", "values"])
+ProfileStack.__doc__ = """Profiles of the same length and interval: the Timeseries and a 2-D array with one row per Timeseries."""
+
+ProfileGroup = collections.namedtuple("ProfileGroup", ["timeseries", "interval", "length"])
+ProfileGroup.__doc__ = """The Timeseries whose profiles have the same interval and number of points (length)."""
+
+
+def whole_number(value, name):
+    """Returns value rounded to an integer, or raises a ValueError if it is not a whole number."""
+    rounded = int(round(value))
+    if rounded < 1 or abs(value - rounded) > TOLERANCE * max(1, abs(value)):
+        raise ValueError("{} must be a whole number, got {}".format(name, value))
+    return rounded
+
+
+def group_by_length(arrays):
+    """
+    Stacks the 1-D arrays of the same length.
+    Returns a list of (indices of the arrays, 2-D float array with one row per array).
+    """
+    groups = collections.OrderedDict()
+    for index, values in enumerate(arrays):
+        groups.setdefault(len(values), []).append(index)
+    stacks = []
+    for length, indices in groups.items():
+        values = np.empty((len(indices), length), dtype=float)
+        for row, index in enumerate(indices):
+            values[row] = arrays[index]
+        stacks.append((indices, values))
+    return stacks
+
+
+def scale(values, factors):
+    """Multiplies every row of values by its factor (one factor per row, or a single factor)."""
+    factors = np.asarray(factors, dtype=float)
+    if factors.ndim == 1:
+        factors = factors[:, np.newaxis]
+    return values * factors
+
+
+def resample(values, interval, new_interval, how="mean"):
+    """
+    Resamples the rows of values from interval to new_interval, which must be a whole multiple
+    or divisor of interval (e.g. 0.25 to 1 for 15 minute data to hourly data).
+
+    Downsampling merges every group of points with the reduction how (mean, sum, max or min),
+    and the number of points must be a multiple of the group size. Upsampling repeats every
+    point, divided between the new points if how is sum so that the totals are kept.
+    """
+    if how not in REDUCTIONS:
+        raise ValueError("Unknown reduction {}".format(how))
+    if new_interval >= interval:
+        factor = whole_number(new_interval / interval, "new_interval / interval")
+        if factor == 1:
+            return values
+        rows, length = values.shape
+        if length % factor != 0:
+            raise ValueError(
+                "Cannot resample {} points by groups of {}".format(length, factor)
+            )
+        return REDUCTIONS[how](values.reshape(rows, length // factor, factor), axis=2)
+    factor = whole_number(interval / new_interval, "interval / new_interval")
+    repeated = np.repeat(values, factor, axis=1)
+    if how == "sum":
+        repeated /= factor
+    return repeated
+
+
+def clip(values, interval, start=None, stop=None):
+    """Keeps the points of the rows of values whose time (index * interval) is in [start, stop)."""
+    length = values.shape[1]
+    first = 0 if start is None else int(math.ceil(start / interval - TOLERANCE))
+    last = length if stop is None else int(math.ceil(stop / interval - TOLERANCE))
+    return values[:, max(first, 0) : min(max(last, 0), length)]
+
+
+def aggregate(values, labels):
+    """
+    Sums the rows of values with the same label.
+    Returns the list of the labels, in order of first appearance, and a 2-D array with one row per label.
+    """
+    positions = collections.OrderedDict()
+    inverse = np.array([positions.setdefault(label, len(positions)) for label in labels], dtype=int)
+    if len(inverse) == 0:
+        return [], np.zeros((0, values.shape[1]), dtype=values.dtype)
+    order = np.argsort(inverse, kind="stable")
+    starts = np.searchsorted(inverse[order], np.arange(len(positions)))
+    return list(positions), np.add.reduceat(values[order], starts, axis=0)
+
+
+def source_key(timeseries, base_path=""):
+    """Returns a key identifying where the data of timeseries is read from, so that shared data is read once."""
+    if timeseries.data is not None:
+        return ("data", id(timeseries.data))
+    if has_column_data(timeseries):
+        return (
+            "column",
+            os.path.abspath(os.path.join(base_path, timeseries.data_file)),
+            timeseries.data_key,
+        )
+    if timeseries.data_location is not None:
+        return ("file", os.path.abspath(os.path.join(base_path, timeseries.data_location)))
+    return None
+
+
+class TimeseriesEngine(object):
+    """
+    The profiles of the Timeseries of a model, grouped by length and interval.
+
+    Only the lengths of the profiles are read when the engine is created. The transformations
+    stack CHUNK_POINTS values at a time from the data (memory-mapped for the column files), so the
+    memory used does not grow with the number of profiles. Every transformation yields new stacks
+    and leaves the model unchanged, except apply which stores the result and updates the
+    Timeseries. The transformations are run in the order: scale, resample, clip.
+    """
+
+    def __init__(self, model, base_path=""):
+        self.model = model
+        self.base_path = base_path
+        self._values = {}  # source key -> values read from a csv file or an in-memory DataFrame
+        self.groups = self._build_groups()
+
+    def _build_groups(self):
+        groups = collections.OrderedDict()  # (length, interval) -> Timeseries
+        for i in self.model.models:
+            if not isinstance(i, Timeseries):
+                continue
+            if source_key(i, self.base_path) is None:
+                logger.warning("Timeseries {} has no data".format(i.data_label))
+                continue
+            groups.setdefault((self._length(i), i.interval or 1.0), []).append(i)
+        return [
+            ProfileGroup(timeseries, interval, length)
+            for (length, interval), timeseries in groups.items()
+        ]
+
+    def _length(self, timeseries):
+        if timeseries.data is not None:
+            return len(timeseries.data)
+        if has_column_data(timeseries):
+            return column_files.get(
+                os.path.join(self.base_path, timeseries.data_file)
+            ).length(timeseries.data_key)
+        return len(self._source_values(timeseries))
+
+    def _source_values(self, timeseries):
+        """Returns the values of timeseries. The memory-mapped values are not kept, so that their files are not left open."""
+        key = source_key(timeseries, self.base_path)
+        if key in self._values:
+            return self._values[key]
+        values = timeseries_values(timeseries, self.base_path)
+        if not isinstance(values, np.memmap):
+            self._values[key] = values
+        return values
+
+    def __len__(self):
+        return sum(len(group.timeseries) for group in self.groups)
+
+    def stacks(self):
+        """Yields the profiles as ProfileStack, at most CHUNK_POINTS values at a time."""
+        for group in self.groups:
+            rows = max(1, CHUNK_POINTS // max(group.length, 1))
+            for start in range(0, len(group.timeseries), rows):
+                timeseries = group.timeseries[start : start + rows]
+                values = np.empty((len(timeseries), group.length), dtype=float)
+                for row, ts in enumerate(timeseries):
+                    values[row] = self._source_values(ts)
+                yield ProfileStack(timeseries, group.interval, values)
+
+    def transform(self, scale_factors=True, interval=None, start=None, stop=None, how="mean"):
+        """
+        Yields the stacks with every profile multiplied by its scale factor (if scale_factors is True),
+        resampled to interval (if given) with the reduction how, and clipped to [start, stop).
+        """
+        for stack in self.stacks():
+            values = stack.values
+            if scale_factors:
+                values = scale(
+                    values,
+                    [1 if ts.scale_factor is None else ts.scale_factor for ts in stack.timeseries],
+                )
+            new_interval = stack.interval
+            if interval is not None:
+                values = resample(values, stack.interval, interval, how)
+                new_interval = interval
+            if start is not None or stop is not None:
+                values = clip(values, new_interval, start, stop)
+            yield ProfileStack(stack.timeseries, new_interval, values)
+
+    def aggregate(self, by="feeder_name", **kwargs):
+        """
+        Returns the sum of the transformed profiles (see transform) for every value of the attribute by
+        of the Timeseries, such as feeder_name or substation_name, as {value: 1-D array}.
+        The profiles summed together must have the same interval and number of points.
+        """
+        totals = collections.OrderedDict()
+        shapes = {}
+        for stack in self.transform(**kwargs):
+            labels, sums = aggregate(
+                stack.values, [getattr(ts, by) for ts in stack.timeseries]
+            )
+            for label, row in zip(labels, sums):
+                shape = (stack.interval, len(row))
+                if label in totals:
+                    if shapes[label] != shape:
+                        raise ValueError(
+                            "The profiles of {}={} do not have the same interval and number of points".format(
+                                by, label
+                            )
+                        )
+                    totals[label] = totals[label] + row
+                else:
+                    totals[label] = row
+                    shapes[label] = shape
+        return totals
+
+    def apply(self, data_file, dtype="float32", **kwargs):
+        """
+        Writes the transformed profiles (see transform) to the column file data_file (relative to base_path)
+        and points every Timeseries to its profile in it, with the new interval and a scale factor of 1.
+        The data_file of the Timeseries is set to the absolute path of the file, since the writers
+        locate the column files relative to their output_path.
+        data_file can be the column file the Timeseries are read from, since it is only replaced once all the profiles are written.
+        The Timeseries sharing the same data and scale factor share the same profile. Returns the ColumnFile.
+        """
+        path = os.path.abspath(os.path.join(self.base_path, data_file))
+        keys = {}  # (source key, scale factor) -> key in the column file
+        used = set()
+        updates = []
+
+        def profiles():
+            for stack in self.transform(**kwargs):
+                for ts, values in zip(stack.timeseries, stack.values):
+                    source = (source_key(ts, self.base_path), ts.scale_factor)
+                    if source not in keys:
+                        key = label = ts.data_label or "profile"
+                        number = 1
+                        while key in used:
+                            number += 1
+                            key = "{}_{}".format(label, number)
+                        used.add(key)
+                        keys[source] = key
+                        yield key, values
+                    updates.append((ts, keys[source], stack.interval, len(values)))
+
+        column_file = column_files.add(ColumnFile.write(path, profiles(), dtype=dtype))
+
+        groups = collections.OrderedDict()
+        for ts, key, interval, length in updates:
+            ts.data = None
+            ts.data_location = None
+            ts.data_file = path
+            ts.data_key = key
+            ts.interval = interval
+            ts.scale_factor = 1
+            groups.setdefault((length, interval), []).append(ts)
+        self._values = {}
+        self.groups = [
+            ProfileGroup(timeseries, interval, length)
+            for (length, interval), timeseries in groups.items()
+        ]
+        return column_file
@@ -0,0 +1,208 @@
+# coding: utf8
+
+"""
+Metadata of the timeseries files (number of points, interval, range and content hash).
+
+The writers only need the number of points of a loadshape and whether it covers a day or a
+year, which does not require parsing the file: the rows of a csv file are counted from the
+newlines of the raw bytes, and the values of a binary file from its size. The metadata is cached by path and invalidated when the size or modification time
+of the file changes, and can be stored next to the data in a <file>.meta.json file so that
+later processes do not read the data again.
+"""
+from __future__ import absolute_import, division, print_function
+from builtins import super, range, zip, round, map
+
+import hashlib
+import io
+import json
+import logging
+import os
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Number of points of the hourly, minute and second resolution profiles covering exactly one day
+DAILY_POINTS = (24, 24 * 60, 24 * 60 * 60)
+
+METADATA_SUFFIX = ".meta.json"
+
+# Version of the metadata stored in the <file>.meta.json files, increased when the digest changes
+METADATA_VERSION = 2
+
+# Number of rows converted at once when hashing the values of a profile
+DIGEST_CHUNK_ROWS = 1 << 16
+
+# Binary loadshape files (raw values, as read by OpenDSS with sngfile and dblfile)
+BINARY_DTYPES = {".sng": "float32", ".dbl": "float64"}
+
+
+class TimeseriesMetadata(
+    namedtuple(
+        "TimeseriesMetadata", ["npoints", "interval", "minimum", "maximum", "digest"]
+    )
+):
+    """
+    Metadata of a timeseries file. minimum and maximum are the range of the first column,
+    or None if it is not numeric. digest is the values_digest of the values of the file, or
+    the SHA-1 of its bytes if they are not numeric.
+    """
+
+    __slots__ = ()
+
+    @property
+    def format(self):
+        """The OpenDSS loadshape format, "daily" for profiles covering one day and "yearly" otherwise."""
+        return "daily" if self.npoints in DAILY_POINTS else "yearly"
+
+
+def count_rows(data):
+    """Returns the number of rows of the bytes of a csv file without header, ignoring the trailing blank lines."""
+    body = data.rstrip()
+    if not body:
+        return 0
+    return body.count(b"\n") + 1
+
+
+def values_digest(values):
+    """
+    Returns the SHA-1 of the values of a profile (1-D, or 2-D with one column per series)
+    converted to float64, so that a profile hashes the same whether it is in memory, in a csv
+    file or in a binary file. The values are converted by chunks, so a memmap is not loaded at once.
+    """
+    values = np.asarray(values)
+    if values.ndim == 1:
+        values = values.reshape(-1, 1)
+    digest = hashlib.sha1(str(values.shape).encode("utf-8"))
+    for start in range(0, len(values), DIGEST_CHUNK_ROWS):
+        chunk = values[start : start + DIGEST_CHUNK_ROWS]
+        digest.update(np.ascontiguousarray(chunk, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def parse_values(data):
+    """Returns the values of a csv file without header as a 2-D float array (one column per series), or None if they are not numeric."""
+    body = data.strip()
+    if not body:
+        return None
+    try:
+        if b"," in body.split(b"\n", 1)[0]:
+            return np.asarray(pd.read_csv(io.BytesIO(body), header=None), dtype=float)
+        return np.array(body.split(), dtype=float).reshape(-1, 1)
+    except ValueError:
+        return None
+
+
+def column_range(data):
+    """Returns the minimum and maximum of the first column of a csv file without header, or (None, None)."""
+    values = parse_values(data)
+    if values is None or values.size == 0:
+        return None, None
+    return float(values[:, 0].min()), float(values[:, 0].max())
+
+
+def read_metadata(path, interval=None):
+    """Computes the metadata of the csv or binary (.sng, .dbl) file at path, reading it once."""
+    with open(path, "rb") as f:
+        data = f.read()
+    dtype = BINARY_DTYPES.get(os.path.splitext(path)[1].lower())
+    if dtype is not None:
+        values = np.frombuffer(data, dtype=dtype)
+        npoints = len(values)
+    else:
+        npoints = count_rows(data)
+        values = parse_values(data)
+    if values is not None and values.size > 0:
+        column = values if values.ndim == 1 else values[:, 0]
+        minimum, maximum = float(column.min()), float(column.max())
+    else:
+        minimum, maximum = None, None
+    if values is not None:
+        digest = values_digest(values)
+    else:
+        digest = hashlib.sha1(data).hexdigest()
+    return TimeseriesMetadata(
+        npoints=npoints,
+        interval=interval,
+        minimum=minimum,
+        maximum=maximum,
+        digest=digest,
+    )
+
+
+def _file_key(stat):
+    return [stat.st_size, getattr(stat, "st_mtime_ns", int(stat.st_mtime * 1e9))]
+
+
+class MetadataCache(object):
+    """
+    Metadata of the timeseries files, computed once per file.
+
+    An entry is reused as long as the size and modification time of the file do not change.
+    With persist=True, the metadata is also written to <path>.meta.json and read from there
+    by the next processes.
+
+    **Usage:**
+
+        >>> cache = MetadataCache()
+        >>> cache.get("loadshapes/residential.csv", interval=1).npoints
+        8760
+    """
+
+    def __init__(self):
+        self._entries = {}  # absolute path -> (size and modification time, metadata)
+
+    def get(self, path, interval=None, persist=False):
+        """
+        Returns the metadata of the file at path. interval is recorded in the metadata, and
+        taken from the stored metadata if None.
+        """
+        path = os.path.abspath(path)
+        key = _file_key(os.stat(path))
+        entry = self._entries.get(path)
+        metadata = entry[1] if entry is not None and entry[0] == key else None
+
+        if metadata is None:
+            metadata = self._load(path, key)
+            if metadata is None:
+                metadata = read_metadata(path, interval)
+                if persist:
+                    self._save(path, key, metadata)
+            self._entries[path] = (key, metadata)
+
+        if interval is not None and metadata.interval != interval:
+            metadata = metadata._replace(interval=interval)
+            self._entries[path] = (key, metadata)
+        return metadata
+
+    def clear(self):
+        self._entries.clear()
+
+    @staticmethod
+    def _load(path, key):
+        """Returns the metadata stored next to the file if it is up to date, None otherwise."""
+        try:
+            with open(path + METADATA_SUFFIX, "r") as f:
+                stored = json.load(f)
+            if stored.pop("file") != key or stored.pop("version", None) != METADATA_VERSION:
+                return None
+            return TimeseriesMetadata(**stored)
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            return None
+
+    @staticmethod
+    def _save(path, key, metadata):
+        stored = dict(metadata._asdict())
+        stored["file"] = key
+        stored["version"] = METADATA_VERSION
+        try:
+            with open(path + METADATA_SUFFIX, "w") as f:
+                json.dump(stored, f)
+        except (IOError, OSError):
+            logger.warning("Could not store the metadata of {path}".format(path=path))
+
+
+# Shared by the writers, so that a file is only read once per process
+metadata_cache = MetadataCache()
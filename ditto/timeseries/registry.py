@@ -0,0 +1,147 @@
+# coding: utf8
+
+"""
+Content addressed registry of the timeseries of a model.
+
+Readers attach one Timeseries to every load, even when thousands of loads share the same
+profile. The registry identifies the profiles by a hash of their content (the values of the
+in-memory data or of the column file, or the bytes of the file on disk) together with their scale factor and
+interval, so that identical profiles share a single DataFrame and the model can be reduced to
+one Timeseries per profile, which the writers then emit once.
+"""
+from __future__ import absolute_import, division, print_function
+from builtins import super, range, zip, round, map
+
+import hashlib
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+from ditto.models.timeseries import Timeseries
+from ditto.timeseries.backend import column_array, has_column_data
+from ditto.timeseries.metadata import metadata_cache, values_digest
+
+logger = logging.getLogger(__name__)
+
+
+def profile_digest(timeseries, base_path=""):
+    """
+    Returns the hash of the values of timeseries (see values_digest): the in-memory data if it
+    is loaded, its profile if it is stored in a column file, the file at data_location
+    (relative to base_path) otherwise, so that the same values hash the same in all three.
+    Returns None if the timeseries has no data.
+    """
+    if timeseries.data is not None:
+        data = timeseries.data
+        try:
+            return values_digest(np.asarray(data, dtype=float))
+        except (TypeError, ValueError):
+            # Non numeric data, hashed as it is
+            digest = hashlib.sha1(str(data.shape).encode("utf-8"))
+            digest.update(pd.util.hash_pandas_object(data, index=False).values.tobytes())
+            return digest.hexdigest()
+    if has_column_data(timeseries):
+        return values_digest(column_array(timeseries, base_path))
+    if timeseries.data_location is not None:
+        path = os.path.join(base_path, timeseries.data_location)
+        if os.path.isfile(path):
+            return metadata_cache.get(path).digest
+    return None
+
+
+def profile_key(digest, timeseries):
+    """Returns the key identifying the profile of timeseries with the given digest: (digest, scale factor, interval).
+    A scale factor of None is the same as 1, and an interval of None the same as 0 (not set)."""
+    scale_factor = 1 if timeseries.scale_factor is None else timeseries.scale_factor
+    interval = timeseries.interval or 0
+    return (digest, float(scale_factor), float(interval))
+
+
+class TimeseriesRegistry(object):
+    """
+    Unique profiles of a model, keyed by (digest, scale factor, interval).
+
+    **Usage:**
+
+        >>> registry = TimeseriesRegistry(base_path="./profiles")
+        >>> canonical = registry.add(timeseries)
+        >>> registry.deduplicate(model)
+    """
+
+    def __init__(self, base_path=""):
+        self.base_path = base_path
+        self._profiles = {}  # key -> first Timeseries registered with this profile
+
+    def key(self, timeseries):
+        """Returns the key of the profile of timeseries, or None if it has no data."""
+        digest = profile_digest(timeseries, self.base_path)
+        if digest is None:
+            return None
+        return profile_key(digest, timeseries)
+
+    def add(self, timeseries):
+        """
+        Registers timeseries and returns the first Timeseries registered with the same profile.
+        The in-memory data of timeseries is replaced by the one of that Timeseries, so identical
+        profiles share a single DataFrame.
+        """
+        return self._add(self.key(timeseries), timeseries)
+
+    def _add(self, key, timeseries):
+        if key is None:
+            return timeseries
+        canonical = self._profiles.setdefault(key, timeseries)
+        if canonical is not timeseries and timeseries.data is not None:
+            timeseries.data = canonical.data
+        return canonical
+
+    def __len__(self):
+        return len(self._profiles)
+
+    def __contains__(self, timeseries):
+        return self.key(timeseries) in self._profiles
+
+    def deduplicate(self, model):
+        """
+        Keeps one Timeseries per profile, feeder and substation in model.
+
+        The timeseries lists of the loads and photovoltaics reference the Timeseries kept, and
+        the duplicates are removed from the model (and from its names). The feeder and substation are part of the key
+        since the writers output the loadshapes of every feeder separately.
+        Returns the number of Timeseries removed.
+        """
+        kept = {}
+        replacement = {}
+        for timeseries in model.models:
+            if not isinstance(timeseries, Timeseries):
+                continue
+            key = self.key(timeseries)
+            if key is None:
+                continue
+            self._add(key, timeseries)
+            key += (timeseries.feeder_name, timeseries.substation_name)
+            canonical = kept.setdefault(key, timeseries)
+            if canonical is not timeseries:
+                replacement[timeseries] = canonical
+
+        if not replacement:
+            return 0
+
+        for obj in model.models:
+            timeseries_list = getattr(obj, "timeseries", None)
+            if isinstance(obj, Timeseries) or not timeseries_list:
+                continue
+            if any(t in replacement for t in timeseries_list):
+                obj.timeseries = [replacement.get(t, t) for t in timeseries_list]
+
+        model.model_store[:] = [m for m in model.model_store if m not in replacement]
+        # The names of the duplicates removed must not resolve anymore
+        model.set_names()
+        logger.debug(
+            "Removed {n} duplicate timeseries, {k} profiles left".format(
+                n=len(replacement), k=len(self)
+            )
+        )
+        return len(replacement)
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+
+"""
+Containers used by the CYME writer to collect the rows of the output files.
+
+The writer produces the rows of every CYME [SECTION] while it loops over the model,
+but the sections have to be written in a fixed order at the end. SectionSpool streams
+the rows to a temporary file as they are produced so that memory does not grow with the
+size of the network, and Registry gives constant time membership tests on the lists of
+IDs that were checked with linear scans.
+"""
+from __future__ import absolute_import, division, print_function
+from builtins import super, range, zip, round, map
+
+import shutil
+import tempfile
+
+# Rows are kept in memory up to this size (in characters), then spooled to disk
+SPOOL_MAX_SIZE = 1 << 18
+
+
+class Registry(object):
+    """
+    List of rows in insertion order, with constant time membership tests.
+
+    Supports the list operations used by the writer: append, in, iteration, len and indexing.
+    Like a list, append keeps duplicates.
+    """
+
+    def __init__(self, rows=()):
+        self._rows = []
+        self._set = set()
+        for row in rows:
+            self.append(row)
+
+    def append(self, row):
+        self._rows.append(row)
+        self._set.add(row)
+
+    def add(self, row):
+        """Appends row if it is not already in the registry. Returns True if it was added."""
+        if row in self._set:
+            return False
+        self.append(row)
+        return True
+
+    def __contains__(self, row):
+        return row in self._set
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, index):
+        return self._rows[index]
+
+    def __repr__(self):
+        return "Registry({})".format(self._rows)
+
+
+class SectionSpool(object):
+    """
+    Rows of a CYME section, written through a buffered temporary file as they are produced.
+
+    The rows stay in memory until they exceed max_size, and are then moved to disk, so a
+    large section costs a bounded amount of memory and a small one does not use a file.
+
+    **Usage:**
+
+        >>> spool = SectionSpool()
+        >>> spool.append("650_632,650,0,632,0,ABC")
+        >>> spool.write_to(f)
+    """
+
+    def __init__(self, rows=(), max_size=SPOOL_MAX_SIZE):
+        self._file = tempfile.SpooledTemporaryFile(max_size=max_size, mode="w+")
+        self._count = 0
+        self._reading = False  # True when an iteration moved the position away from the end
+        for row in rows:
+            self.append(row)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def append(self, row):
+        if self._reading:
+            # An iteration that was not run to its end (break, in) left the position inside the rows
+            self._file.seek(0, 2)
+            self._reading = False
+        self._file.write(row + "\n")
+        self._count += 1
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        """Yields the rows, without their line ending. Rows appended during the iteration end it."""
+        self._file.seek(0)
+        self._reading = True
+        for line in self._file:
+            if not self._reading:
+                return
+            yield line[:-1]
+        self._file.seek(0, 2)
+        self._reading = False
+
+    def write_to(self, f):
+        """Copies all the rows, one per line, to the file object f."""
+        self._file.seek(0)
+        self._reading = True
+        shutil.copyfileobj(self._file, f)
+        self._file.seek(0, 2)
+        self._reading = False
+
+    def close(self):
+        self._file.close()
+
+
+def canonical_key(value):
+    """
+    Returns a hashable key such that two values compare equal if and only if their keys are equal.
+    Dictionaries become sorted tuples of their items and lists become tuples.
+    """
+    if isinstance(value, dict):
+        return (dict, tuple(sorted((k, canonical_key(v)) for k, v in value.items())))
+    if isinstance(value, (list, tuple)):
+        return (list, tuple(canonical_key(v) for v in value))
+    hash(value)
+    return value
+
+
+class CodeBook(dict):
+    """
+    Dictionary of equipment codes (ID -> equipment data) indexed by value.
+
+    The data of every ID is interned: its canonical key is mapped to an integer, and the IDs
+    holding each integer are kept, so keys_of finds the IDs of identical equipment with one
+    lookup instead of comparing the new data to every code.
+
+    **Usage:**
+
+        >>> codes = CodeBook()
+        >>> codes["line_1"] = {"R1": 0.3, "X1": 0.6}
+        >>> codes.keys_of({"R1": 0.3, "X1": 0.6})
+        ['line_1']
+    """
+
+    def __init__(self):
+        super(CodeBook, self).__init__()
+        self._numbers = {}  # canonical key -> interned number
+        self._key_numbers = {}  # ID -> interned number of its data
+        self._keys = {}  # interned number -> IDs having this data
+        self._positions = {}  # ID -> insertion position, to return the IDs in dictionary order
+        self._inserted = 0
+        self._unhashable = set()  # IDs whose data could not be interned
+
+    def _number(self, value):
+        try:
+            key = canonical_key(value)
+        except TypeError:
+            return None
+        return self._numbers.setdefault(key, len(self._numbers))
+
+    def __setitem__(self, key, value):
+        if key in self:
+            self._discard(key)
+        else:
+            self._positions[key] = self._inserted
+            self._inserted += 1
+        super(CodeBook, self).__setitem__(key, value)
+        number = self._number(value)
+        if number is None:
+            self._unhashable.add(key)
+        else:
+            self._key_numbers[key] = number
+            self._keys.setdefault(number, []).append(key)
+
+    def __delitem__(self, key):
+        self._discard(key)
+        del self._positions[key]
+        super(CodeBook, self).__delitem__(key)
+
+    def _discard(self, key):
+        if key in self._unhashable:
+            self._unhashable.discard(key)
+        else:
+            self._keys[self._key_numbers.pop(key)].remove(key)
+
+    def keys_of(self, value):
+        """Returns the IDs whose data is equal to value, in dictionary order."""
+        number = self._number(value)
+        if number is None:
+            keys = [k for k, v in self.items() if v == value]
+        else:
+            keys = list(self._keys.get(number, ()))
+            keys.extend(k for k in self._unhashable if self[k] == value)
+        if len(keys) > 1:
+            keys.sort(key=self._positions.__getitem__)
+        return keys
@@ -6,6 +6,10 @@ import os
 import re
 import math
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 
 # DiTTo imports
 from ditto.models.node import Node
@@ -21,6 +25,76 @@ from ..abstract_writer import AbstractWriter
 
 logger = logging.getLogger(__name__)
 
+# Size of the write buffer of the GLM file
+GLM_BUFFER_SIZE = 1 << 20
+
+PHASE_MAP = {"A": 1, "B": 2, "C": 3, "1": 1, "2": 2}
+
+# Include files written when the output is split, with the function writing each of them.
+# The configurations are computed over the whole model, before the objects referencing them.
+CONFIGURATION_FILES = [
+    ("transformer_configurations.glm", "write_transformer_configurations"),
+    ("regulator_configurations.glm", "write_regulator_configurations"),
+    ("line_configurations.glm", "write_line_configurations"),
+]
+OBJECT_FILES = [
+    ("nodes.glm", "write_nodes"),
+    ("capacitors.glm", "write_capacitors"),
+    ("loads.glm", "write_loads"),
+    ("transformers.glm", "write_transformers"),
+    ("regulators.glm", "write_regulators"),
+    ("lines.glm", "write_lines"),
+]
+
+# Writer used by the worker processes (inherited when they are forked)
+_WORKER_WRITER = None
+
+
+def _write_file_worker(task):
+    """Writes the include file of the given task of the writer. Used by the worker processes."""
+    return _WORKER_WRITER.write_file(*_WORKER_WRITER.file_tasks[task])
+
+# A minus sign which is not part of an exponent separates the real and imaginary parts
+SIGN_PATTERN = re.compile("[^e]-")
+
+
+def format_impedance(value):
+    """Formats a complex impedance as GridLAB-D expects it (i.e. 0+1j for a purely imaginary value)."""
+    impedance = str(value).strip("()")
+    if "+" not in impedance and SIGN_PATTERN.search(impedance) is None:
+        impedance = "0+" + impedance
+    return impedance
+
+
+def phase_indices(phases, size):
+    """
+    Returns the numbers of the given sorted phases (without duplicates) and the row of the
+    impedance matrix holding each of them. 3x3 matrices are indexed by phase, smaller
+    (secondary) matrices follow the order of the phases.
+    """
+    numbers = []
+    index = []
+    for cnt, phase in enumerate(phases):
+        number = PHASE_MAP[phase]
+        row = number - 1 if size >= 3 else cnt
+        if number in numbers:
+            index[numbers.index(number)] = row
+        else:
+            numbers.append(number)
+            index.append(row)
+    return numbers, index
+
+
+class FeederModel(object):
+    """
+    The objects of one feeder, exposed through models like a Store.
+    store is the whole model, used to find the transformers connected to the regulators.
+    """
+
+    def __init__(self, store, models):
+        self.store = store
+        self.models = models
+
 
 class Writer(AbstractWriter):
 
@@ -37,6 +111,15 @@ class Writer(AbstractWriter):
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        # The configurations are specific to the model written by this writer
+        self.line_configurations = {}
+        self.line_configurations_name = {}
+        self.transformer_configurations = {}
+        self.transformer_configurations_name = {}
+        self.regulator_configurations = {}
+        self.regulator_configurations_name = {}
+        self.regulator_phases = {}
+        self.regulator_seen = set()
 
     def write(self, model, **kwargs):
         """General writing function responsible for calling the sub-functions.
@@ -47,6 +130,14 @@ class Writer(AbstractWriter):
         :type verbose: bool
         :param write_taps: Write the transformer taps if they are provided. (This can cause some problems). Optional. Default=False
         :type write_taps: bool
+        :param impedance_decimals: Round the line impedances to this number of decimals when grouping lines into configurations. Optional. Default=None (exact)
+        :type impedance_decimals: int
+        :param separate_files: Write every class of objects in its own file (nodes.glm, lines.glm...), included by Model.glm. Optional. Default=False
+        :type separate_files: bool
+        :param separate_feeders: Write the objects of every feeder in their own subfolder. Implies separate_files. Optional. Default=False
+        :type separate_feeders: bool
+        :param max_workers: Number of processes writing the separate files concurrently. Optional. Default=1
+        :type max_workers: int
         :returns: 1 for success, -1 for failure
         :rtype: int
         """
@@ -62,7 +153,27 @@ class Writer(AbstractWriter):
         else:
             self.write_wires = False
 
-        with open(os.path.join(self.output_path, "Model.glm"), "w") as fp:
+        # Round the impedances to this number of decimals before comparing line configurations.
+        # By default, configurations are identical only if their impedances are exactly equal
+        if "impedance_decimals" in kwargs and isinstance(
+            kwargs["impedance_decimals"], int
+        ):
+            self.impedance_decimals = kwargs["impedance_decimals"]
+        else:
+            self.impedance_decimals = None
+
+        self.separate_feeders = kwargs.get("separate_feeders", False) is True
+        self.separate_files = (
+            kwargs.get("separate_files", False) is True or self.separate_feeders
+        )
+        if self.separate_files:
+            return self.write_separate_files(
+                model, max_workers=kwargs.get("max_workers", 1)
+            )
+
+        with open(
+            os.path.join(self.output_path, "Model.glm"), "w", buffering=GLM_BUFFER_SIZE
+        ) as fp:
 
             # Write the modules
             logger.info("Writing the Module...")
@@ -146,6 +257,108 @@ class Writer(AbstractWriter):
             if self.verbose:
                 logger.debug("Succesful!")
 
+    def write_separate_files(self, model, max_workers=1):
+        """
+        Writes the configurations and every class of objects in their own include file, and
+        Model.glm including them. With separate_feeders, the objects of every feeder are written in
+        a subfolder named after the feeder (DEFAULT for the objects without a feeder), like the OpenDSS writer.
+
+        The configurations are written first since they name the configurations used by the objects.
+        The object files are then independent, and are written by max_workers forked processes.
+        Empty files and folders are not kept.
+
+        :param model: DiTTo model
+        :type model: DiTTo model
+        :param max_workers: Number of processes writing the object files. Optional. Default=1
+        :type max_workers: int
+        :returns: 1 for success, -1 for failure
+        :rtype: int
+        """
+        includes = []
+        for filename, method in CONFIGURATION_FILES:
+            logger.info("Writing {f}...".format(f=filename))
+            if self.write_file(os.path.join(self.output_path, filename), method, model):
+                includes.append(filename)
+
+        # Partition the objects by feeder, keeping the model order
+        if self.separate_feeders:
+            feeders = {}
+            for obj in model.models:
+                if hasattr(obj, "feeder_name") and obj.feeder_name:
+                    feeder_name = obj.feeder_name
+                else:
+                    feeder_name = "DEFAULT"
+                feeders.setdefault(feeder_name, []).append(obj)
+            groups = [
+                (feeder_name, FeederModel(model, models))
+                for feeder_name, models in feeders.items()
+            ]
+        else:
+            groups = [("", model)]
+
+        self.file_tasks = []
+        for folder, group in groups:
+            output_folder = os.path.join(self.output_path, folder)
+            if not os.path.exists(output_folder):
+                os.makedirs(output_folder)
+            for filename, method in OBJECT_FILES:
+                self.file_tasks.append(
+                    (os.path.join(output_folder, filename), method, group)
+                )
+
+        if max_workers > 1 and "fork" not in multiprocessing.get_all_start_methods():
+            logger.warning(
+                "Writing the files in parallel requires the fork start method. Running serially."
+            )
+            max_workers = 1
+
+        if max_workers > 1 and len(self.file_tasks) > 1:
+            global _WORKER_WRITER
+            _WORKER_WRITER = self
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=max_workers,
+                    mp_context=multiprocessing.get_context("fork"),
+                ) as executor:
+                    written = list(
+                        executor.map(_write_file_worker, range(len(self.file_tasks)))
+                    )
+            finally:
+                _WORKER_WRITER = None
+        else:
+            written = [self.write_file(*task) for task in self.file_tasks]
+
+        for (path, _, _), is_written in zip(self.file_tasks, written):
+            if is_written:
+                includes.append(
+                    os.path.relpath(path, self.output_path).replace(os.sep, "/")
+                )
+        self.file_tasks = []
+        for folder, _ in groups:
+            output_folder = os.path.join(self.output_path, folder)
+            if folder and not os.listdir(output_folder):
+                os.rmdir(output_folder)
+
+        with open(os.path.join(self.output_path, "Model.glm"), "w") as fp:
+            fp.write(
+                "module powerflow{\n    solver_method NR;\n    NR_iteration_limit 50;\n};\n\n"
+            )
+            for include in includes:
+                fp.write('#include "{f}"\n'.format(f=include))
+        return 1
+
+    def write_file(self, path, method, model):
+        """
+        Writes the objects of model with the given write function in the file path.
+        Returns True if something was written. Empty files are removed.
+        """
+        with open(path, "w", buffering=GLM_BUFFER_SIZE) as fp:
+            getattr(self, method)(model, fp)
+            is_written = fp.tell() > 0
+        if not is_written:
+            os.remove(path)
+        return is_written
+
     def write_nodes(self, model, fp, sourcebus="sourcebus"):
         """ Write the Nodes into the existing file.
         Positions not written into gridlab-d
@@ -474,16 +687,16 @@ class Writer(AbstractWriter):
                 configuration_count = configuration_count + 1
 
     def write_transformers(self, model, fp):
-        for i in model.models:
+        models = model.models
+        # Transformers which have the name of a regulator are written as regulators
+        regulator_names = set(
+            j.name
+            for j in getattr(model, "store", model).models
+            if isinstance(j, Regulator)
+        )
+        for i in models:
             if isinstance(i, PowerTransformer):
-                is_reg = False
-                for j in model.models:
-                    # TODO: More efficient way to do this - maybe an attribute in the transformer which gets set when it's created
-                    if isinstance(j, Regulator) and j.name == i.name:
-                        is_reg = True
-                        break
-
-                if is_reg:
+                if i.name in regulator_names:
                     continue
 
                 fp.write("object transformer{\n")
@@ -525,9 +738,22 @@ class Writer(AbstractWriter):
 
                 fp.write("};\n\n")
 
+    @staticmethod
+    def _transformers_by_name(models):
+        """Returns a dictionary mapping the names of the transformers to the list of transformers having this name."""
+        transformers = {}
+        for j in models:
+            if isinstance(j, PowerTransformer):
+                transformers.setdefault(j.name, []).append(j)
+        return transformers
+
     def write_regulator_configurations(self, model, fp):
         configuration_count = 1
-        for i in model.models:
+        models = model.models
+        transformers = self._transformers_by_name(
+            getattr(model, "store", model).models
+        )
+        for i in models:
             if isinstance(i, Regulator):
                 dic = {}
                 if hasattr(i, "delay") and i.delay is not None:
@@ -568,47 +794,40 @@ class Writer(AbstractWriter):
                     hasattr(i, "connected_transformer")
                     and i.connected_transformer is not None
                 ):
-                    for j in model.models:
-                        if (
-                            isinstance(j, PowerTransformer)
-                            and j.name == i.connected_transformer
-                        ):
-                            if hasattr(j, "windings") and j.windings is not None:
-                                for w in j.windings:
-                                    if (
-                                        hasattr(w, "phase_windings")
-                                        and w.phase_windings is not None
-                                    ):
-                                        for pw in w.phase_windings:
+                    for j in transformers.get(i.connected_transformer, []):
+                        if hasattr(j, "windings") and j.windings is not None:
+                            for w in j.windings:
+                                if (
+                                    hasattr(w, "phase_windings")
+                                    and w.phase_windings is not None
+                                ):
+                                    for pw in w.phase_windings:
+                                        if hasattr(pw, "phase") and pw.phase is not None:
+                                            if hasattr(pw, "tap_position"):
+                                                self.regulator_phases[dic_set][
+                                                    "tap_pos_{phase}".format(
+                                                        phase=pw.phase
+                                                    )
+                                                ] = pw.tap_position
+
+                                            if (
+                                                hasattr(pw, "compensator_r")
+                                                and pw.compensator_r is not None
+                                            ):
+                                                self.regulator_phases[dic_set][
+                                                    "compensator_r_setting_{phase}".format(
+                                                        phase=pw.phase
+                                                    )
+                                                ] = pw.compensator_r
                                             if (
-                                                hasattr(pw, "phase")
-                                                and pw.phase is not None
+                                                hasattr(pw, "compensator_x")
+                                                and pw.compensator_x is not None
                                             ):
-                                                if hasattr(pw, "tap_position"):
-                                                    self.regulator_phases[dic_set][
-                                                        "tap_pos_{phase}".format(
-                                                            phase=pw.phase
-                                                        )
-                                                    ] = pw.tap_position
-
-                                                if (
-                                                    hasattr(pw, "compensator_r")
-                                                    and pw.compensator_r is not None
-                                                ):
-                                                    self.regulator_phases[dic_set][
-                                                        "compensator_r_setting_{phase}".format(
-                                                            phase=pw.phase
-                                                        )
-                                                    ] = pw.compensator_r
-                                                if (
-                                                    hasattr(pw, "compensator_x")
-                                                    and pw.compensator_x is not None
-                                                ):
-                                                    self.regulator_phases[dic_set][
-                                                        "compensator_r_setting_{phase}".format(
-                                                            phase=pw.phase
-                                                        )
-                                                    ] = pw.compensator_r
+                                                self.regulator_phases[dic_set][
+                                                    "compensator_r_setting_{phase}".format(
+                                                        phase=pw.phase
+                                                    )
+                                                ] = pw.compensator_r
 
                 elif hasattr(i, "windings") and i.windings is not None:
                     for w in i.windings:
@@ -671,7 +890,11 @@ class Writer(AbstractWriter):
             fp.write("};\n\n")
 
     def write_regulators(self, model, fp):
-        for i in model.models:
+        models = model.models
+        transformers = self._transformers_by_name(
+            getattr(model, "store", model).models
+        )
+        for i in models:
             if isinstance(i, Regulator):
                 if (
                     hasattr(i, "from_element")
@@ -695,23 +918,16 @@ class Writer(AbstractWriter):
                     hasattr(i, "connected_transformer")
                     and i.connected_transformer is not None
                 ):
-                    for j in model.models:
-                        if (
-                            isinstance(j, PowerTransformer)
-                            and j.name == i.connected_transformer
-                        ):
-                            if hasattr(j, "windings") and j.windings is not None:
-                                for w in j.windings:
-                                    if (
-                                        hasattr(w, "phase_windings")
-                                        and w.phase_windings is not None
-                                    ):
-                                        for pw in w.phase_windings:
-                                            if (
-                                                hasattr(pw, "phase")
-                                                and pw.phase is not None
-                                            ):
-                                                phases = phases + pw.phase
+                    for j in transformers.get(i.connected_transformer, []):
+                        if hasattr(j, "windings") and j.windings is not None:
+                            for w in j.windings:
+                                if (
+                                    hasattr(w, "phase_windings")
+                                    and w.phase_windings is not None
+                                ):
+                                    for pw in w.phase_windings:
+                                        if hasattr(pw, "phase") and pw.phase is not None:
+                                            phases = phases + pw.phase
 
                 elif hasattr(i, "windings") and i.windings is not None:
                     for w in i.windings:
@@ -750,8 +966,6 @@ class Writer(AbstractWriter):
                         hasattr(i, "is_fuse") and i.is_fuse == 1
                     ):
                         continue
-                    dic = {}
-                    phase_map = {"A": 1, "B": 2, "C": 3, "1": 1, "2": 2}
                     phases = []
                     if hasattr(i, "wires") and i.wires is not None:
                         for w in i.wires:
@@ -762,14 +976,13 @@ class Writer(AbstractWriter):
                             ):
                                 phases.append(w.phase)
                     phases.sort()
+                    lc = None
+                    key = ((), b"")
                     if (
                         hasattr(i, "impedance_matrix")
                         and i.impedance_matrix is not None
                     ):
                         lc = i.impedance_matrix
-                        # logger.debug(i.name,i.from_element, i.to_element)
-                        # logger.debug(phases)
-                        # logger.debug(lc)
                         if len(phases) != len(lc):
                             logger.debug(
                                 "Warning - impedance matrix size different from number of phases for line {ln}".format(
@@ -779,53 +992,43 @@ class Writer(AbstractWriter):
                             logger.debug(i.name, i.from_element, i.to_element)
                             logger.debug(phases)
                             logger.debug(lc)
-                        for j_cnt in range(
-                            len(phases)
-                        ):  # For 3x3 matrices or 2x2 secondary matrices
-                            for k_cnt in range(len(phases)):
-                                j_val = phases[j_cnt]
-                                k_val = phases[k_cnt]
-                                j = phase_map[j_val] - 1
-                                k = phase_map[k_val] - 1
-                                if len(lc) < 3:
-                                    j = j_cnt
-                                    k = k_cnt
-                                impedance = str(lc[j][k]).strip("()")
-                                pattern = re.compile("[^e]-")
-
-                                if (
-                                    "+" not in impedance
-                                    and not len(pattern.findall(impedance)) > 0
-                                ):
-                                    impedance = "0+" + impedance
-                                dic[
-                                    "z{one}{two}".format(
-                                        one=phase_map[j_val], two=phase_map[k_val]
-                                    )
-                                ] = impedance
-
-                    dic_set = set()
-                    for a, b in dic.items():
-                        dic_set.add((a, b))
-                    dic_set = frozenset(dic_set)
-
-                    if dic_set in self.line_configurations:
+                        # The configuration is identified by its phases and the bytes of its impedance matrix,
+                        # so the impedances are only formatted once per configuration
+                        numbers, index = phase_indices(phases, len(lc))
+                        if numbers:
+                            matrix = np.asarray(lc, dtype=np.complex128)[
+                                np.ix_(index, index)
+                            ]
+                            if self.impedance_decimals is not None:
+                                matrix = matrix.round(self.impedance_decimals)
+                            key = (tuple(numbers), matrix.tobytes())
+
+                    if key in self.line_configurations:
                         self.line_configurations_name[
                             i.name
-                        ] = self.line_configurations[dic_set]
+                        ] = self.line_configurations[key]
                         continue
 
-                    self.line_configurations[dic_set] = "line_config_{num}".format(
-                        num=configuration_count
-                    )
-                    dic["name"] = "line_config_{num}".format(num=configuration_count)
-                    self.line_configurations_name[i.name] = "line_config_{num}".format(
-                        num=configuration_count
-                    )
-                    fp.write("object line_configuration {\n")
-                    for j in dic:
-                        fp.write("    {key} {value};\n".format(key=j, value=dic[j]))
-                    fp.write("};\n\n")
+                    name = "line_config_{num}".format(num=configuration_count)
+                    self.line_configurations[key] = name
+                    self.line_configurations_name[i.name] = name
+
+                    lines = ["object line_configuration {\n"]
+                    if lc is not None and numbers:
+                        for a, one in enumerate(numbers):
+                            for b, two in enumerate(numbers):
+                                if self.impedance_decimals is None:
+                                    value = lc[index[a]][index[b]]
+                                else:
+                                    value = complex(matrix[a, b])
+                                lines.append(
+                                    "    z{one}{two} {value};\n".format(
+                                        one=one, two=two, value=format_impedance(value)
+                                    )
+                                )
+                    lines.append("    name {name};\n".format(name=name))
+                    lines.append("};\n\n")
+                    fp.write("".join(lines))
                     configuration_count = configuration_count + 1
 
     def write_lines(self, model, fp):
@@ -30,6 +30,23 @@ from ditto.writers.abstract_writer import AbstractWriter
 #
 logger = logging.getLogger(__name__)
 
+
+def concatenate(arrays):
+    """Returns the values of the arrays in one flat array, and the size of every array."""
+    sizes = [a.size for a in arrays]
+    if not arrays:
+        return np.zeros(0), sizes
+    return np.concatenate([a.ravel() for a in arrays]), sizes
+
+
+def split(values, arrays, sizes):
+    """Splits a flat array of values, as returned by concatenate, into arrays of the shapes of arrays."""
+    return [
+        v.reshape(a.shape)
+        for v, a in zip(np.split(values, np.cumsum(sizes)[:-1]), arrays)
+    ]
+
+
 class Writer(AbstractWriter):
     network = {}
     
@@ -59,6 +76,9 @@ class Writer(AbstractWriter):
 
         self._baseKV_ = set()
 
+        # Index of every bus, by name. Filled by write_buses
+        self.bus_index = {}
+
         self.baseMVA = kwargs['baseMVA']
         self.basekV = kwargs['basekV']
 
@@ -115,212 +135,21 @@ class Writer(AbstractWriter):
         index = 0
         m_info = model.models
         m_idx = 0
-        l_count = 0
         xfmr_count = 0
         baseMVA = self.baseMVA
+        # The lines are converted to per unit all together, after the loop
+        lines = []
                 
         for i in model.models:
             
-#            if index == 15:
-#                print(index)
-                    
             if isinstance(i, Line) or isinstance(i, PowerTransformer):
         
                 index += 1
-#                if index == 16:
-#                    print(index)
                                
                 if isinstance(i, Line):
-                    l_count += 1                   
-                    nominal_voltage = i.nominal_voltage
-                    basekV = nominal_voltage/1000.0
-                    baseZ = basekV**2/baseMVA
-                    baseY = 1/baseZ
-                    baseA = baseMVA/(np.sqrt(3)*basekV)*1000.0
-                    bus_data = self.network['bus']
-                    name = i.name
-                    
-                    f_bus0 = i.from_element
-                    t_bus0 = i.to_element
-                    ## Finding the Indexes of the buses to which the branch is connected
-                    for j in bus_data:
-                        if bus_data[j]["name"] == f_bus0:
-                            f_bus = bus_data[j]["index"]
-                            break
-                    
-                    for j in bus_data:
-                        if bus_data[j]["name"] == t_bus0:
-                            t_bus = bus_data[j]["index"]
-                            break
-                    
-                    length = i.length
-                    
-                    # Default assumed values, near zero conductance = very high impedance
-                    g_fr = [0.0, 0.0, 0.0]
-                    g_to = [0.0, 0.0, 0.0]
-                    b_fr = [0.0, 0.0, 0.0]
-                    b_to = [0.0, 0.0, 0.0]
-                    br_r = np.array([0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]).reshape((3, 3))
-                    br_x = np.array([0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]).reshape((3, 3))
-                    I_rating = [0.0, 0.0, 0.0]
-
-                    if hasattr(i, "wires") and i.wires is not None:
-                        nphases = len(i.wires)
-                    
-#                    if name == '684652':
-#                        print(name)
-                        
-                    # For 3-ph lines
-                    if nphases == 3:
-                        
-                        # total branch impedance in p.u.
-                        br_zmatrix = np.array(i.impedance_matrix)*length / baseZ
-                        br_cmatrix = np.array(i.capacitance_matrix)*length
-                        br_cdiag = np.diagonal(br_cmatrix)
-    #                    br_z = np.mean(np.diagonal(br_zmatrix))  # if only positive seq. is considered              
-                        br_r = np.real(br_zmatrix)
-                        br_x = np.imag(br_zmatrix)
-    #                    br_c = np.real(np.mean(np.diagonal(br_cmatrix)))
-        
-#                        if index == 15:
-#                            print("a")
-                        
-                        br_b = 2*np.pi*60*np.abs(br_cdiag)*(10**-9) / baseY
-                        br_b_half = br_b[0]/2.0
-                        
-                        b_fr = [br_b_half, br_b_half, br_b_half]
-                        b_to = [br_b_half, br_b_half, br_b_half]
-                    
-                        for wire in i.wires:
-                            if (
-                                hasattr(wire, "phase")
-                                and wire.phase is not None
-                                and wire.phase not in ["N", "N1", "N2"]
-                            ):
-                                ph = wire.phase
-                                    
-                                if ph.lower() == 'a':
-                                    I_rating[0] = wire.ampacity / baseA
-                                elif ph.lower() == 'b':
-                                    I_rating[1] = wire.ampacity / baseA
-                                elif ph.lower() == 'c':
-                                    I_rating[2] = wire.ampacity / baseA
-                                                                        
-                    # For 1-ph lines
-                    elif nphases == 1:
-                        
-                        for wire in i.wires:
-                            if (
-                                hasattr(wire, "phase")
-                                and wire.phase is not None
-                                and wire.phase not in ["N", "N1", "N2"]
-                            ):
-                                ph = wire.phase
-                                    
-                                if ph.lower() == 'a':
-                                    ph_num = 0
-                                elif ph.lower() == 'b':
-                                    ph_num = 1
-                                elif ph.lower() == 'c':
-                                    ph_num = 2
-                                    
-                                # total branch impedance in p.u.
-                                br_zmatrix = np.array(i.impedance_matrix)*length / baseZ
-                                br_cmatrix = np.array(i.capacitance_matrix)*length
-                                br_cdiag = np.diagonal(br_cmatrix)
-                #                    br_z = np.mean(np.diagonal(br_zmatrix))  # if only positive seq. is considered              
-                                br_r[ph_num,ph_num] = np.real(br_zmatrix)
-                                br_x[ph_num,ph_num] = np.imag(br_zmatrix)
-                #                    br_c = np.real(np.mean(np.diagonal(br_cmatrix)))
-                                
-#                                if index == 8:
-#                                    print("a")
-                                        
-                                br_b = 2*np.pi*60*np.abs(br_cdiag)*(10**-9) / baseY
-                                    
-                                b_fr[ph_num] = br_b[0]/2.0
-                                b_to[ph_num] = br_b[0]/2.0
-                                
-                                I_rating[ph_num] = wire.ampacity / baseA
-                                
-                    # For 2-ph lines
-                    elif nphases == 2:
-                        
-                        count = 0
-                        ph_num = []
-                        for wire in i.wires:
-                            if (
-                                hasattr(wire, "phase")
-                                and wire.phase is not None
-                                and wire.phase not in ["N", "N1", "N2"]
-                            ):
-                                ph = wire.phase
-                                count += 1
-                                    
-                                if ph.lower() == 'a':
-                                    ph_num.append(0)
-                                elif ph.lower() == 'b':
-                                    ph_num.append(1)
-                                elif ph.lower() == 'c':
-                                    ph_num.append(2)
-                                
-                                if count == 2:
-                                    # total branch impedance in p.u.
-                                    br_zmatrix = np.array(i.impedance_matrix)*length / baseZ
-                                    br_cmatrix = np.array(i.capacitance_matrix)*length
-                                    br_cdiag = np.diagonal(br_cmatrix)
-                                    
-                                    br_r[ph_num[0], ph_num[0]] = np.real(br_zmatrix)[0,0]
-                                    br_r[ph_num[0], ph_num[1]] = np.real(br_zmatrix)[0,1]
-                                    br_r[ph_num[1], ph_num[0]] = np.real(br_zmatrix)[1,0]
-                                    br_r[ph_num[1], ph_num[1]] = np.real(br_zmatrix)[1,1]
-                                    
-                                    br_x[ph_num[0], ph_num[0]] = np.imag(br_zmatrix)[0,0]
-                                    br_x[ph_num[0], ph_num[1]] = np.imag(br_zmatrix)[0,1]
-                                    br_x[ph_num[1], ph_num[0]] = np.imag(br_zmatrix)[1,0]
-                                    br_x[ph_num[1], ph_num[1]] = np.imag(br_zmatrix)[1,1]
-                                    
-#                                    if index == 8:
-#                                        print("a")
-                                    
-                                    br_b = 2*np.pi*60*np.abs(br_cdiag)*(10**-9) / baseY
-                                        
-                                    b_fr[ph_num[0]] = br_b[0]/2.0
-                                    b_fr[ph_num[1]] = br_b[1]/2.0
-                                    b_to[ph_num[0]] = br_b[0]/2.0
-                                    b_to[ph_num[1]] = br_b[1]/2.0
-                                    
-                                I_rating[ph_num[count-1]] = wire.ampacity / baseA
-                                
-                    current_rating_a0 = I_rating[0]
-                    current_rating_b0 = I_rating[1]
-                    current_rating_c0 = I_rating[2]
-                    current_rating_a = [current_rating_a0,current_rating_b0,current_rating_c0]
-                    
-                    # 60 degrees = 1.0472 radians
-                    angmin = [-1.0472, -1.0472, -1.0472]
-                    angmax = [1.0472, 1.0472, 1.0472]
-                    shift = [0.0, 0.0, 0.0]
-                    tap = [1.0, 1.0, 1.0]
-                    transformer = 'false'
-                    status = 1
-                    
-#                    if index == 8:
-#                        print("a")
-                    
-                    #Converting the arrays to lists for writing to json in a correct way
-                    br_r = br_r.tolist()
-                    br_x = br_x.tolist()                    
-                    b_fr = list(b_fr)
-                    b_to = list(b_to)
-                    g_fr = list(g_fr)
-                    g_to = list(g_to)
-                    
-#                    if index == 8:
-#                        print("a")
-                    
-                    data = dict(index=index,name=name,length=length,nominal_voltage=nominal_voltage,f_bus=f_bus,t_bus=t_bus,br_r=br_r,br_x=br_x,g_fr=g_fr,g_to=g_to,b_fr=b_fr,b_to=b_to,current_rating_a=current_rating_a,angmin=angmin,angmax=angmax,shift=shift,tap=tap,transformer=transformer,status=status,has_switch=1,switch_status=1)
-                    branch_data[str(index)] = data
+                    lines.append((index, i))
+                    # Reserve the entry of the line to keep the branches in the model order
+                    branch_data[str(index)] = None
                 
                 elif isinstance(i, PowerTransformer):
                     
@@ -329,7 +158,6 @@ class Writer(AbstractWriter):
                     xfmr_count += 1
                     name = i.name
                     length = 0   
-                    bus_data = self.network['bus']
                     f_bus0 = i.from_element
                     t_bus0 = i.to_element
                     
@@ -340,15 +168,8 @@ class Writer(AbstractWriter):
 #                        print(index)
                     
                     ## Finding the Indexes of the buses to which the branch is connected
-                    for j in bus_data:
-                        if bus_data[j]["name"] == f_bus0:
-                            f_bus = bus_data[j]["index"]
-                            break
-                    
-                    for j in bus_data:
-                        if bus_data[j]["name"] == t_bus0:
-                            t_bus = bus_data[j]["index"]
-                            break
+                    f_bus = self.bus_index.get(f_bus0)
+                    t_bus = self.bus_index.get(t_bus0)
                     
                     nominal_voltages = []
                     # 60 degrees = 1.0472 radians
@@ -567,9 +388,138 @@ class Writer(AbstractWriter):
                         index -= 1
                 
             m_idx += 1
+
+        for index, data in self.write_line_branches(lines):
+            branch_data[str(index)] = data
                 
         return branch_data	
 
+    def write_line_branches(self, lines):
+        """
+        Returns the branch data of the lines, given as (branch index, Line) tuples.
+
+        The base values of all the lines, and the per unit impedances and susceptances,
+        are computed with NumPy in one batch: the matrices of all the lines are concatenated
+        in a flat array which is divided by the base value of their line, repeated over their entries.
+        """
+        baseMVA = self.baseMVA
+        # A line without nominal voltage uses the base voltage of the buses, so its impedances are never NaN
+        nominal_voltages = []
+        for _, i in lines:
+            if i.nominal_voltage is None:
+                logger.warning(
+                    "Line {} has no nominal voltage, using the base voltage of {} kV".format(i.name, self.basekV)
+                )
+                nominal_voltages.append(self.basekV*1000.0)
+            else:
+                nominal_voltages.append(i.nominal_voltage)
+        nominal_voltages = np.array(nominal_voltages, dtype=np.float64)
+        basekV = nominal_voltages/1000.0
+        baseZ = basekV**2/baseMVA
+        baseY = 1/baseZ
+        baseA = baseMVA/(np.sqrt(3)*basekV)*1000.0
+
+        # Phase wires of every line, and the matrices of the lines for which they are used
+        phase_wires = []
+        z_matrices = []
+        c_diagonals = []
+        owners = []
+        for k, (index, i) in enumerate(lines):
+            wires = i.wires if i.wires is not None else []
+            phase_wires.append([
+                wire for wire in wires
+                if hasattr(wire, "phase")
+                and wire.phase is not None
+                and wire.phase not in ["N", "N1", "N2"]
+            ])
+            # 3-ph lines always use their matrices, 1-ph and 2-ph lines only if all their wires are phases
+            if len(wires) == 3 or (len(wires) in [1, 2] and len(phase_wires[-1]) == len(wires)):
+                z_matrices.append(np.array(i.impedance_matrix)*i.length)
+                c_diagonals.append(np.diagonal(np.array(i.capacitance_matrix)*i.length))
+                owners.append(k)
+
+        # total branch impedances and susceptances in p.u.
+        z_values, z_sizes = concatenate(z_matrices)
+        br_zmatrices = split(z_values / np.repeat(baseZ[owners], z_sizes), z_matrices, z_sizes)
+        c_values, c_sizes = concatenate(c_diagonals)
+        br_bs = split(2*np.pi*60*np.abs(c_values)*(10**-9) / np.repeat(baseY[owners], c_sizes), c_diagonals, c_sizes)
+        position = {k: n for n, k in enumerate(owners)}
+
+        phase_map = {"a": 0, "b": 1, "c": 2}
+        for k, (index, i) in enumerate(lines):
+            name = i.name
+            nominal_voltage = i.nominal_voltage
+            length = i.length
+
+            ## Indexes of the buses to which the branch is connected
+            f_bus = self.bus_index.get(i.from_element)
+            t_bus = self.bus_index.get(i.to_element)
+
+            # Default assumed values, near zero conductance = very high impedance
+            g_fr = [0.0, 0.0, 0.0]
+            g_to = [0.0, 0.0, 0.0]
+            b_fr = [0.0, 0.0, 0.0]
+            b_to = [0.0, 0.0, 0.0]
+            br_r = np.zeros((3, 3))
+            br_x = np.zeros((3, 3))
+            I_rating = [0.0, 0.0, 0.0]
+
+            nphases = len(i.wires) if i.wires is not None else 0
+            if k in position:
+                br_zmatrix = br_zmatrices[position[k]]
+                br_b = br_bs[position[k]]
+
+            # For 3-ph lines
+            if nphases == 3:
+                br_r = np.real(br_zmatrix)
+                br_x = np.imag(br_zmatrix)
+                br_b_half = br_b[0]/2.0
+                b_fr = [br_b_half, br_b_half, br_b_half]
+                b_to = [br_b_half, br_b_half, br_b_half]
+                for wire in phase_wires[k]:
+                    if wire.phase.lower() in phase_map:
+                        I_rating[phase_map[wire.phase.lower()]] = wire.ampacity / baseA[k]
+
+            # For 1-ph lines
+            elif nphases == 1:
+                for wire in phase_wires[k]:
+                    ph_num = phase_map[wire.phase.lower()]
+                    br_r[ph_num, ph_num] = np.real(br_zmatrix)[0, 0]
+                    br_x[ph_num, ph_num] = np.imag(br_zmatrix)[0, 0]
+                    b_fr[ph_num] = br_b[0]/2.0
+                    b_to[ph_num] = br_b[0]/2.0
+                    I_rating[ph_num] = wire.ampacity / baseA[k]
+
+            # For 2-ph lines
+            elif nphases == 2:
+                ph_num = [phase_map[wire.phase.lower()] for wire in phase_wires[k]]
+                if len(ph_num) == 2:
+                    for a in range(2):
+                        for b in range(2):
+                            br_r[ph_num[a], ph_num[b]] = np.real(br_zmatrix)[a, b]
+                            br_x[ph_num[a], ph_num[b]] = np.imag(br_zmatrix)[a, b]
+                        b_fr[ph_num[a]] = br_b[a]/2.0
+                        b_to[ph_num[a]] = br_b[a]/2.0
+                for wire, ph in zip(phase_wires[k], ph_num):
+                    I_rating[ph] = wire.ampacity / baseA[k]
+
+            current_rating_a = [I_rating[0], I_rating[1], I_rating[2]]
+
+            # 60 degrees = 1.0472 radians
+            angmin = [-1.0472, -1.0472, -1.0472]
+            angmax = [1.0472, 1.0472, 1.0472]
+            shift = [0.0, 0.0, 0.0]
+            tap = [1.0, 1.0, 1.0]
+            transformer = 'false'
+            status = 1
+
+            #Converting the arrays to lists for writing to json in a correct way
+            br_r = br_r.tolist()
+            br_x = br_x.tolist()
+
+            data = dict(index=index,name=name,length=length,nominal_voltage=nominal_voltage,f_bus=f_bus,t_bus=t_bus,br_r=br_r,br_x=br_x,g_fr=g_fr,g_to=g_to,b_fr=b_fr,b_to=b_to,current_rating_a=current_rating_a,angmin=angmin,angmax=angmax,shift=shift,tap=tap,transformer=transformer,status=status,has_switch=1,switch_status=1)
+            yield index, data
+
     def write_buses(self, model):
         
         ###############################################
@@ -582,6 +532,7 @@ class Writer(AbstractWriter):
         
         
         bus_data = {}
+        self.bus_index = {}
         node_index = 0
         for i in model.models:
 
@@ -626,6 +577,7 @@ class Writer(AbstractWriter):
                     temp_bus_data["nominal_voltage"] = i.nominal_voltage
 
                 bus_data[str(node_index+1)] = temp_bus_data
+                self.bus_index.setdefault(i.name, node_index+1)
                 
                 node_index = node_index + 1     
                 
@@ -644,6 +596,8 @@ class Writer(AbstractWriter):
         ###############################################
         
         load_data = {}
+        # Entry of load_data of every bus index
+        bus_entries = {}
         load_index = 0
 
         # Mapping the phase_indices to the corresponding strings  
@@ -653,21 +607,14 @@ class Writer(AbstractWriter):
             if isinstance(i, Load):
                 
                 ## Finding the Index of the bus to which the given load is connected
-                bus_data = self.network['bus']
-
-                for j in bus_data:
-                    if bus_data[j]["name"] == i.connecting_element:
-                        connecting_bus = bus_data[j]["index"]
-                        break
+                connecting_bus = self.bus_index.get(i.connecting_element)
                 
                 # Check if the given Bus entry exists in load_data
                 bus_exists_flag = 0
 
-                if load_data != {}: 
-                    for entry in load_data:
-                        if load_data[entry]["load_bus"] == connecting_bus:
-                            bus_exists_flag = 1
-                            break
+                if connecting_bus in bus_entries:
+                    entry = bus_entries[connecting_bus]
+                    bus_exists_flag = 1
                 
                 
                 ## If the bus doesn't exist, initialize the load instance with default values
@@ -701,6 +648,7 @@ class Writer(AbstractWriter):
                 # Add/update the load_instance to the load_data
                 if bus_exists_flag == 0:
                     load_data[str(load_index+1)] = temp_load_data
+                    bus_entries[connecting_bus] = str(load_index+1)
                     # Increment the load_index for the new entry
                     load_index += 1
 
@@ -721,30 +669,25 @@ class Writer(AbstractWriter):
         ###############################################
         
         gen_data = {}
+        # Entry of gen_data of every bus index
+        bus_entries = {}
         gen_index = 0
 
         # Mapping the phase_indices to the corresponding strings  
         phase_map = {"a":0,"b":1,"c":2}
 
-        bus_data = self.network['bus']
-        
         for i in model.models:
             if isinstance(i, Photovoltaic) or isinstance(i, PowerSource): # If the instance is a Generator or Source forming gen (Slack)
     
                 ## Finding the Index of the bus to which the given generator (DER) is connected
-                for j in bus_data:
-                    if bus_data[j]["name"] == i.connecting_element:
-                        connecting_bus = bus_data[j]["index"]
-                        break
+                connecting_bus = self.bus_index.get(i.connecting_element)
                 
                 # Check if the given Bus entry exists in load_data
                 bus_exists_flag = 0
 
-                if gen_data != {}: 
-                    for entry in gen_data:
-                        if gen_data[entry]["gen_bus"] == connecting_bus:
-                            bus_exists_flag = 1
-                            break
+                if connecting_bus in bus_entries:
+                    entry = bus_entries[connecting_bus]
+                    bus_exists_flag = 1
 
                 ## If the bus doesn't exist, initialize the generator instance with default values
                 empty_3ph_arr = [0, 0, 0]
@@ -848,6 +791,7 @@ class Writer(AbstractWriter):
 
                 # Aggregating the Parameters for the respective generator in one entry              
                 gen_data[str(index)] = temp_gen_data
+                bus_entries.setdefault(connecting_bus, str(index))
                 
                 gen_index += 1 
 
@@ -862,7 +806,6 @@ class Writer(AbstractWriter):
         m_idx = 0
         shunt_count = 0
         baseMVA = self.baseMVA
-        bus_data = self.network['bus']
                 
         for i in model.models:
             
@@ -877,10 +820,7 @@ class Writer(AbstractWriter):
                 shunt_bus0 = i.connecting_element
                 
                 ## Finding the Indexes of the buses to which the branch is connected
-                for j in bus_data:
-                    if bus_data[j]["name"] == shunt_bus0:
-                        shunt_bus = bus_data[j]["index"]
-                        break				  
+                shunt_bus = self.bus_index.get(shunt_bus0)
                 
                 # gs is assumed as 0.0 pu (no resistive loss)
                 gs = [0.0, 0.0, 0.0]
@@ -966,7 +906,6 @@ class Writer(AbstractWriter):
         m_info = model.models
         m_idx = 0
         baseMVA = self.baseMVA
-        bus_data = self.network['bus']
         
         for i in model.models:
             
@@ -975,13 +914,9 @@ class Writer(AbstractWriter):
                 index += 1
                 name = i.name																	  
                 storage_bus0 = i.connecting_element
-                shunt_bus0 = i.connecting_element
                 
-                ## Finding the Indexes of the buses to which the branch is connected
-                for j in bus_data:
-                    if bus_data[j]["name"] == shunt_bus0:
-                        shunt_bus = bus_data[j]["index"]
-                        break				  
+                ## Finding the Index of the bus to which the storage is connected
+                storage_bus = self.bus_index.get(storage_bus0)
                 # Default values
                 status = 1
                 qmin = -50.0
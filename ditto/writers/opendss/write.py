@@ -30,10 +30,37 @@ from ditto.models.power_source import PowerSource
 from ditto.models.photovoltaic import Photovoltaic
 
 from ditto.writers.abstract_writer import AbstractWriter
+from ditto.timeseries.backend import (
+    binary_extension,
+    column_files,
+    has_column_data,
+    read_values,
+    write_csv,
+)
+from ditto.timeseries.engine import group_by_length, scale
+from ditto.timeseries.metadata import BINARY_DTYPES, metadata_cache
+from ditto.timeseries.registry import profile_digest, profile_key
 
 logger = logging.getLogger(__name__)
 
 
+def loadshape_file_type(location):
+    """Returns the OpenDSS property reading the loadshape file at location: sngfile, dblfile or file (csv)."""
+    extension = os.path.splitext(location)[1].lower()
+    if extension in BINARY_DTYPES:
+        return extension[1:] + "file"
+    return "file"
+
+
+def scaled_loadshape_location(location, scale_factor):
+    """Returns the location of the copy of the loadshape file at location multiplied by scale_factor."""
+    return (
+        location[:-4]
+        + "__scaled%s" % (str(int((scale_factor) * 100)).zfill(3))
+        + location[-4:]
+    )
+
+
 class Writer(AbstractWriter):
     """
     DiTTo--->OpenDSS writer class.
@@ -43,6 +70,8 @@ class Writer(AbstractWriter):
     :type log_file: str
     :param output_path: Path to write the OpenDSS files. Optional. Default='./'
     :type output_path: str
+    :param timeseries_metadata_files: Store the number of points and hash of the loadshape files in <file>.meta.json files next to them, so that later writes do not read the data. Optional. Default=False
+    :type timeseries_metadata_files: bool
 
     **Constructor:**
 
@@ -91,6 +120,9 @@ class Writer(AbstractWriter):
         """Constructor for the OpenDSS writer."""
         self.timeseries_datasets = {}
         self.timeseries_format = {}
+        self.timeseries_contents = {}  # Loadshape of every profile (data hash, scale factor, interval) of each feeder
+        self.loadshape_locations = {}  # Files written for the timeseries without a data_location
+        self.written_loadshapes = {}  # Hash of their data -> file written
         self.all_linecodes = {}
         self.all_wires = {}
         self.all_geometries = {}
@@ -105,6 +137,8 @@ class Writer(AbstractWriter):
         self.separate_feeders = False
         self.separate_substations = False
         self.remove_loadshapes = False
+        # Store the metadata of the loadshape files next to them (<file>.meta.json)
+        self.timeseries_metadata_files = kwargs.get("timeseries_metadata_files", False)
         self.has_timeseries = False
         self.timeseries_solve_format = None
         self.timeseries_iternumber = None
@@ -1474,14 +1508,14 @@ class Writer(AbstractWriter):
                 ):
                     txt += " irradiance=1"
                     for ts in i.timeseries:
+                        location = self.loadshape_location(ts)
                         if (
-                            hasattr(ts, "data_location")
-                            and ts.data_location is not None
-                            and os.path.isfile(os.path.join(self.output_path,ts.data_location))
+                            location is not None
+                            and os.path.isfile(os.path.join(self.output_path,location))
                         ):
                             filename = self.timeseries_datasets[
                                 substation_name + "_" + feeder_name
-                            ][ts.data_location]
+                            ][location]
                             if self.remove_loadshapes:
                                 optional_comment = '!'
                             else:
@@ -1602,6 +1636,114 @@ class Writer(AbstractWriter):
                         )
                     )
 
+    def loadshape_location(self, timeseries):
+        """Returns the location of the data of timeseries, relative to output_path, or None if it has no data.
+
+        In-memory data is written to a csv file, and the raw values of a column file are copied to a binary loadshape file (.sng or .dbl),
+        the first time a profile is seen, so identical profiles share one file.
+        """
+        if timeseries.data_location is not None:
+            return timeseries.data_location
+        if timeseries in self.loadshape_locations:
+            return self.loadshape_locations[timeseries]
+        if timeseries.data is None and not has_column_data(timeseries):
+            return None
+        digest = profile_digest(timeseries, self.output_path)
+        if digest not in self.written_loadshapes:
+            label = timeseries.data_label or "loadshape"
+            if timeseries.data is not None:
+                location = "{label}_{digest}.csv".format(label=label, digest=digest[:8])
+                timeseries.data.to_csv(
+                    os.path.join(self.output_path, location), index=False, header=False
+                )
+            else:
+                column_file = column_files.get(
+                    os.path.join(self.output_path, timeseries.data_file)
+                )
+                location = "{label}_{digest}{extension}".format(
+                    label=label,
+                    digest=digest[:8],
+                    extension=binary_extension(column_file.dtype),
+                )
+                column_file.copy_to(
+                    timeseries.data_key, os.path.join(self.output_path, location)
+                )
+            self.written_loadshapes[digest] = location
+        self.loadshape_locations[timeseries] = self.written_loadshapes[digest]
+        return self.loadshape_locations[timeseries]
+
+    def loadshape_content(self, location, timeseries):
+        """Returns the key identifying the loadshape of timeseries: the hash of its values, its scale factor and its interval, as in TimeseriesRegistry."""
+        digest = metadata_cache.get(
+            os.path.join(self.output_path, location),
+            persist=self.timeseries_metadata_files,
+        ).digest
+        return profile_key(digest, timeseries)
+
+    def set_loadshape_format(self, filename, timeseries):
+        """Sets the format of the loadshape filename from the number of points of its data, and returns the number of points.
+
+        The number of points comes from the metadata cache, so the data is only read the first time it is used.
+        """
+        metadata = metadata_cache.get(
+            os.path.join(self.output_path, self.loadshape_location(timeseries)),
+            interval=timeseries.interval,
+            persist=self.timeseries_metadata_files,
+        )
+        npoints = metadata.npoints
+
+        if self.timeseries_iternumber is None:
+            self.timeseries_iternumber = npoints
+        else:
+            self.timeseries_iternumber = min(self.timeseries_iternumber, npoints)
+
+        # Hourly, minute or second resolution data for exactly one day are daily loadshapes TODO: make this more precise
+        self.timeseries_format[filename] = metadata.format
+        if metadata.format == "yearly":
+            self.timeseries_solve_format = "yearly"
+        elif self.timeseries_solve_format is None:
+            self.timeseries_solve_format = "daily"
+        return npoints
+
+    def write_scaled_loadshapes(self, model):
+        """Writes the scaled copies of the loadshape files of the Timeseries having a scale factor.
+
+        Every file is read once, and all the profiles with the same number of points are scaled in one operation.
+        Only the first column of the csv files is kept, which is the one read by OpenDSS.
+        """
+        scaled_loadshapes = {}  # scaled location -> (location, scale factor)
+        for i in model.models:
+            if (
+                isinstance(i, Timeseries)
+                and i.data_label is not None
+                and i.scale_factor is not None
+                and i.scale_factor != 1
+            ):
+                location = self.loadshape_location(i)
+                if location is not None:
+                    scaled_loadshapes.setdefault(
+                        scaled_loadshape_location(location, i.scale_factor),
+                        (location, i.scale_factor),
+                    )
+
+        scaled_locations = list(scaled_loadshapes)
+        values = {}
+        for location, _ in scaled_loadshapes.values():
+            if location not in values:
+                values[location] = read_values(os.path.join(self.output_path, location))
+        stacks = group_by_length(
+            [values[scaled_loadshapes[s][0]] for s in scaled_locations]
+        )
+        for indices, stack in stacks:
+            scaled = scale(stack, [scaled_loadshapes[scaled_locations[k]][1] for k in indices])
+            for index, row in zip(indices, scaled):
+                path = os.path.join(self.output_path, scaled_locations[index])
+                dtype = BINARY_DTYPES.get(os.path.splitext(path)[1].lower())
+                if dtype is not None:
+                    row.astype(dtype).tofile(path)
+                else:
+                    write_csv(row, path, fmt="%s")
+
     def write_timeseries(self, model):
         """Write all the unique timeseries objects to csv files if they are in memory.
         If the data is already on disk, no new data is created.
@@ -1613,6 +1755,7 @@ class Writer(AbstractWriter):
         substation_text_map = {}
         feeder_text_map = {}
         all_data = set()
+        self.write_scaled_loadshapes(model)
         for i in model.models:
             if isinstance(i, Timeseries):
                 self.has_timeseries = True
@@ -1642,41 +1785,31 @@ class Writer(AbstractWriter):
                     txt = feeder_text_map[substation_name + "_" + feeder_name]
                 if substation_name + "_" + feeder_name not in self.timeseries_datasets:
                     self.timeseries_datasets[substation_name + "_" + feeder_name] = {}
+                if substation_name + "_" + feeder_name not in self.timeseries_contents:
+                    self.timeseries_contents[substation_name + "_" + feeder_name] = {}
 
+                location = self.loadshape_location(i)
                 if (
-                    hasattr(i, "data_location")
-                    and i.data_location is not None
+                    location is not None
                     and i.data_label is not None
                     and (i.scale_factor is None or i.scale_factor == 1)
                 ):
                     filename = i.data_label
-                    location = i.data_location
                     # Skip if we've already written the LoadShape info
                     if (
-                        i.data_location
+                        location
                         in self.timeseries_datasets[substation_name + "_" + feeder_name]
                         and substation_name + "_" + feeder_name in feeder_text_map
                     ):  # Need to make sure the loadshape exists in each subfolder
                         continue
-                    # WARNING - this step can be slow for big systems with lots of data
-                    npoints = len(
-                        pd.read_csv(os.path.join(self.output_path, i.data_location)),header=None
-                    )
-
-                    if self.timeseries_iternumber is None:
-                        self.timeseries_iternumber = npoints
-                    else:
-                        self.timeseries_iternumber = min(self.timeseries_iternumber,npoints)
-
-                    if (
-                        npoints == 24 or npoints == 24 * 60 or npoints == 24 * 60 * 60
-                    ):  # The cases of hourly, minute or second resolution data for exactly one day TODO: make this more precise
-                        self.timeseries_format[filename] = "daily"
-                        if self.timeseries_solve_format is None:
-                            self.timeseries_solve_format = "daily"
-                    else:
-                        self.timeseries_format[filename] = "yearly"
-                        self.timeseries_solve_format = "yearly"
+                    # Skip if a loadshape with the same data was already written for the feeder
+                    content = self.loadshape_content(location, i)
+                    if content in self.timeseries_contents[substation_name + "_" + feeder_name]:
+                        self.timeseries_datasets[substation_name + "_" + feeder_name][
+                            location
+                        ] = self.timeseries_contents[substation_name + "_" + feeder_name][content]
+                        continue
+                    npoints = self.set_loadshape_format(filename, i)
 
                     interval = 1
                     if i.interval is not None:
@@ -1689,60 +1822,44 @@ class Writer(AbstractWriter):
                         q_mult = ""
                         data_location_kvar = ""
                     if not self.remove_loadshapes:
-                        txt += "New Loadshape.{filename} npts= {npoints} interval={interv} mult = (file={data_location}){data_location_kvar}\n\n".format(
+                        txt += "New Loadshape.{filename} npts= {npoints} interval={interv} mult = ({file_type}={data_location}){data_location_kvar}\n\n".format(
                             filename=filename,
                             npoints=npoints,
+                            file_type=loadshape_file_type(location),
                             data_location=location,
                             data_location_kvar = data_location_kvar,
                             interv=interval,
                         )
                         self.timeseries_datasets[substation_name + "_" + feeder_name][
-                            i.data_location
+                            location
+                        ] = filename
+                        self.timeseries_contents[substation_name + "_" + feeder_name][
+                            content
                         ] = filename
                         feeder_text_map[substation_name + "_" + feeder_name] = txt
 
                 elif (
-                    hasattr(i, "data_location")
-                    and i.data_location is not None
+                    location is not None
                     and i.data_label is not None
                     and i.scale_factor is not None
                     and i.scale_factor != 1
                 ):
                     filename = i.data_label + "_scaled"
-                    scaled_data_location = (
-                        i.data_location[:-4]
-                        + "__scaled%s" % (str(int((i.scale_factor) * 100)).zfill(3))
-                        + i.data_location[-4:]
-                    )
+                    scaled_data_location = scaled_loadshape_location(location, i.scale_factor)
                     if (
-                        i.data_location
+                        location
                         in self.timeseries_datasets[substation_name + "_" + feeder_name]
                         and substation_name + "_" + feeder_name in feeder_text_map
                     ):  # Need to make sure the loadshape exits in each subfolder
                         continue
+                    content = self.loadshape_content(location, i)
+                    if content in self.timeseries_contents[substation_name + "_" + feeder_name]:
+                        self.timeseries_datasets[substation_name + "_" + feeder_name][
+                            location
+                        ] = self.timeseries_contents[substation_name + "_" + feeder_name][content]
+                        continue
 
-                    # WARNING - this step can be slow for big systems with lots of data
-                    timeseries = pd.read_csv(
-                        os.path.join(self.output_path, i.data_location), header=None
-                    )
-                    npoints = len(timeseries)
-
-                    if self.timeseries_iternumber is None:
-                        self.timeseries_iternumber = npoints
-                    else:
-                        self.timeseries_iternumber = min(self.timeseries_iternumber,npoints)
-
-                    timeseries.iloc[:, [0]] = timeseries.iloc[:, [0]] * i.scale_factor
-                    timeseries.to_csv(scaled_data_location, index=False)
-                    if (
-                        npoints == 24 or npoints == 24 * 60 or npoints == 24 * 60 * 60
-                    ):  # The cases of hourly, minute or second resolution data for exactly one day TODO: make this more precise
-                        self.timeseries_format[filename] = "daily"
-                        if self.timeseries_solve_format is None:
-                            self.timeseries_solve_format = "daily"
-                    else:
-                        self.timeseries_format[filename] = "yearly"
-                        self.timeseries_solve_format = "yearly"
+                    npoints = self.set_loadshape_format(filename, i)
 
                     interval = 1
                     if i.interval is not None:
@@ -1755,19 +1872,23 @@ class Writer(AbstractWriter):
                         q_mult = ""
                         data_location_kvar = ""
                     if not self.remove_loadshapes:
-                        txt += "New Loadshape.{filename} npts= {npoints} interval={interv} mult = (file={data_location}){data_location_kvar}\n\n".format(
+                        txt += "New Loadshape.{filename} npts= {npoints} interval={interv} mult = ({file_type}={data_location}){data_location_kvar}\n\n".format(
                             filename=filename,
                             npoints=npoints,
+                            file_type=loadshape_file_type(scaled_data_location),
                             data_location=scaled_data_location,
                             data_location_kvar = data_location_kvar,
-                            interval=interval,
+                            interv=interval,
                         )
                         self.timeseries_datasets[substation_name + "_" + feeder_name][
-                            i.data_location
+                            location
+                        ] = filename
+                        self.timeseries_contents[substation_name + "_" + feeder_name][
+                            content
                         ] = filename
                         feeder_text_map[substation_name + "_" + feeder_name] = txt
                 else:
-                   logger.error("Problem exists with loadshape{filename}".format(filename=filename))
+                   logger.error("Problem exists with loadshape {filename}".format(filename=i.data_label))
 
 
                 #TODO: write the timeseries data if it's in memory
@@ -2035,14 +2156,14 @@ class Writer(AbstractWriter):
                             feeder = ts.feeder_name
                         if ts.substation_name is not None:
                             substation = ts.substation_name
+                        location = self.loadshape_location(ts)
                         if (
-                            hasattr(ts, "data_location")
-                            and ts.data_label is not None
-                            and ts.data_location is not None
+                            ts.data_label is not None
+                            and location is not None
                         ):
                             filename = self.timeseries_datasets[
                                 substation + "_" + feeder
-                            ][ts.data_location]
+                            ][location]
                             if self.remove_loadshapes:
                                 optional_comment = '!'
                             else:
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+
+"""
+Fixtures shared by the tests.
+"""
+import random
+
+import networkx as nx
+import pytest
+
+
+def random_weighted_tree(n, seed):
+    """Returns a random tree of n nodes rooted at 0, with a random length on every edge."""
+    rng = random.Random(seed)
+    graph = nx.Graph()
+    graph.add_node(0)
+    for node in range(1, n):
+        graph.add_edge(rng.randrange(node), node, length=rng.uniform(1, 100))
+    return graph
+
+
+@pytest.fixture
+def weighted_tree():
+    """Factory of random weighted trees: weighted_tree(n, seed)."""
+    return random_weighted_tree
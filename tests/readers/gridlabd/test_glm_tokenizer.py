@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+
+from ditto.readers.gridlabd.glm import iter_lines, iter_blocks, GLMObject, GLMSchedule, LazySchedules
+
+
+def test_nested_includes_are_expanded_in_place(tmp_path):
+    sub = tmp_path / "sub"
+    sub.mkdir()
+    (tmp_path / "main.glm").write_text('object node {\n name n1;\n}\n#include "sub/lines.glm"\nobject node {\n name n3;\n}\n')
+    (sub / "lines.glm").write_text('#include "more.glm"\nobject node {\n name n2;\n}\n')
+    (sub / "more.glm").write_text('object player {\n name p1;\n}\n')
+
+    blocks = list(iter_blocks(iter_lines(str(tmp_path / "main.glm")), ignore_classes={"player"}))
+
+    assert [b.properties for b in blocks] == [[("name", "n1")], [("name", "n2")], [("name", "n3")]]
+
+
+def test_circular_include_is_skipped(tmp_path):
+    (tmp_path / "a.glm").write_text('#include "b.glm"\nobject node {\n name a;\n}\n')
+    (tmp_path / "b.glm").write_text('#include "a.glm"\nobject node {\n name b;\n}\n')
+
+    names = [b.properties[0][1] for b in iter_blocks(iter_lines(str(tmp_path / "a.glm")))]
+
+    assert names == ["b", "a"]
+
+
+def test_blocks():
+    lines = [
+        "object triplex_meter:tm1 {",
+        "    nominal_voltage 120;",
+        "    object recorder {",
+        "        file out.csv;",
+        "    };",
+        "};",
+        "schedule residential {",
+        "    * 0-11 * * * 1.5;",
+        "    * 12-23 * * * 2.5;",
+        "}",
+    ]
+
+    obj, schedule = list(iter_blocks(lines))
+
+    assert obj == GLMObject("triplex_meter", "tm1", [("nominal_voltage", "120"), ("file", "out.csv")])
+    assert schedule == GLMSchedule("residential", [("* 0-11 * * *", "1.5"), ("* 12-23 * * *", "2.5")])
+
+
+def test_schedules_are_evaluated_on_lookup():
+    schedules = LazySchedules(datetime(2017, 6, 1, 14, 0), timedelta(minutes=1))
+    schedules.add(GLMSchedule("residential", [("* 0-11 * * *", "1.5"), ("* 12-23 * * *", "2.5")]))
+    schedules.add(GLMSchedule("unused", [("* * * * *", "3.0")]))
+
+    assert schedules["residential"] == "2.5"
+    assert "missing" not in schedules
+    assert "unused" not in schedules.values
@@ -0,0 +1,34 @@
+from ditto.readers.windmil.multispeak import iter_multispeak_folder
+
+XML = """<?xml version="1.0"?>
+<MultiSpeakMsgHeader xmlns="http://www.multispeak.org/Version_3.0">
+  <MultiSpeak>
+    <ohPrimaryLine objectID="{id}">
+      <sectionID>S1</sectionID>
+      <parentSectionID name="P 1">x</parentSectionID>
+      <complexLine><coord><X>1</X><Y>2</Y></coord><coord><X>3</X><Y>4</Y></coord></complexLine>
+    </ohPrimaryLine>
+  </MultiSpeak>
+</MultiSpeakMsgHeader>
+"""
+
+
+def test_elements_use_xmltodict_layout(tmp_path):
+    (tmp_path / "a.xml").write_text(XML.format(id="L1"))
+
+    (object_name, element), = list(iter_multispeak_folder(str(tmp_path)))
+
+    assert object_name == "ohPrimaryLine"
+    assert element == {
+        "@objectID": "L1",
+        "sectionID": "S1",
+        "parentSectionID": {"@name": "P 1", "#text": "x"},
+        "complexLine": {"coord": [{"X": "1", "Y": "2"}, {"X": "3", "Y": "4"}]},
+    }
+
+
+def test_parallel_loading_matches_serial(tmp_path):
+    for i in range(3):
+        (tmp_path / "{}.xml".format(i)).write_text(XML.format(id="L{}".format(i)))
+
+    assert list(iter_multispeak_folder(str(tmp_path), max_workers=2)) == list(iter_multispeak_folder(str(tmp_path)))
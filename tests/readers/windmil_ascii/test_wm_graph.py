@@ -0,0 +1,90 @@
+import networkx as nx
+
+from ditto.readers.windmil_ascii.wm_reader import wm2graph
+
+
+def empty_graph():
+    """A wm2graph without project files, to build the graph by hand."""
+    wm = wm2graph.__new__(wm2graph)
+    wm.nxGraph = nx.DiGraph()
+    wm.edges_by_class = {}
+    return wm
+
+
+def edges_of_class(graph, class_name):
+    """Scan of the edges, as done before the class index."""
+    return [(u, v) for u, v, d in graph.edges(data=True) if d["class"] == class_name]
+
+
+def recursive_kv(graph, node1, node2, path):
+    """The recursive resolution of 'kv' replaced by get_edge_attribute."""
+    path.append((node1, node2))
+    if "kv" in graph[node1][node2]:
+        return graph[node1][node2]["kv"]
+    in_edges = list(graph.in_edges(node1))
+    if in_edges:
+        return recursive_kv(graph, in_edges[0][0], in_edges[0][1], path)
+    return None
+
+
+def synthetic_edges():
+    # Two sources, the second one without kv, and branches without kv below transformers
+    return [
+        ("s1", "n1", {"class": "Source", "kv": 12.47}),
+        ("n1", "n2", {"class": "Overhead Line"}),
+        ("n2", "n3", {"class": "Transformer", "kv": 0.24}),
+        ("n3", "n4", {"class": "Underground Line"}),
+        ("n4", "n5", {"class": "Underground Line"}),
+        ("n2", "n6", {"class": "Switch"}),
+        ("n6", "n7", {"class": "Overhead Line"}),
+        ("s2", "m1", {"class": "Source"}),
+        ("m1", "m2", {"class": "Overhead Line"}),
+    ]
+
+
+def test_edges_by_class():
+    wm = empty_graph()
+    for u, v, properties in synthetic_edges():
+        wm.add_element_edge(u, v, dict(properties))
+    # An element replacing an edge moves it to its class
+    wm.add_element_edge("n2", "n6", {"class": "Overcurrent Device"})
+
+    for class_name in ["Source", "Overhead Line", "Underground Line", "Switch", "Overcurrent Device", "Regulator"]:
+        assert sorted(wm.edges_by_class.get(class_name, {})) == sorted(
+            edges_of_class(wm.nxGraph, class_name)
+        )
+
+
+def test_base_kv_matches_recursive_resolution():
+    wm = empty_graph()
+    expected = nx.DiGraph()
+    for u, v, properties in synthetic_edges():
+        wm.add_element_edge(u, v, dict(properties))
+        expected.add_edge(u, v, **properties)
+
+    for u, v in list(expected.edges()):
+        if "kv" not in expected[u][v]:
+            path = []
+            value = recursive_kv(expected, u, v, path)
+            for a, b in path:
+                expected[a][b]["kv"] = value
+
+    wm.get_base_kv()
+    assert nx.get_edge_attributes(wm.nxGraph, "kv") == nx.get_edge_attributes(expected, "kv")
+    assert wm.nxGraph["n4"]["n5"]["kv"] == 0.24
+    assert wm.nxGraph["n6"]["n7"]["kv"] == 12.47
+    assert wm.nxGraph["m1"]["m2"]["kv"] is None
+
+
+def test_base_kv_deep_feeder():
+    wm = empty_graph()
+    wm.add_element_edge(0, 1, {"class": "Source", "kv": 7.2})
+    for node in range(1, 20000):
+        wm.add_element_edge(node, node + 1, {"class": "Overhead Line"})
+    # A loop without kv does not walk forever
+    wm.add_element_edge("a", "b", {"class": "Overhead Line"})
+    wm.add_element_edge("b", "a", {"class": "Overhead Line"})
+
+    wm.get_base_kv()
+    assert wm.nxGraph[19999][20000]["kv"] == 7.2
+    assert wm.get_edge_attribute("a", "b", "kv") is None
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+"""
+test_consistency_engine
+----------------------------------
+
+Tests that the consistency engine gives the same results as the individual checks.
+"""
+import os
+
+import pytest
+
+from ditto.store import Store
+from ditto.readers.opendss.read import Reader
+from ditto.models.powertransformer import PowerTransformer
+from ditto.consistency.engine import ConsistencyEngine
+from ditto.consistency.check_loops import check_loops
+from ditto.consistency.check_loads_connected import check_loads_connected
+from ditto.consistency.check_unique_path import check_unique_path
+from ditto.consistency.check_matched_phases import check_matched_phases
+from ditto.consistency.check_transformer_phase_path import check_transformer_phase_path
+from ditto.consistency.fix_undersized_transformers import (
+    fix_undersized_transformers,
+    upgrade_transformers,
+)
+from ditto.models.load import Load
+from ditto.models.phase_load import PhaseLoad
+from ditto.models.winding import Winding
+
+current_directory = os.path.realpath(os.path.dirname(__file__))
+
+
+def read_case(*case):
+    folder = os.path.join(current_directory, "data", "small_cases", *case)
+    model = Store()
+    r = Reader(
+        master_file=os.path.join(folder, "master.dss"),
+        buscoords_file=os.path.join(folder, "buscoords.dss"),
+    )
+    r.parse(model)
+    for i in model.models:
+        if isinstance(i, PowerTransformer):
+            i.is_substation = True  # Only for 13 node system
+    return model
+
+
+@pytest.mark.parametrize(
+    "case",
+    [
+        ("opendss", "ieee_13node"),
+        ("opendss_broken", "ieee_13node_loop"),
+        ("opendss_broken", "ieee_13node_loads_disconnected"),
+        ("opendss_broken", "ieee_13node_phases_off"),
+    ],
+)
+def test_engine_matches_checks(case):
+    model = read_case(*case)
+    report = ConsistencyEngine(model).run()
+
+    expected = {
+        "loops": check_loops(model, verbose=False),
+        "loads_connected": check_loads_connected(model, verbose=False),
+        "unique_path": check_unique_path(model, show_all=True, verbose=False),
+        "matched_phases": check_matched_phases(model, verbose=False),
+        "transformer_phase_path": check_transformer_phase_path(model, verbose=False),
+    }
+    for name, passed in expected.items():
+        result = report["checks"][name]
+        assert result["passed"] == passed, name
+        assert (result["count"] == 0) == passed
+        if name != "loops":
+            assert result["count"] == len(result["elements"])
+        assert result["time"] >= 0
+    assert report["passed"] == all(expected.values())
+
+
+def test_engine_report():
+    model = read_case("opendss_broken", "ieee_13node_loop")
+    engine = ConsistencyEngine(model)
+    report = engine.run(["loops", "unique_path"])
+    assert set(report["checks"]) == {"loops", "unique_path"}
+    assert report["checks"]["loops"]["count"] == 1
+    assert not report["checks"]["unique_path"]["passed"]
+    assert set(report["checks"]["unique_path"]["elements"]) <= {
+        load.name for load in engine.loads
+    }
+
+    with pytest.raises(ValueError):
+        engine.run(["not_a_check"])
+
+
+@pytest.mark.parametrize("use_engine", [False, True])
+def test_fix_undersized_transformers(use_engine):
+    model = read_case("opendss", "ieee_13node")
+    model.set_names()
+    for i in model.models:
+        if isinstance(i, PowerTransformer):
+            i.is_substation = i.name != "xfm1"
+    for winding in model["xfm1"].windings:
+        winding.rated_power = 15000
+
+    if use_engine:
+        report = ConsistencyEngine(model).run([], fixes=["fix_undersized_transformers"])
+        assert report["checks"]["fix_undersized_transformers"]["elements"] == ["xfm1"]
+    else:
+        fix_undersized_transformers(model)
+
+    # load_634 (400 kW) is the only load below xfm1
+    assert [w.rated_power for w in model["xfm1"].windings] == [500000, 500000]
+
+
+def test_upgrade_transformers_messages():
+    model = Store()
+    transformer = PowerTransformer(model, name="t1")
+    transformer.windings = [Winding(model, rated_power=100), Winding(model, rated_power=100)]
+    load = Load(model, name="l1")
+    load.phase_loads = [PhaseLoad(model, p=100.0), PhaseLoad(model, p=200.0)]
+    model.set_names()
+
+    messages, upgraded = upgrade_transformers(model, {"t1": ["l1"]})
+    # The kW are summed phase by phase as a running total: 0.1 + 0.2, not (100 + 200) / 1000
+    assert messages == [
+        "Tranformer t1 with size 0.1 kVA serves 0.30000000000000004 kW. Upgrading to 15 kVA"
+    ]
+    assert upgraded == ["t1"]
+    assert [w.rated_power for w in transformer.windings] == [15000, 15000]
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+"""
+test_consistency_paths
+----------------------------------
+
+Tests the linear time path classification of the consistency checks against the simple paths of networkx.
+"""
+import random
+from itertools import islice
+
+import networkx as nx
+import pytest
+
+from ditto.consistency.network_utils import (
+    count_paths_from_source,
+    number_of_loops,
+    bfs_parents,
+    bfs_tree,
+    path_from_source,
+    transformer_labels,
+)
+
+
+def random_network(seed):
+    rng = random.Random(seed)
+    graph = nx.Graph()
+    graph.add_node(0)
+    for node in range(1, 60):
+        graph.add_edge(rng.randrange(node), node)
+    for _ in range(3):
+        graph.add_edge(rng.randrange(60), rng.randrange(60))
+    graph.add_edge(100, 101)  # Disconnected from the source
+    return graph
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_count_paths_from_source(seed):
+    graph = random_network(seed)
+    nodes = [n for n in graph.nodes() if n != 0]
+    result = count_paths_from_source(graph, 0, nodes)
+    for node in nodes:
+        n_paths = len(list(islice(nx.all_simple_paths(graph, 0, node), 2)))
+        assert result[node] == {0: "0", 1: "1", 2: ">1"}[n_paths]
+
+    assert number_of_loops(graph) == len(nx.cycle_basis(graph))
+
+    paths = nx.single_source_shortest_path(graph, 0)
+    parent = bfs_parents(graph, 0)
+    assert set(parent) == set(paths)
+    for node in paths:
+        assert path_from_source(parent, node) == paths[node]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_transformer_labels(seed):
+    graph = random_network(seed)
+    rng = random.Random(seed)
+    for u, v, data in graph.edges(data=True):
+        data["equipment"] = "PowerTransformer" if rng.random() < 0.2 else "Line"
+        data["is_substation"] = rng.random() < 0.3
+        data["name"] = "{}-{}".format(u, v)
+
+    order, parent = bfs_tree(graph, 0)
+    labels = transformer_labels(graph, order, parent)
+    for node in order:
+        path = path_from_source(parent, node)
+        names = [
+            graph[u][v]["name"]
+            for u, v in zip(path[:-1], path[1:])
+            if graph[u][v]["equipment"] == "PowerTransformer"
+            and not graph[u][v]["is_substation"]
+        ]
+        assert labels[node][0] == min(len(names), 2)
+        if len(names) == 1:
+            assert labels[node][1] == names[0]
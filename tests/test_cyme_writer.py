@@ -47,3 +47,171 @@ def test_center_tap_load_writing():
     os.remove(os.path.join(current_directory, "loads.txt"))
     os.remove(os.path.join(current_directory, "equipment.txt"))
     os.remove(os.path.join(current_directory, "network.txt"))
+
+
+def test_section_spool():
+    """
+    Tests that the spooled rows are written back in order, in memory and on disk.
+    """
+    import io
+    from ditto.writers.cyme.sections import Registry, SectionSpool
+
+    rows = [
+        "section_{i},node_{i},0,node_{j},0,ABC".format(i=i, j=i + 1)
+        for i in range(2000)
+    ]
+    for max_size in (1 << 20, 100):
+        spool = SectionSpool(rows[:1], max_size=max_size)
+        for row in rows[1:]:
+            spool.append(row)
+        assert len(spool) == len(rows)
+        assert list(spool) == rows
+        f = io.StringIO()
+        spool.write_to(f)
+        assert f.getvalue() == "".join(row + "\n" for row in rows)
+        spool.append("last")
+        assert list(spool)[-1] == "last"
+
+        # Appending after an iteration that was not run to its end does not overwrite rows
+        assert rows[1] in spool
+        for row in spool:
+            break
+        spool.append("after break")
+        assert list(spool) == rows + ["last", "after break"]
+        spool.close()
+
+    with SectionSpool(rows, max_size=100) as spool:
+        assert len(spool) == len(rows)
+    assert spool._file.closed
+
+    registry = Registry(["a", "b"])
+    registry.append("a")
+    assert list(registry) == ["a", "b", "a"]
+    assert "b" in registry and "c" not in registry
+    assert registry.add("c") and not registry.add("c")
+    assert len(registry) == 4 and registry[-1] == "c"
+
+
+def test_code_book():
+    """
+    Tests that the equipment codes are found by value like a scan of the dictionary would.
+    """
+    from ditto.writers.cyme.sections import CodeBook
+
+    codes = CodeBook()
+    codes["line_1"] = {"R1": 0.3, "X1": 0.6}
+    codes["line_2"] = {"R1": 0.1, "X1": 0.2}
+    codes["named"] = {"X1": 0.6, "R1": 0.3}
+    codes[3] = "capacitor,100,12.47"
+    codes["unhashable"] = {"R1": 0.3, 1: 0.6}  # Keys of different types cannot be sorted
+
+    for value in [
+        {"R1": 0.3, "X1": 0.6},
+        {"R1": 0.1, "X1": 0.2},
+        {"R1": 0.3, 1: 0.6},
+        "capacitor,100,12.47",
+        "missing",
+    ]:
+        assert codes.keys_of(value) == [k for k, v in codes.items() if v == value]
+
+    # Reassigning an ID keeps its position, like a dictionary
+    codes["line_1"] = {"R1": 0.1, "X1": 0.2}
+    assert codes.keys_of({"R1": 0.1, "X1": 0.2}) == ["line_1", "line_2"]
+    assert codes.keys_of({"R1": 0.3, "X1": 0.6}) == ["named"]
+    del codes["line_2"]
+    assert codes.keys_of({"R1": 0.1, "X1": 0.2}) == ["line_1"]
+
+
+def test_write_files_in_any_order(monkeypatch):
+    """
+    Tests that the files are written from the rows converted by classify, in any order, without scanning the model again.
+    """
+    import tempfile
+    from ditto.readers.opendss.read import Reader
+
+    folder = os.path.join(current_directory, "data", "small_cases", "opendss", "ieee_13node")
+    m = Store()
+    Reader(
+        master_file=os.path.join(folder, "master.dss"),
+        buscoords_file=os.path.join(folder, "buscoords.dss"),
+    ).parse(m)
+
+    def read(path):
+        with open(path, "r") as f:
+            return [line for line in f if not line.startswith("DATE=")]
+
+    t1 = tempfile.TemporaryDirectory()
+    Writer(output_path=t1.name).write(m)
+
+    t2 = tempfile.TemporaryDirectory()
+    w = Writer(output_path=t2.name)
+    w.classify(m)
+    scans = []
+    monkeypatch.setattr(Store, "models", property(lambda self: scans.append(self) or tuple(self.model_store)))
+    w.write_equipment_file(m)
+    w.write_load_file(m)
+    w.write_network_file(m)
+    w.close_spools()
+    assert scans == []
+    assert w.spools == []
+
+    for name in ["network.txt", "equipment.txt", "loads.txt"]:
+        assert read(os.path.join(t2.name, name)) == read(os.path.join(t1.name, name))
+
+
+def test_insolation_column_file(monkeypatch):
+    """
+    Tests that a column file profile shared by several PVs is exported once, without overwriting other files.
+    """
+    import tempfile
+    import numpy as np
+    from ditto.models.feeder_metadata import Feeder_metadata
+    from ditto.models.node import Node
+    from ditto.models.photovoltaic import Photovoltaic
+    from ditto.models.timeseries import Timeseries
+    from ditto.timeseries.backend import ColumnFile
+
+    t = tempfile.TemporaryDirectory()
+    ColumnFile.write(os.path.join(t.name, "profiles.bin"), {"sun": np.linspace(0, 1, 24)})
+    with open(os.path.join(t.name, "sun.csv"), "w") as f:
+        f.write("user data\n")
+
+    m = Store()
+    Node(m, name="n1", feeder_name="f1", nominal_voltage=12470)
+    Feeder_metadata(m, name="f1", headnode="n1", nominal_voltage=12470)
+    sun = Timeseries(m, data_label="sun", data_file="profiles.bin", data_key="sun", interval=1.0)
+    for k in range(3):
+        Photovoltaic(
+            m,
+            name="pv{}".format(k),
+            connecting_element="n1",
+            feeder_name="f1",
+            rated_power=10,
+            active_rating=10,
+            timeseries=[sun],
+        )
+    m.set_names()
+
+    exports = []
+    export_csv = ColumnFile.export_csv
+    monkeypatch.setattr(
+        ColumnFile,
+        "export_csv",
+        lambda self, key, path: exports.append(path) or export_csv(self, key, path),
+    )
+    w = Writer(output_path=t.name)
+    w.write(m)
+    # The spools of the sections are closed once the network file is written
+    assert w.spools == []
+    assert w.node_string_list._file.closed
+
+    assert len(exports) == 1
+    location = w.irradiance_profiles["sun"]
+    assert location.startswith("sun_") and location.endswith(".csv")
+    with open(os.path.join(t.name, "sun.csv"), "r") as f:
+        assert f.read() == "user data\n"
+    np.testing.assert_allclose(
+        np.loadtxt(os.path.join(t.name, location)), np.linspace(0, 1, 24), rtol=1e-6
+    )
+    with open(os.path.join(t.name, "equipment.txt"), "r") as f:
+        assert "sun,1,{}".format(location) in f.read()
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+"""
+test_dew_database
+----------------------------------
+
+Tests for the equipment database of the DEW reader
+"""
+import os
+import tempfile
+
+import numpy as np
+import pytest
+
+from ditto.readers.dew import database
+from ditto.readers.dew.database import DEWDatabase, _to_array
+
+
+def columns():
+    return {
+        "PTXFRM_IPTROW": _to_array([12.0, 13.0, 12.0]),
+        "PTXFRM_STNAM": _to_array(["xfmr_a", "xfmr_b", 3.5]),
+        "PTXFRM_DSECKV": _to_array([0.24, 0.48, 0.12]),
+    }
+
+
+def test_index():
+    db = DEWDatabase(columns())
+    assert db["PTXFRM_IPTROW"].dtype == np.float64
+    assert db["PTXFRM_STNAM"].dtype == object
+    assert "PTXFRM_DSECKV" in db
+
+    # Same result as list.index: the first occurrence
+    assert db.index("PTXFRM_IPTROW", 12.0) == 0
+    assert db.index("PTXFRM_IPTROW", 13) == 1
+    assert db.index("PTXFRM_STNAM", 3.5) == 2
+    with pytest.raises(ValueError):
+        db.index("PTXFRM_IPTROW", 14.0)
+    with pytest.raises(ValueError):
+        db.index("PTXFRM_STNAM", ["unhashable"])
+
+
+def test_load(monkeypatch):
+    t = tempfile.TemporaryDirectory()
+    monkeypatch.setenv("DITTO_CACHE_DIR", os.path.join(t.name, "cache"))
+    monkeypatch.setattr(database, "_DATABASES", {})
+    workbook = os.path.join(t.name, "DataBase.xlsx")
+    with open(workbook, "w") as f:
+        f.write("workbook")
+
+    reads = []
+
+    def read_workbook(path):
+        reads.append(path)
+        return columns()
+
+    monkeypatch.setattr(DEWDatabase, "_read_workbook", staticmethod(read_workbook))
+
+    db = DEWDatabase.load(workbook)
+    assert DEWDatabase.load(workbook) is db
+    # The cache is in the cache directory, not next to the workbook
+    assert sorted(os.listdir(t.name)) == ["DataBase.xlsx", "cache"]
+    assert os.path.dirname(DEWDatabase.cache_path(workbook)) == os.path.join(t.name, "cache", "dew")
+    assert os.path.isfile(DEWDatabase.cache_path(workbook))
+
+    # A new process reads the cache instead of the workbook
+    monkeypatch.setattr(database, "_DATABASES", {})
+    cached = DEWDatabase.load(workbook)
+    assert len(reads) == 1
+    assert sorted(cached.columns) == sorted(db.columns)
+    np.testing.assert_array_equal(cached["PTXFRM_IPTROW"], [12.0, 13.0, 12.0])
+    assert cached["PTXFRM_STNAM"].tolist() == ["xfmr_a", "xfmr_b", 3.5]
+    assert cached.index("PTXFRM_STNAM", 3.5) == 2
+
+    # A cache that cannot be read is ignored
+    for content in [b"garbage", b""]:
+        monkeypatch.setattr(database, "_DATABASES", {})
+        with open(DEWDatabase.cache_path(workbook), "wb") as f:
+            f.write(content)
+        assert DEWDatabase.load(workbook)["PTXFRM_DSECKV"].tolist() == [0.24, 0.48, 0.12]
+    assert len(reads) == 3
+
+    # The workbook is read again when it is modified
+    monkeypatch.setattr(database, "_DATABASES", {})
+    mtime = os.path.getmtime(workbook) + 10
+    os.utime(workbook, (mtime, mtime))
+    DEWDatabase.load(workbook)
+    assert len(reads) == 4
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+"""
+test_gridlabd_format
+----------------------------------
+
+Tests for the GridLAB-D object classes generated from the schema
+"""
+import pytest as pt
+
+from ditto.formats.gridlabd import gridlabd
+from ditto.formats.gridlabd.base import GridLABDBase
+
+
+def test_property_names():
+    """
+    Tests that the objects accept the properties of their class and of all its parents.
+    """
+    names = set()
+    for c in gridlabd.overhead_line.mro():
+        names.update(p["name"] for p in getattr(c, "_properties", []))
+    assert gridlabd.overhead_line._property_names == names
+    assert {"length", "from", "phases", "name"} <= names
+    assert "length" not in gridlabd.link._property_names
+
+    line = gridlabd.overhead_line(name="l1", length=100)
+    line["from"] = "n1"
+    assert (line["name"], line["length"], line["from"]) == ("l1", 100, "n1")
+    with pt.raises(AttributeError):
+        line["not_a_property"] = 1
+    with pt.raises(AttributeError):
+        line["phases"]
+
+
+def test_property_names_outside_schema():
+    """
+    Tests that a class built outside the schema indexes its properties on first instantiation.
+    """
+    parent = type("parent", (GridLABDBase,), dict(_properties=[{"name": "a"}]))
+    child = type("child", (parent,), dict(_properties=[{"name": "b"}]))
+    obj = child(a=1, b=2)
+    assert child._property_names == frozenset(["a", "b"])
+    assert (obj["a"], obj["b"]) == (1, 2)
+    # The parent has its own index, without the properties of the child
+    parent(a=1)
+    assert parent._property_names == frozenset(["a"])
+    with pt.raises(AttributeError):
+        parent(b=1)
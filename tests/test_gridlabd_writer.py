@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+"""
+test_gridlabd_writer
+----------------------------------
+
+Tests for gridlabd writer
+"""
+import io
+import os
+import six
+
+if six.PY2:
+    from backports import tempfile
+else:
+    import tempfile
+import pytest as pt
+from ditto.store import Store
+from ditto.writers.gridlabd.write import Writer, format_impedance, phase_indices
+
+
+def test_format_impedance():
+    """
+    Tests the formatting of the complex impedances.
+    """
+    assert format_impedance(complex(0.3, 0.6)) == "0.3+0.6j"
+    assert format_impedance(complex(0.3, -0.6)) == "0.3-0.6j"
+    assert format_impedance(complex(0, 0.6)) == "0+0.6j"
+    assert format_impedance(complex(0, 1e-05)) == "0+1e-05j"
+    assert format_impedance(complex(0, 1e-05) * -1) == "-0-1e-05j"
+
+
+def test_phase_indices():
+    """
+    Tests the rows of the impedance matrix used by the phases of a line.
+    """
+    assert phase_indices(["A", "C"], 3) == ([1, 3], [0, 2])
+    assert phase_indices(["B"], 1) == ([2], [0])
+    assert phase_indices(["1", "2"], 2) == ([1, 2], [0, 1])
+
+
+def test_line_configurations():
+    """
+    Tests that lines with the same phases and impedances share a configuration.
+    """
+    from ditto.models.line import Line
+    from ditto.models.wire import Wire
+
+    m = Store()
+    z = [[complex(0.3, 0.6), complex(0.1, 0.2)], [complex(0.1, 0.2), 0.6j]]
+    for name, phases, matrix in [
+        ("l1", ["A", "B"], z),
+        ("l2", ["B", "A"], [list(row) for row in z]),
+        ("l3", ["A", "B"], [[complex(0.3, 0.6000001), complex(0.1, 0.2)], z[1]]),
+        ("l4", ["C"], [[complex(0.3, 0.6)]]),
+    ]:
+        Line(
+            m,
+            name=name,
+            wires=[Wire(m, phase=p) for p in phases + ["N"]],
+            impedance_matrix=matrix,
+        )
+
+    writer = Writer(output_path=".")
+    writer.write_wires = False
+    writer.impedance_decimals = None
+    fp = io.StringIO()
+    writer.write_line_configurations(m, fp)
+
+    assert writer.line_configurations_name == {
+        "l1": "line_config_1",
+        "l2": "line_config_1",
+        "l3": "line_config_2",
+        "l4": "line_config_3",
+    }
+    assert fp.getvalue().split("};\n\n")[0] == (
+        "object line_configuration {\n"
+        "    z11 0.3+0.6j;\n"
+        "    z12 0.1+0.2j;\n"
+        "    z21 0.1+0.2j;\n"
+        "    z22 0+0.6j;\n"
+        "    name line_config_1;\n"
+    )
+    assert "    z33 0.3+0.6j;\n" in fp.getvalue()
+
+    # Rounding the impedances merges the first three lines
+    writer.impedance_decimals = 4
+    writer.line_configurations = {}
+    writer.line_configurations_name = {}
+    writer.write_line_configurations(m, io.StringIO())
+    assert writer.line_configurations_name["l3"] == "line_config_1"
+
+
+def test_separate_feeders():
+    """
+    Tests the writing of the feeders in separate folders, included by Model.glm.
+    """
+    from ditto.models.node import Node
+    from ditto.models.line import Line
+    from ditto.models.wire import Wire
+
+    m = Store()
+    for feeder in ["f1", "f2"]:
+        Node(m, name=feeder + "_n1", feeder_name=feeder)
+        Node(m, name=feeder + "_n2", feeder_name=feeder)
+        Line(
+            m,
+            name=feeder + "_l1",
+            from_element=feeder + "_n1",
+            to_element=feeder + "_n2",
+            wires=[Wire(m, phase="A")],
+            impedance_matrix=[[complex(0.3, 0.6)]],
+            feeder_name=feeder,
+        )
+
+    t = tempfile.TemporaryDirectory()
+    Writer(output_path=t.name).write(m, separate_feeders=True, max_workers=2)
+
+    with open(os.path.join(t.name, "Model.glm"), "r") as fp:
+        includes = [l for l in fp.readlines() if l.startswith("#include")]
+    assert includes == [
+        '#include "line_configurations.glm"\n',
+        '#include "f1/nodes.glm"\n',
+        '#include "f1/lines.glm"\n',
+        '#include "f2/nodes.glm"\n',
+        '#include "f2/lines.glm"\n',
+    ]
+    assert not os.path.exists(os.path.join(t.name, "DEFAULT"))
+    with open(os.path.join(t.name, "f2", "lines.glm"), "r") as fp:
+        lines = fp.read()
+    assert "name nf2_l1;" in lines
+    assert "configuration line_config_1;" in lines
@@ -76,3 +76,95 @@ def test_metric_extraction():
 
         # Export them to JSON
         net.export_json(os.path.join(output_path, "metrics.json"))
+
+
+def test_parallel_metric_extraction_per_feeder():
+    """
+        Splits the IEEE 13 node feeder in two feeders and checks that computing the
+        metrics per feeder in worker processes gives the same results as the serial computation.
+    """
+    import json_tricks
+    import networkx as nx
+    from ditto.readers.opendss.read import Reader
+    from ditto.store import Store
+    from ditto.modify.system_structure import system_structure_modifier
+    from ditto.metrics.network_analysis import NetworkAnalyzer as network_analyzer
+
+    m = Store()
+    r = Reader(
+        master_file=os.path.join(
+            current_directory, "data/small_cases/opendss/ieee_13node/master.dss"
+        ),
+        buscoordinates_file=os.path.join(
+            current_directory, "data/small_cases/opendss/ieee_13node/buscoord.dss"
+        ),
+    )
+    r.parse(m)
+    m.set_names()
+
+    modifier = system_structure_modifier(m)
+    modifier.set_nominal_voltages_recur()
+    modifier.set_nominal_voltages_recur_line()
+
+    net = network_analyzer(modifier.model, True, "sourcebus")
+    net.model.set_names()
+
+    # Split the network at the substation transformer
+    graph = net.G.graph.copy()
+    graph.remove_edge("sourcebus", "650")
+    feeder_nodes = [
+        list(nx.node_connected_component(graph, "sourcebus")),
+        list(nx.node_connected_component(graph, "650")),
+    ]
+    net.add_feeder_information(
+        ["feeder_1", "feeder_2"],
+        feeder_nodes,
+        {"feeder_1": "sourcebus", "feeder_2": "650"},
+        "urban",
+    )
+    net.split_network_into_feeders()
+
+    outputs = []
+    for max_workers in (1, 2):
+        net.points = {}
+        net.compute_all_metrics_per_feeder(max_workers=max_workers)
+        outputs.append(
+            (
+                json_tricks.dumps(net.results, sort_keys=True, allow_nan=True),
+                net.load_distribution,
+                net.points,
+            )
+        )
+    assert outputs[0] == outputs[1]
+
+
+def test_impedance_between_nodes():
+    """
+        Checks that the impedance between two nodes read from the rooted tree index is the sum
+        of the impedances of the lines on the path between them.
+    """
+    import itertools
+    from ditto.readers.opendss.read import Reader
+    from ditto.store import Store
+    from ditto.metrics.network_analysis import NetworkAnalyzer as network_analyzer
+
+    m = Store()
+    r = Reader(
+        master_file=os.path.join(
+            current_directory, "data/small_cases/opendss/ieee_13node/master.dss"
+        ),
+        buscoordinates_file=os.path.join(
+            current_directory, "data/small_cases/opendss/ieee_13node/buscoord.dss"
+        ),
+    )
+    r.parse(m)
+    m.set_names()
+
+    net = network_analyzer(m, True, "sourcebus")
+    net.compute_node_line_mapping()
+    nodes = ["sourcebus", "650", "632", "671", "675", "652", "611", "692"]
+    for node1, node2 in itertools.combinations(nodes, 2):
+        expected = sum(net.get_impedance_list_between_nodes(net.G.graph, node1, node2))
+        assert net.get_impedance_between_nodes(node1, node2) == pytest.approx(expected)
+    assert net.get_impedance_between_nodes("671", "671") == 0
+    assert abs(net.get_impedance_between_nodes("650", "675")) > 0
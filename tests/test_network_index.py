@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+"""
+test_network_index
+----------------------------------
+
+Tests the indexes of the Network against walks of the digraph.
+"""
+import os
+
+import networkx as nx
+import pytest
+
+current_directory = os.path.realpath(os.path.dirname(__file__))
+
+
+def walk_upstream(digraph, node):
+    lines = []
+    predecessors = list(digraph.predecessors(node))
+    while predecessors:
+        data = digraph[predecessors[0]][node]
+        if data.get("equipment") == "PowerTransformer":
+            return data["equipment_name"], lines
+        if data.get("equipment") == "Line":
+            lines.append(data["equipment_name"])
+        node = predecessors[0]
+        predecessors = list(digraph.predecessors(node))
+    return None, lines
+
+
+def read_ieee_13node():
+    from ditto.readers.opendss.read import Reader
+    from ditto.store import Store
+
+    m = Store()
+    r = Reader(
+        master_file=os.path.join(
+            current_directory, "data/small_cases/opendss/ieee_13node/master.dss"
+        ),
+        buscoordinates_file=os.path.join(
+            current_directory, "data/small_cases/opendss/ieee_13node/buscoord.dss"
+        ),
+    )
+    r.parse(m)
+    m.set_names()
+    m.build_networkx("sourcebus")
+    return m
+
+
+def test_upstream_transformer_index():
+    m = read_ieee_13node()
+    network = m._network
+
+    transformers = set()
+    for node in network.digraph.nodes():
+        transformer, lines = walk_upstream(network.digraph, node)
+        assert network.get_upstream_transformer(m, node) == transformer
+        assert network.get_upstream_lines(node) == lines
+        transformers.add(transformer)
+    assert len(transformers - {None}) > 1
+
+    # The index follows the modifications of the graphs made through the Network
+    network.rebuild_digraph(m, source="sourcebus")
+    assert network._upstream_index is None
+
+
+def test_subtree_index():
+    m = read_ieee_13node()
+    network = m._network
+    equipment_name = nx.get_edge_attributes(network.graph, "equipment_name")
+
+    nodes = list(network.digraph.nodes())
+    result = network.get_all_elements_downstream_batch(m, nodes)
+    for node in nodes:
+        expected = set()
+        for source, destinations in nx.dfs_successors(network.digraph, node).items():
+            expected.add(source)
+            for destination in destinations:
+                expected.add(destination)
+                if (source, destination) in equipment_name:
+                    expected.add(equipment_name[(source, destination)])
+                elif (destination, source) in equipment_name:
+                    expected.add(equipment_name[(destination, source)])
+        assert set(obj.name for obj in result[node]) == expected
+        assert len(result[node]) == len(expected)
+
+        index = network.subtree_index()
+        for other in nodes:
+            assert index.is_downstream(other, node) == (
+                other == node or other in nx.descendants(network.digraph, node)
+            )
+
+
+def test_break_cycles_meshed():
+    from ditto.network.network import Network
+
+    graph = nx.grid_2d_graph(30, 30)
+    for node in graph.nodes():
+        graph.nodes[node]["phases"] = ["A"] if (node[0] + node[1]) % 3 else ["A", "B", "C"]
+    for u, v in graph.edges():
+        graph[u][v]["equipment_name"] = "line_{}_{}".format(u, v)
+    n_loops = graph.number_of_edges() - graph.number_of_nodes() + 1
+
+    network = Network()
+    network.provide_graphs(graph, nx.DiGraph())
+    removed = network.break_cycles()
+    assert len(removed) == n_loops
+    assert len(set(removed)) == n_loops
+    assert nx.is_tree(network.graph)
+
+
+def test_delete_cycles():
+    from ditto.readers.opendss.read import Reader
+    from ditto.store import Store
+
+    folder = os.path.join(
+        current_directory, "data/small_cases/opendss_broken/ieee_13node_loop"
+    )
+    m = Store()
+    r = Reader(
+        master_file=os.path.join(folder, "master.dss"),
+        buscoords_file=os.path.join(folder, "buscoords.dss"),
+    )
+    r.parse(m)
+    n_models = len(m.models)
+    m.build_networkx("sourcebus")
+    assert len(nx.cycle_basis(m._network.graph)) == 1
+
+    m.delete_cycles()
+    assert nx.cycle_basis(m._network.graph) == []
+    assert len(m.models) < n_models
+
+
+def test_rooted_tree_without_root():
+    from ditto.network.network import Network
+
+    network = Network()
+    network.provide_graphs(nx.Graph([(1, 2)]), nx.DiGraph([(1, 2)]))
+    assert network.rooted_tree().root == 1
+
+    # No node without a parent to root the tree at
+    for digraph in [nx.DiGraph(), nx.DiGraph([(1, 2), (2, 1)])]:
+        network.provide_graphs(nx.Graph(digraph), digraph)
+        with pytest.raises(ValueError):
+            network.rooted_tree()
@@ -14,6 +14,7 @@ import six
 import tempfile
 import pytest
 import pytest as pt
+import pandas as pd
 
 logger = logging.getLogger(__name__)
 
@@ -220,3 +221,135 @@ def test_write_linecodes():
     output_path = tempfile.gettempdir()
     w = Writer(output_path=output_path)
     w.write_linecodes([line])
+
+
+def test_write_timeseries():
+    """Tests that the loadshapes are written with the number of points of their data."""
+    from ditto.writers.opendss.write import Writer
+    from ditto.models.timeseries import Timeseries
+    from ditto.store import Store
+
+    output_path = tempfile.TemporaryDirectory()
+    with open(os.path.join(output_path.name, "residential.csv"), "w") as f:
+        f.write("\n".join("0.5" for _ in range(24)) + "\n")
+    for name in ["commercial.csv", "industrial.csv"]:
+        with open(os.path.join(output_path.name, name), "w") as f:
+            f.write("\n".join("0.5" for _ in range(8760)) + "\n")
+
+    m = Store()
+    for label, location, scale_factor in [
+        ("residential", "residential.csv", 1),
+        ("commercial", "commercial.csv", 1),
+        ("industrial", "industrial.csv", 2),
+    ]:
+        Timeseries(
+            m,
+            data_label=label,
+            data_location=location,
+            interval=1.0,
+            scale_factor=scale_factor,
+        )
+
+    w = Writer(output_path=output_path.name)
+    w.write_timeseries(m)
+    assert w.timeseries_format == {
+        "residential": "daily",
+        "commercial": "yearly",
+        "industrial_scaled": "yearly",
+    }
+    assert w.timeseries_solve_format == "yearly"
+    assert w.timeseries_iternumber == 24
+
+    with open(os.path.join(output_path.name, "LoadShapes.dss"), "r") as f:
+        loadshapes = f.read()
+    assert "New Loadshape.residential npts= 24 interval=1.0" in loadshapes
+    assert "New Loadshape.commercial npts= 8760 interval=1.0" in loadshapes
+    assert "New Loadshape.industrial_scaled npts= 8760" in loadshapes
+    assert "mult = (file=industrial__scaled200.csv)" in loadshapes
+    with open(os.path.join(output_path.name, "industrial__scaled200.csv"), "r") as f:
+        assert f.readline() == "1.0\n"
+
+
+def test_write_timeseries_duplicates():
+    """Tests that identical profiles are written as a single loadshape."""
+    from ditto.writers.opendss.write import Writer
+    from ditto.models.timeseries import Timeseries
+    from ditto.store import Store
+
+    output_path = tempfile.TemporaryDirectory()
+    for name in ["a.csv", "b.csv"]:
+        with open(os.path.join(output_path.name, name), "w") as f:
+            f.write("\n".join("0.5" for _ in range(24)) + "\n")
+
+    m = Store()
+    on_disk = [
+        Timeseries(m, data_label="a", data_location="a.csv", interval=1.0),
+        Timeseries(m, data_label="b", data_location="b.csv", interval=1.0),
+    ]
+    in_memory = [
+        Timeseries(m, data_label=label, data=pd.DataFrame({"p": [1.0] * 24}), interval=1.0)
+        for label in ["m1", "m2"]
+    ]
+    # Same values as the files on disk, and a scale factor of None is the same as 1
+    same_as_disk = Timeseries(
+        m, data_label="m3", data=pd.DataFrame({"p": [0.5] * 24}), interval=1.0, scale_factor=None
+    )
+
+    w = Writer(output_path=output_path.name)
+    w.write_timeseries(m)
+    with open(os.path.join(output_path.name, "LoadShapes.dss"), "r") as f:
+        loadshapes = f.read()
+    assert loadshapes.count("New Loadshape.") == 2
+    assert "New Loadshape.a npts= 24" in loadshapes
+    assert "New Loadshape.m1 npts= 24" in loadshapes
+
+    datasets = w.timeseries_datasets["DEFAULT_DEFAULT"]
+    assert [datasets[w.loadshape_location(ts)] for ts in on_disk + in_memory + [same_as_disk]] == [
+        "a",
+        "a",
+        "m1",
+        "m1",
+        "a",
+    ]
+    # The in-memory profiles are written to a single file
+    assert w.loadshape_location(in_memory[0]) == w.loadshape_location(in_memory[1])
+
+
+def test_write_timeseries_column_file():
+    """Tests that the profiles of a column file are copied to binary loadshapes."""
+    from ditto.writers.opendss.write import Writer
+    from ditto.models.timeseries import Timeseries
+    from ditto.timeseries.backend import ColumnFile
+    from ditto.store import Store
+    import numpy as np
+
+    output_path = tempfile.TemporaryDirectory()
+    ColumnFile.write(
+        os.path.join(output_path.name, "profiles.bin"),
+        {"residential": np.full(8760, 0.5), "commercial": np.full(24, 0.25)},
+    )
+    m = Store()
+    residential = Timeseries(
+        m, data_label="residential", data_file="profiles.bin", data_key="residential", interval=1.0
+    )
+    commercial = Timeseries(
+        m,
+        data_label="commercial",
+        data_file="profiles.bin",
+        data_key="commercial",
+        interval=1.0,
+        scale_factor=2,
+    )
+
+    w = Writer(output_path=output_path.name)
+    w.write_timeseries(m)
+    with open(os.path.join(output_path.name, "LoadShapes.dss"), "r") as f:
+        loadshapes = f.read()
+    location = w.loadshape_location(residential)
+    assert location.endswith(".sng")
+    assert "New Loadshape.residential npts= 8760 interval=1.0 mult = (sngfile={})".format(location) in loadshapes
+    assert "New Loadshape.commercial_scaled npts= 24" in loadshapes
+
+    scaled = w.loadshape_location(commercial)[:-4] + "__scaled200.sng"
+    assert "mult = (sngfile={})".format(scaled) in loadshapes
+    assert list(np.fromfile(os.path.join(output_path.name, scaled), dtype=np.float32)) == [0.5] * 24
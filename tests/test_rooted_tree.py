@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+"""
+test_rooted_tree
+----------------------------------
+
+Tests that the RootedTree index agrees with networkx on random radial networks.
+"""
+import random
+
+import networkx as nx
+import pytest
+
+from ditto.network.tree import RootedTree
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_rooted_tree_matches_networkx(seed, weighted_tree):
+    graph = weighted_tree(200, seed)
+    digraph = nx.DiGraph(list(nx.bfs_edges(graph, 0)))
+    tree = RootedTree(digraph, 0, graph=graph)
+    assert len(tree) == graph.number_of_nodes()
+
+    rng = random.Random(seed)
+    for _ in range(50):
+        a, b = rng.randrange(200), rng.randrange(200)
+        assert tree.path(a, b) == nx.shortest_path(graph, a, b)
+        assert tree.distance(a, b) == pytest.approx(
+            nx.dijkstra_path_length(graph, a, b, weight="length")
+        )
+        assert tree.lowest_common_ancestor(a, b) == nx.lowest_common_ancestor(
+            digraph, a, b
+        )
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+"""
+test_timeseries_backend
+----------------------------------
+
+Tests for the memory-mapped column files of the timeseries
+"""
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ditto.models.timeseries import Timeseries
+from ditto.store import Store
+from ditto.timeseries.backend import ColumnFile, binary_extension, timeseries_values
+from ditto.timeseries.metadata import MetadataCache
+from ditto.timeseries.registry import profile_digest
+
+
+def test_column_file():
+    t = tempfile.TemporaryDirectory()
+    path = os.path.join(t.name, "profiles.bin")
+    residential = np.linspace(0, 1, 96)
+    ColumnFile.write(path, [("residential", residential), ("flat", np.ones(24))])
+
+    column_file = ColumnFile(path)
+    assert sorted(column_file.keys()) == ["flat", "residential"]
+    assert (column_file.dtype, column_file.length("flat")) == (np.float32, 24)
+    values = column_file.array("residential")
+    assert isinstance(values, np.memmap)
+    np.testing.assert_allclose(values, residential, rtol=1e-6)
+
+    # The copy is a binary loadshape file with the raw values of the profile
+    sng = os.path.join(t.name, "residential" + binary_extension(column_file.dtype))
+    column_file.copy_to("residential", sng)
+    assert sng.endswith(".sng")
+    np.testing.assert_array_equal(np.fromfile(sng, dtype=np.float32), values)
+    assert MetadataCache().get(sng).npoints == 96
+
+    csv = os.path.join(t.name, "flat.csv")
+    column_file.export_csv("flat", csv)
+    assert list(pd.read_csv(csv, header=None)[0]) == [1.0] * 24
+
+    with pytest.raises(ValueError):
+        ColumnFile.write(path, [("a", [1.0]), ("a", [2.0])])
+
+
+def test_timeseries_values():
+    t = tempfile.TemporaryDirectory()
+    ColumnFile.write(
+        os.path.join(t.name, "profiles.bin"), {"a": [1.0, 2.0], "b": [1.0, 2.0]}, dtype="float64"
+    )
+    m = Store()
+    a = Timeseries(m, data_file="profiles.bin", data_key="a")
+    b = Timeseries(m, data_file="profiles.bin", data_key="b")
+    in_memory = Timeseries(m, data=pd.DataFrame({"p": [1.0, 2.0]}))
+
+    assert list(timeseries_values(a, t.name)) == [1.0, 2.0]
+    assert list(timeseries_values(in_memory)) == [1.0, 2.0]
+    assert timeseries_values(Timeseries(m)) is None
+    assert profile_digest(a, t.name) == profile_digest(b, t.name)
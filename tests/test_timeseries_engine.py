@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+"""
+test_timeseries_engine
+----------------------------------
+
+Tests for the batch transformations of the timeseries
+"""
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ditto.models.timeseries import Timeseries
+from ditto.store import Store
+from ditto.timeseries.backend import INDEX_SUFFIX, ColumnFile, timeseries_values
+from ditto.timeseries.engine import TimeseriesEngine, aggregate, clip, resample, scale
+
+
+def test_array_functions():
+    values = np.arange(16, dtype=float).reshape(2, 8)
+
+    np.testing.assert_array_equal(scale(values, [1, 2])[:, 1], [1, 18])
+    np.testing.assert_array_equal(scale(values, 0.5)[0, :2], [0, 0.5])
+
+    # 15 minute data to hourly data
+    np.testing.assert_array_equal(resample(values, 0.25, 1), [[1.5, 5.5], [9.5, 13.5]])
+    np.testing.assert_array_equal(resample(values, 0.25, 1, how="sum")[0], [6, 22])
+    np.testing.assert_array_equal(resample(values[:, :2], 1, 0.5)[0], [0, 0, 1, 1])
+    np.testing.assert_array_equal(resample(values[:, :2], 1, 0.5, how="sum")[1], [4, 4, 4.5, 4.5])
+    with pytest.raises(ValueError):
+        resample(values, 1, 3)
+    with pytest.raises(ValueError):
+        resample(values, 1, 1.5)
+
+    np.testing.assert_array_equal(clip(values, 0.25, 0.5, 1.25)[0], [2, 3, 4])
+    assert clip(values, 0.25, stop=10).shape == (2, 8)
+
+    labels, sums = aggregate(np.vstack([values, values]), ["f2", "f1", "f2", "f1"])
+    assert labels == ["f2", "f1"]
+    np.testing.assert_array_equal(sums, 2 * values)
+
+
+def test_engine():
+    t = tempfile.TemporaryDirectory()
+    ColumnFile.write(
+        os.path.join(t.name, "profiles.bin"),
+        {"residential": np.tile([1.0, 3.0], 48), "commercial": np.ones(96)},
+    )
+    with open(os.path.join(t.name, "hourly.csv"), "w") as f:
+        f.write("\n".join("2.0" for _ in range(24)) + "\n")
+
+    m = Store()
+    r1 = Timeseries(m, data_label="r1", data_file="profiles.bin", data_key="residential", interval=0.25, feeder_name="f1")
+    r2 = Timeseries(m, data_label="r2", data_file="profiles.bin", data_key="residential", interval=0.25, feeder_name="f2", scale_factor=2)
+    c = Timeseries(m, data_label="c", data_file="profiles.bin", data_key="commercial", interval=0.25, feeder_name="f2")
+    h = Timeseries(m, data_label="h", data_location="hourly.csv", interval=1.0, feeder_name="f1")
+    Timeseries(m, data_label="empty")
+
+    engine = TimeseriesEngine(m, base_path=t.name)
+    assert len(engine) == 4
+    assert [(len(g.timeseries), g.interval, g.length) for g in engine.groups] == [
+        (3, 0.25, 96),
+        (1, 1.0, 24),
+    ]
+
+    stacks = list(engine.transform(interval=1.0, start=6, stop=12))
+    assert [s.values.shape for s in stacks] == [(3, 6), (1, 6)]
+    np.testing.assert_array_equal(stacks[0].values[:, 0], [2, 4, 1])
+
+    feeders = engine.aggregate("feeder_name", interval=1.0)
+    assert list(feeders) == ["f1", "f2"]
+    np.testing.assert_array_equal(feeders["f1"], [4.0] * 24)
+    np.testing.assert_array_equal(feeders["f2"], [5.0] * 24)
+    with pytest.raises(ValueError):
+        engine.aggregate("feeder_name")
+    assert list(engine.aggregate("data_label", scale_factors=False)) == ["r1", "r2", "c", "h"]
+
+    # The scale factors and the new interval are stored in the column file used by the Timeseries
+    engine.apply("hourly.bin", interval=1.0)
+    # The column file is referenced by its absolute path, since the writers resolve data_file from their output_path
+    path = os.path.abspath(os.path.join(t.name, "hourly.bin"))
+    assert (r2.data_file, r2.data_key, r2.interval, r2.scale_factor) == (path, "r2", 1.0, 1)
+    assert h.data_location is None
+    np.testing.assert_array_equal(timeseries_values(r2), [4.0] * 24)
+    np.testing.assert_array_equal(timeseries_values(c, "elsewhere"), [1.0] * 24)
+    assert [(len(g.timeseries), g.interval, g.length) for g in engine.groups] == [(4, 1.0, 24)]
+    np.testing.assert_array_equal(engine.aggregate("feeder_name")["f2"], [5.0] * 24)
+
+
+def test_engine_chunks(monkeypatch):
+    monkeypatch.setattr("ditto.timeseries.engine.CHUNK_POINTS", 10)
+    m = Store()
+    for k in range(5):
+        Timeseries(m, data_label="p", data=pd.DataFrame({"p": [float(k)] * 4}), feeder_name="f")
+
+    engine = TimeseriesEngine(m)
+    assert [s.values.shape for s in engine.stacks()] == [(2, 4), (2, 4), (1, 4)]
+    np.testing.assert_array_equal(engine.aggregate()["f"], [10.0] * 4)
+
+    # The labels are made unique in the column file, including against the generated ones
+    Timeseries(m, data_label="p_2", data=pd.DataFrame({"p": [9.0] * 4}))
+    t = tempfile.TemporaryDirectory()
+    column_file = TimeseriesEngine(m, base_path=t.name).apply("profiles.bin")
+    assert list(column_file.keys()) == ["p", "p_2", "p_3", "p_4", "p_5", "p_2_2"]
+
+
+def test_engine_apply_in_place():
+    t = tempfile.TemporaryDirectory()
+    ColumnFile.write(
+        os.path.join(t.name, "p.bin"),
+        {"a": np.tile([1.0, 3.0], 4), "b": np.arange(8.0)},
+    )
+    m = Store()
+    a = Timeseries(m, data_label="a", data_file="p.bin", data_key="a", interval=0.5, scale_factor=2)
+    b = Timeseries(m, data_label="b", data_file="p.bin", data_key="b", interval=0.5)
+
+    # The column file read by the Timeseries is only replaced once all its profiles are read
+    TimeseriesEngine(m, base_path=t.name).apply("p.bin", interval=1.0)
+    np.testing.assert_array_equal(timeseries_values(a), [4.0] * 4)
+    np.testing.assert_array_equal(timeseries_values(b), [0.5, 2.5, 4.5, 6.5])
+    assert sorted(os.listdir(t.name)) == ["p.bin", "p.bin" + INDEX_SUFFIX]
+
+
+def test_engine_shared_data():
+    m = Store()
+    data = pd.DataFrame({"p": [1.0, 2.0]})
+    a = Timeseries(m, data_label="a", data=data)
+    b = Timeseries(m, data_label="b", data=data)
+
+    t = tempfile.TemporaryDirectory()
+    column_file = TimeseriesEngine(m, base_path=t.name).apply("profiles.bin", dtype="float64")
+    # Timeseries with the same data and scale factor share their profile
+    assert list(column_file.keys()) == ["a"]
+    assert (a.data, a.data_key, b.data_key, b.interval) == (None, "a", "a", 1.0)
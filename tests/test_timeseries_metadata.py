@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+"""
+test_timeseries_metadata
+----------------------------------
+
+Tests for the metadata cache of the timeseries files
+"""
+import os
+import tempfile
+
+from ditto.timeseries.metadata import (
+    MetadataCache,
+    METADATA_SUFFIX,
+    column_range,
+    count_rows,
+)
+
+
+def test_count_rows():
+    assert count_rows(b"") == 0
+    assert count_rows(b"1.0\n2.0\n3.0") == 3
+    assert count_rows(b"1.0\n2.0\n3.0\n") == 3
+    assert count_rows(b"1.0,0.5\r\n2.0,0.5\r\n\r\n") == 2
+
+
+def test_column_range():
+    assert column_range(b"0.5\n-1.0\n2.0\n") == (-1.0, 2.0)
+    assert column_range(b"0.5,9\n-1.0,9\n") == (-1.0, 0.5)
+    assert column_range(b"mult\n1.0\n") == (None, None)
+    assert column_range(b"\n") == (None, None)
+
+
+def test_metadata_cache():
+    t = tempfile.TemporaryDirectory()
+    path = os.path.join(t.name, "daily.csv")
+    with open(path, "w") as f:
+        f.write("\n".join(str(x) for x in range(24)) + "\n")
+
+    cache = MetadataCache()
+    metadata = cache.get(path, interval=1.0, persist=True)
+    assert (metadata.npoints, metadata.format, metadata.interval) == (24, "daily", 1.0)
+    assert (metadata.minimum, metadata.maximum) == (0.0, 23.0)
+    assert os.path.isfile(path + METADATA_SUFFIX)
+
+    # A new cache reads the stored metadata instead of the data
+    assert MetadataCache().get(path) == metadata
+
+    # Modifying the file invalidates the entries
+    with open(path, "a") as f:
+        f.write("\n".join(str(x) for x in range(8760 - 24)) + "\n")
+    os.utime(path, (0, 0))
+    metadata = cache.get(path)
+    assert (metadata.npoints, metadata.format) == (8760, "yearly")
+    assert MetadataCache().get(path).npoints == 8760
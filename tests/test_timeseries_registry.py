@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+"""
+test_timeseries_registry
+----------------------------------
+
+Tests for the deduplication of the timeseries of a model
+"""
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from ditto.models.load import Load
+from ditto.models.timeseries import Timeseries
+from ditto.store import Store
+from ditto.timeseries.backend import ColumnFile
+from ditto.timeseries.registry import TimeseriesRegistry, profile_digest, profile_key
+
+
+def test_profile_digest():
+    m = Store()
+    t1 = Timeseries(m, data=pd.DataFrame({"p": [0.5, 1.0]}))
+    t2 = Timeseries(m, data=pd.DataFrame({"mult": [0.5, 1.0]}))
+    t3 = Timeseries(m, data=pd.DataFrame({"p": [1.0, 0.5]}))
+    assert profile_digest(t1) == profile_digest(t2)
+    assert profile_digest(t1) != profile_digest(t3)
+    assert profile_digest(Timeseries(m)) is None
+    assert profile_digest(Timeseries(m, data_location="missing.csv")) is None
+
+
+def test_profile_digest_sources():
+    t = tempfile.TemporaryDirectory()
+    with open(os.path.join(t.name, "p.csv"), "w") as f:
+        f.write("0.5\n1\n")
+    ColumnFile.write(os.path.join(t.name, "profiles.bin"), {"p": np.array([0.5, 1.0])}, dtype="float64")
+
+    # The same values hash the same in memory, in a csv file and in a column file
+    m = Store()
+    in_memory = Timeseries(m, data=pd.DataFrame({"p": [0.5, 1.0]}))
+    on_disk = Timeseries(m, data_location="p.csv", scale_factor=None)
+    column = Timeseries(m, data_file="profiles.bin", data_key="p")
+    digest = profile_digest(in_memory)
+    assert profile_digest(on_disk, t.name) == digest
+    assert profile_digest(column, t.name) == digest
+
+    # A scale factor of None is the same as 1
+    assert profile_key(digest, on_disk) == profile_key(digest, in_memory)
+    registry = TimeseriesRegistry(base_path=t.name)
+    assert registry.add(in_memory) is in_memory
+    assert registry.add(on_disk) is in_memory
+    assert registry.add(column) is in_memory
+
+
+def test_registry_shares_data():
+    m = Store()
+    t1 = Timeseries(m, data=pd.DataFrame({"p": [0.5, 1.0]}), interval=1.0)
+    t2 = Timeseries(m, data=pd.DataFrame({"p": [0.5, 1.0]}), interval=1.0)
+    t3 = Timeseries(m, data=pd.DataFrame({"p": [0.5, 1.0]}), interval=1.0, scale_factor=2)
+
+    registry = TimeseriesRegistry()
+    assert registry.add(t1) is t1
+    assert registry.add(t2) is t1
+    assert t2.data is t1.data
+    assert registry.add(t3) is t3
+    assert len(registry) == 2
+
+
+def test_deduplicate_timeseries():
+    t = tempfile.TemporaryDirectory()
+    for name in ["a.csv", "b.csv"]:
+        with open(os.path.join(t.name, name), "w") as f:
+            f.write("0.5\n1.0\n")
+
+    m = Store()
+    loads = []
+    for i, (location, feeder) in enumerate(
+        [("a.csv", "f1"), ("b.csv", "f1"), ("a.csv", "f1"), ("a.csv", "f2")]
+    ):
+        ts = Timeseries(
+            m, data_location=location, data_label="profile_%d" % i, feeder_name=feeder
+        )
+        loads.append(Load(m, name="load_%d" % i, timeseries=[ts]))
+    in_memory = [
+        Timeseries(m, data=pd.DataFrame({"p": [1.0, 2.0]}), feeder_name="f1")
+        for _ in range(3)
+    ]
+    loads.append(Load(m, name="load_4", timeseries=in_memory[:2]))
+    loads.append(Load(m, name="load_5", timeseries=in_memory[2:]))
+
+    in_memory[1].name = "duplicate"
+    m.set_names()
+    assert m["duplicate"] is in_memory[1]
+
+    assert m.deduplicate_timeseries(base_path=t.name) == 4
+    timeseries = [i for i in m.models if isinstance(i, Timeseries)]
+    assert len(timeseries) == 3
+    assert len(m.timeseries_registry) == 2
+    # The files with the same content are the same profile
+    assert [load.timeseries[0].data_label for load in loads[:4]] == [
+        "profile_0",
+        "profile_0",
+        "profile_0",
+        "profile_3",
+    ]
+    assert loads[4].timeseries == [in_memory[0], in_memory[0]]
+    assert loads[5].timeseries == [in_memory[0]]
+    # The removed duplicates cannot be found by name anymore
+    assert "duplicate" not in m.model_names
+    assert m["load_4"] is loads[4]
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+"""
+test_topology_metrics
+----------------------------------
+
+Tests that the radial topology metrics match the general networkx algorithms.
+"""
+import random
+
+import networkx as nx
+import pytest
+
+from ditto.metrics import topology
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_radial_metrics_match_networkx(seed, weighted_tree):
+    graph = weighted_tree(300, seed)
+    assert topology.is_radial(graph)
+
+    assert topology.diameter(graph) == nx.diameter(graph)
+    assert topology.average_path_length(graph) == pytest.approx(
+        nx.average_shortest_path_length(graph)
+    )
+    expected = nx.single_source_dijkstra_path_length(graph, 0, weight="length")
+    assert topology.max_distance_from_source(graph, 0) == pytest.approx(
+        max(expected.values())
+    )
+
+
+def test_meshed_network_falls_back_to_networkx(weighted_tree):
+    graph = weighted_tree(100, 3)
+    graph.add_edge(10, 90, length=1.0)
+    assert not topology.is_radial(graph)
+
+    assert topology.diameter(graph) == nx.diameter(graph)
+    assert topology.average_path_length(graph) == pytest.approx(
+        nx.average_shortest_path_length(graph)
+    )
+
+
+def test_unreachable_node_raises(weighted_tree):
+    graph = weighted_tree(10, 4)
+    graph.add_node("island")
+
+    with pytest.raises(nx.NetworkXNoPath):
+        topology.max_distance_from_source(graph, 0)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_connect_components(seed, weighted_tree):
+    graph = weighted_tree(300, seed)
+    graph.add_edges_from([(10, 20), (30, 40), (50, 60)])  # Add some loops
+    rng = random.Random(seed)
+    nodes = rng.sample(list(graph.nodes()), 40)
+
+    components = topology.components_within(graph, nodes)
+    assert sorted(map(sorted, components)) == sorted(
+        map(sorted, nx.connected_components(graph.subgraph(nodes)))
+    )
+
+    added = topology.connect_components(graph, components)
+    assert not set(added) & set(nodes)
+    assert len(set(added)) == len(added)
+    assert nx.is_connected(graph.subgraph(nodes + added))
+
+
+def test_connect_components_no_path():
+    graph = nx.Graph([(0, 1), (2, 3)])
+    with pytest.raises(nx.NetworkXNoPath):
+        topology.connect_components(graph, [{0}, {3}])
@@ -6,6 +6,7 @@ test_writer
 
 Tests for `ditto` module writers
 """
+import json
 import logging
 import os
 
@@ -352,3 +353,155 @@ def test_ephasor_writer():
     t = tempfile.TemporaryDirectory()
     writer = Writer(output_path=t.name, log_path="./")
     writer.write(m)
+
+
+def test_ephasor_writer_csv():
+    from ditto.writers.ephasor.write import Writer
+    from ditto.models.node import Node
+    from ditto.models.line import Line
+    from ditto.models.load import Load
+    from ditto.models.phase_load import PhaseLoad
+    from ditto.models.wire import Wire
+    from ditto.models.base import Unicode
+    from ditto.models.power_source import PowerSource
+    from ditto.store import Store
+    import pandas as pd
+
+    m = Store()
+    PowerSource(
+        m,
+        name="src",
+        phases=[Unicode("A"), Unicode("B"), Unicode("C")],
+        nominal_voltage=12470.0,
+        connecting_element="sourcebus",
+        is_sourcebus=True,
+    )
+    Node(m, name="sourcebus", phases=[Unicode("A"), Unicode("B"), Unicode("C")])
+    Node(m, name="n1", phases=[Unicode("C"), Unicode("A")], nominal_voltage=12470.0)
+    Node(m, name="n2", phases=[Unicode("A")])
+    Line(
+        m,
+        name="l1",
+        from_element="sourcebus",
+        to_element="n1",
+        length=1609.344,
+        wires=[Wire(m, phase="A"), Wire(m, phase="C"), Wire(m, phase="N")],
+        impedance_matrix=[[complex(0.3, 0.6), 0.1j], [0.1j, complex(0.3, 0.6)]],
+    )
+    Line(
+        m,
+        name="sw1",
+        from_element="n1",
+        to_element="n2",
+        is_switch=True,
+        wires=[Wire(m, phase="A", is_open=True)],
+    )
+    # The loads named after their phase share a row
+    for name, phase in [("load_s1a", "A"), ("load_s1c", "C"), ("load_s2", "A")]:
+        phase_load = PhaseLoad(m, phase=phase, p=1000.0, q=500.0)
+        phase_load.model = 1  # Constant power
+        Load(
+            m,
+            name=name,
+            connecting_element="n1",
+            connection_type="Y",
+            phase_loads=[phase_load],
+        )
+    m.set_names()
+
+    t = tempfile.TemporaryDirectory()
+    Writer(output_path=t.name, output_format="csv").write(m)
+    folder = os.path.join(t.name, "ephasor_model")
+    assert sorted(os.listdir(folder)) == [
+        "Bus.csv",
+        "Multiphase Line.csv",
+        "Multiphase Load.csv",
+        "Multiphase Transformer.csv",
+        "Switch.csv",
+        "Vsource 3-phase.csv",
+    ]
+
+    bus = pd.read_csv(os.path.join(folder, "Bus.csv"))
+    assert list(bus["Bus"]) == ["sourcebus_a", "sourcebus_b", "sourcebus_c", "n1_c", "n1_a", "n2_a"]
+    assert list(bus["Type"]) == ["SLACK"] * 3 + ["PQ"] * 3
+    assert bus["Voltage (V)"][3] == pytest.approx(12470.0 / 3 ** 0.5)
+
+    line = pd.read_csv(os.path.join(folder, "Multiphase Line.csv"))
+    assert list(line["ID"]) == ["l1"]
+    assert (line["bus0a"][0], line["bus1b"][0]) == ("sourcebus_a", "n1_c")
+    assert line["Length (Mile)"][0] == pytest.approx(1.0, rel=1e-5)
+    assert line["r11 (ohm/Mile)"][0] == pytest.approx(0.3 * 1609.344, rel=1e-5)
+    assert line["x21 (ohm/Mile)"][0] == pytest.approx(0.1 * 1609.344, rel=1e-5)
+    assert pd.isnull(line["r33 (ohm/Mile)"][0])
+
+    switch = pd.read_csv(os.path.join(folder, "Switch.csv"))
+    assert list(switch["Switch Name"]) == ["sw1_a"]
+    assert list(switch["Normal Status"]) == [0]
+
+    load = pd.read_csv(os.path.join(folder, "Multiphase Load.csv"))
+    assert list(load["ID"]) == ["s1", "s2"]
+    assert list(load["P_1 (kW)"]) == [1.0, 1.0]
+    assert list(load["K_p"]) == [1, 1]
+
+    with pytest.raises(ValueError):
+        Writer(output_path=t.name, output_format="xls").write(m)
+
+
+def test_odo_tool_writer():
+    from ditto.writers.odo_tool.write import Writer
+    from ditto.models.node import Node
+    from ditto.models.line import Line
+    from ditto.models.load import Load
+    from ditto.models.phase_load import PhaseLoad
+    from ditto.models.wire import Wire
+    from ditto.store import Store
+
+    m = Store()
+    node1 = Node(m, name="n1")
+    node2 = Node(m, name="n2")
+    node3 = Node(m, name="n3")
+    for name, from_element, to_element, phases in [
+        ("l1", "n1", "n2", ["A", "B", "C"]),
+        ("l2", "n2", "n3", ["B"]),
+    ]:
+        n = len(phases)
+        Line(
+            m,
+            name=name,
+            from_element=from_element,
+            to_element=to_element,
+            nominal_voltage=4160.0,
+            length=100.0,
+            wires=[Wire(m, phase=p, ampacity=400.0) for p in phases],
+            impedance_matrix=[[complex(0.3, 0.6)] * n] * n,
+            capacitance_matrix=[[1.0] * n] * n,
+        )
+    for name, bus in [("load1", "n3"), ("load2", "n3"), ("load3", "n2")]:
+        Load(
+            m,
+            name=name,
+            connecting_element=bus,
+            phase_loads=[PhaseLoad(m, phase="B", p=1000.0, q=0.0)],
+        )
+
+    writer = Writer(output_path="./", baseMVA=1.0, basekV=4.16)
+    network = writer.write(m)
+
+    assert writer.bus_index == {"n1": 1, "n2": 2, "n3": 3}
+    l1, l2 = network["branch"]["1"], network["branch"]["2"]
+    assert (l1["f_bus"], l1["t_bus"], l2["f_bus"], l2["t_bus"]) == (1, 2, 2, 3)
+    # The impedances are in per unit of the base impedance of the line (4.16**2 / 1.0 ohms)
+    assert l1["br_r"][0][1] == pytest.approx(30 / 4.16 ** 2)
+    assert l2["br_x"][1][1] == pytest.approx(60 / 4.16 ** 2)
+    assert l2["br_x"][0][0] == 0.0
+    # Loads on the same bus are aggregated
+    assert [load["load_bus"] for load in network["load"].values()] == [3, 2]
+
+    # A line without nominal voltage is converted with the base voltage of the writer
+    m.set_names()
+    m["l2"].nominal_voltage = None
+    network = Writer(output_path="./", baseMVA=1.0, basekV=2.08).write(m)
+    l2 = network["branch"]["2"]
+    assert l2["nominal_voltage"] is None
+    assert l2["br_x"][1][1] == pytest.approx(60 / 2.08 ** 2)
+    assert "NaN" not in json.dumps(network)